@@ -6,6 +6,7 @@ import os
 import sys
 from time import time
 from collections import OrderedDict
+from functools import partial
 
 from typing import Any, Optional, Dict
 
@@ -210,7 +211,7 @@ def async_from_config_file(config_path: str,
 
     try:
         config_dict = yield from hass.async_add_job(
-            conf_util.load_yaml_config_file, config_path)
+            partial(conf_util.load_yaml_config_file, config_path, cache=True))
     except HomeAssistantError as err:
         _LOGGER.error("Error loading %s: %s", config_path, err)
         return None
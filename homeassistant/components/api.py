@@ -12,10 +12,9 @@ from aiohttp import web
 import async_timeout
 
 import homeassistant.core as ha
-import homeassistant.remote as rem
 from homeassistant.bootstrap import DATA_LOGGING
 from homeassistant.const import (
-    EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED,
+    EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED,
     HTTP_BAD_REQUEST, HTTP_CREATED, HTTP_NOT_FOUND,
     MATCH_ALL, URL_API, URL_API_COMPONENTS,
     URL_API_CONFIG, URL_API_DISCOVERY_INFO, URL_API_ERROR_LOG,
@@ -23,6 +22,8 @@ from homeassistant.const import (
     URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE,
     __version__)
 from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.event_broadcast import (
+    MessageQueue, async_subscribe)
 from homeassistant.helpers.state import AsyncTrackStates
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.helpers import template
@@ -33,6 +34,7 @@ DEPENDENCIES = ['http']
 
 STREAM_PING_PAYLOAD = "ping"
 STREAM_PING_INTERVAL = 50  # seconds
+STREAM_MAX_PENDING = 512
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -82,13 +84,13 @@ class APIEventStream(HomeAssistantView):
         # pylint: disable=no-self-use
         hass = request.app['hass']
         stop_obj = object()
-        to_write = asyncio.Queue(loop=hass.loop)
+        to_write = MessageQueue(hass.loop, STREAM_MAX_PENDING)
 
         restrict = request.query.get('restrict')
         if restrict:
             restrict = restrict.split(',') + [EVENT_HOMEASSISTANT_STOP]
 
-        @asyncio.coroutine
+        @ha.callback
         def forward_events(event):
             """Forward events to the open request."""
             if event.event_type == EVENT_TIME_CHANGED:
@@ -99,24 +101,33 @@ class APIEventStream(HomeAssistantView):
 
             _LOGGER.debug('STREAM %s FORWARDING %s', id(stop_obj), event)
 
+            key = None
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=rem.JSONEncoder)
-
-            yield from to_write.put(data)
+                data = event.as_json()
+                if event.event_type == EVENT_STATE_CHANGED:
+                    key = event.data['entity_id']
+
+            try:
+                to_write.put_nowait(data, key)
+            except asyncio.QueueFull:
+                _LOGGER.warning('STREAM %s exceeded max pending messages',
+                                id(stop_obj))
+                to_write.clear()
+                to_write.put_nowait(stop_obj)
 
         response = web.StreamResponse()
         response.content_type = 'text/event-stream'
         yield from response.prepare(request)
 
-        unsub_stream = hass.bus.async_listen(MATCH_ALL, forward_events)
+        unsub_stream = async_subscribe(hass, MATCH_ALL, forward_events)
 
         try:
             _LOGGER.debug('STREAM %s ATTACHED', id(stop_obj))
 
             # Fire off one message so browsers fire open event right away
-            yield from to_write.put(STREAM_PING_PAYLOAD)
+            to_write.put_nowait(STREAM_PING_PAYLOAD, STREAM_PING_PAYLOAD)
 
             while True:
                 try:
@@ -132,7 +143,8 @@ class APIEventStream(HomeAssistantView):
                                   msg.strip())
                     yield from response.write(msg.encode("UTF-8"))
                 except asyncio.TimeoutError:
-                    yield from to_write.put(STREAM_PING_PAYLOAD)
+                    to_write.put_nowait(
+                        STREAM_PING_PAYLOAD, STREAM_PING_PAYLOAD)
 
         except asyncio.CancelledError:
             _LOGGER.debug('STREAM %s ABORT', id(stop_obj))
@@ -10,7 +10,7 @@ import logging
 import voluptuous as vol
 
 from homeassistant.core import callback
-from homeassistant.const import CONF_AT, CONF_PLATFORM
+from homeassistant.const import CONF_AT, CONF_PLATFORM, MATCH_ALL
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.event import async_track_time_change
 
@@ -20,12 +20,22 @@ CONF_SECONDS = 'seconds'
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _time_pattern(maximum):
+    """Validate a time pattern value that must be able to match."""
+    return vol.Any(
+        vol.All(vol.Coerce(int), vol.Range(min=0, max=maximum)),
+        vol.All(str, vol.Any(MATCH_ALL, vol.Match(r'^/0*[1-9][0-9]*$'))),
+        msg="expected a number from 0 to {}, '/N' or '{}'".format(
+            maximum, MATCH_ALL))
+
+
 TRIGGER_SCHEMA = vol.All(vol.Schema({
     vol.Required(CONF_PLATFORM): 'time',
     CONF_AT: cv.time,
-    CONF_HOURS: vol.Any(vol.Coerce(int), vol.Coerce(str)),
-    CONF_MINUTES: vol.Any(vol.Coerce(int), vol.Coerce(str)),
-    CONF_SECONDS: vol.Any(vol.Coerce(int), vol.Coerce(str)),
+    CONF_HOURS: _time_pattern(23),
+    CONF_MINUTES: _time_pattern(59),
+    CONF_SECONDS: _time_pattern(59),
 }), cv.has_at_least_one_key(CONF_HOURS, CONF_MINUTES, CONF_SECONDS, CONF_AT))
 
 
@@ -4,6 +4,7 @@ A component which allows you to send data to Datadog.
 For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/datadog/
 """
+from functools import partial
 import logging
 
 import voluptuous as vol
@@ -13,6 +14,7 @@ from homeassistant.const import (
     EVENT_STATE_CHANGED, STATE_UNKNOWN)
 from homeassistant.helpers import state as state_helper
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.export import ExportThread
 
 REQUIREMENTS = ['datadog==0.15.0']
 
@@ -48,57 +50,71 @@ def setup(hass, config):
 
     initialize(statsd_host=host, statsd_port=port)
 
-    def logbook_entry_listener(event):
-        """Listen for logbook entries and send them as events."""
+    def logbook_entry_to_metrics(event):
+        """Convert a logbook entry to a Datadog event."""
         name = event.data.get('name')
         message = event.data.get('message')
 
-        statsd.event(
+        return [partial(
+            statsd.event,
             title="Home Assistant",
             text="%%% \n **{}** {} \n %%%".format(name, message),
             tags=[
                 "entity:{}".format(event.data.get('entity_id')),
                 "domain:{}".format(event.data.get('domain'))
             ]
-        )
+        )]
 
-        _LOGGER.debug('Sent event %s', event.data.get('entity_id'))
-
-    def state_changed_listener(event):
-        """Listen for new messages on the bus and sends them to Datadog."""
+    def state_to_metrics(event):
+        """Convert a state change to Datadog gauges."""
         state = event.data.get('new_state')
 
         if state is None or state.state == STATE_UNKNOWN:
-            return
+            return None
 
         if state.attributes.get('hidden') is True:
-            return
+            return None
 
         states = dict(state.attributes)
         metric = "{}.{}".format(prefix, state.domain)
         tags = ["entity:{}".format(state.entity_id)]
+        metrics = []
 
         for key, value in states.items():
             if isinstance(value, (float, int)):
                 attribute = "{}.{}".format(metric, key.replace(' ', '_'))
-                statsd.gauge(
-                    attribute, value, sample_rate=sample_rate, tags=tags)
-
-                _LOGGER.debug(
-                    "Sent metric %s: %s (tags: %s)", attribute, value, tags)
+                metrics.append(partial(
+                    statsd.gauge,
+                    attribute, value, sample_rate=sample_rate, tags=tags))
 
         try:
             value = state_helper.state_as_number(state)
         except ValueError:
             _LOGGER.debug(
                 "Error sending %s: %s (tags: %s)", metric, state.state, tags)
-            return
+            return metrics
 
-        statsd.gauge(metric, value, sample_rate=sample_rate, tags=tags)
+        metrics.append(partial(
+            statsd.gauge, metric, value, sample_rate=sample_rate, tags=tags))
 
-        _LOGGER.debug('Sent metric %s: %s (tags: %s)', metric, value, tags)
+        return metrics
 
-    hass.bus.listen(EVENT_LOGBOOK_ENTRY, logbook_entry_listener)
-    hass.bus.listen(EVENT_STATE_CHANGED, state_changed_listener)
+    def write_batch(batch):
+        """Send a batch of metrics, packing them in as few packets as fit."""
+        statsd.open_buffer()
+        try:
+            for metrics in batch:
+                for send in metrics:
+                    send()
+        finally:
+            statsd.close_buffer()
+
+        _LOGGER.debug(
+            "Sent %d metrics", sum(len(metrics) for metrics in batch))
+
+    thread = hass.data[DOMAIN] = ExportThread(hass, 'Datadog', write_batch)
+    thread.listen(EVENT_LOGBOOK_ENTRY, logbook_entry_to_metrics)
+    thread.listen(EVENT_STATE_CHANGED, state_to_metrics)
+    thread.start()
 
     return True
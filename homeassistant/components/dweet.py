@@ -13,6 +13,7 @@ from homeassistant.const import (
     CONF_NAME, CONF_WHITELIST, EVENT_STATE_CHANGED, STATE_UNKNOWN)
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import state as state_helper
+from homeassistant.helpers.export import ExportThread
 from homeassistant.util import Throttle
 
 REQUIREMENTS = ['dweepy==0.3.0']
@@ -34,28 +35,37 @@ CONFIG_SCHEMA = vol.Schema({
 
 def setup(hass, config):
     """Set up the Dweet.io component."""
+    import dweepy
+
     conf = config[DOMAIN]
     name = conf.get(CONF_NAME)
     whitelist = conf.get(CONF_WHITELIST)
     json_body = {}
 
-    def dweet_event_listener(event):
-        """Listen for new messages on the bus and sends them to Dweet.io."""
+    def event_to_value(event):
+        """Convert a whitelisted state change to a name and value."""
         state = event.data.get('new_state')
         if state is None or state.state in (STATE_UNKNOWN, '') \
                 or state.entity_id not in whitelist:
-            return
+            return None
 
         try:
             _state = state_helper.state_as_number(state)
         except ValueError:
             _state = state.state
 
-        json_body[state.attributes.get('friendly_name')] = _state
+        return state.attributes.get('friendly_name'), _state
 
+    def write_batch(batch):
+        """Send the collected data with the values of the batch."""
+        json_body.update(batch)
         send_data(name, json_body)
 
-    hass.bus.listen(EVENT_STATE_CHANGED, dweet_event_listener)
+    thread = hass.data[DOMAIN] = ExportThread(
+        hass, 'Dweet.io', write_batch, retry_exceptions=(dweepy.DweepyError,),
+        batch_timeout=MIN_TIME_BETWEEN_UPDATES.total_seconds())
+    thread.listen(EVENT_STATE_CHANGED, event_to_value)
+    thread.start()
 
     return True
 
@@ -64,7 +74,4 @@ def setup(hass, config):
 def send_data(name, msg):
     """Send the collected data to Dweet.io."""
     import dweepy
-    try:
-        dweepy.dweet_for(name, msg)
-    except dweepy.DweepyError:
-        _LOGGER.error("Error saving data to Dweet.io: %s", msg)
+    dweepy.dweet_for(name, msg)
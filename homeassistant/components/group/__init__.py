@@ -108,6 +108,25 @@ def _get_group_on_off(state):
     return None, None
 
 
+def _count_states(states):
+    """Count states by state, with an assumed state and that are missing."""
+    state_counts = {}
+    assumed_count = 0
+    unknown_count = 0
+
+    for state in states:
+        if state is None:
+            unknown_count += 1
+            continue
+
+        state_counts[state.state] = state_counts.get(state.state, 0) + 1
+
+        if state.attributes.get(ATTR_ASSUMED_STATE):
+            assumed_count += 1
+
+    return state_counts, assumed_count, unknown_count
+
+
 @bind_hass
 def is_on(hass, entity_id):
     """Test if the group state is in its ON-state."""
@@ -415,6 +434,11 @@ class Group(Entity):
         self._order = order
         self._assumed_state = False
         self._async_unsub_state_changed = None
+        # Member states and their running counts, see _async_count_members
+        self._member_states = None
+        self._state_counts = {}
+        self._assumed_count = 0
+        self._unknown_count = 0
 
     @staticmethod
     def create_group(hass, name, entity_ids=None, user_defined=True,
@@ -557,6 +581,7 @@ class Group(Entity):
     @asyncio.coroutine
     def async_update(self):
         """Query all members and determine current group state."""
+        self._async_count_members()
         self._state = STATE_UNKNOWN
         self._async_update_group_state()
 
@@ -583,45 +608,77 @@ class Group(Entity):
         if self._async_unsub_state_changed is None:
             return
 
+        if self._member_states is None:
+            self._async_count_members()
+        elif entity_id in self._member_states:
+            self._async_count_state(self._member_states[entity_id], -1)
+            self._member_states[entity_id] = new_state
+            self._async_count_state(new_state, 1)
+
         self._async_update_group_state(new_state)
         yield from self.async_update_ha_state()
 
-    @property
-    def _tracking_states(self):
-        """Return the states that the group is tracking."""
-        states = []
+    @callback
+    def _async_count_members(self):
+        """Count the states of all members from scratch.
+
+        Logs a warning if the running counts did not match the member states
+        they were kept for.
 
-        for entity_id in self.tracking:
-            state = self.hass.states.get(entity_id)
+        This method must be run in the event loop.
+        """
+        counts = (self._state_counts, self._assumed_count,
+                  self._unknown_count)
 
-            if state is not None:
-                states.append(state)
+        if self._member_states is not None and \
+                counts != _count_states(self._member_states.values()):
+            _LOGGER.warning("Member counts of %s were out of sync",
+                            self.entity_id)
 
-        return states
+        self._member_states = {
+            entity_id: self.hass.states.get(entity_id)
+            for entity_id in self.tracking}
+        self._state_counts, self._assumed_count, self._unknown_count = \
+            _count_states(self._member_states.values())
+
+    @callback
+    def _async_count_state(self, state, delta):
+        """Add or remove a member state from the running counts."""
+        if state is None:
+            self._unknown_count += delta
+            return
+
+        state_counts = self._state_counts
+        count = state_counts.get(state.state, 0) + delta
+
+        if count:
+            state_counts[state.state] = count
+        else:
+            del state_counts[state.state]
+
+        if state.attributes.get(ATTR_ASSUMED_STATE):
+            self._assumed_count += delta
 
     @callback
     def _async_update_group_state(self, tr_state=None):
-        """Update group state.
+        """Update group state from the running member counts.
 
-        Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        Optionally you can provide the only state changed since last update,
+        which is used to determine the type of group.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
         gr_on = self.group_on
-        gr_off = self.group_off
 
         # We have not determined type of group yet
         if gr_on is None:
             if tr_state is None:
-                states = self._tracking_states
+                for entity_id in self.tracking:
+                    state = self._member_states[entity_id]
+                    if state is None:
+                        continue
 
-                for state in states:
-                    gr_on, gr_off = \
-                        _get_group_on_off(state.state)
+                    gr_on, gr_off = _get_group_on_off(state.state)
                     if gr_on is not None:
                         break
             else:
@@ -634,28 +691,9 @@ class Group(Entity):
         if gr_on is None:
             return
 
-        if tr_state is None or ((gr_state == gr_on and
-                                 tr_state.state == gr_off) or
-                                tr_state.state not in (gr_on, gr_off)):
-            if states is None:
-                states = self._tracking_states
-
-            if any(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
-
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
-
-        if tr_state is None or self._assumed_state and \
-           not tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            if states is None:
-                states = self._tracking_states
-
-            self._assumed_state = any(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state
-                in states)
+        if self._state_counts.get(gr_on):
+            self._state = gr_on
+        else:
+            self._state = self.group_off
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+        self._assumed_state = self._assumed_count > 0
@@ -5,7 +5,7 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/history/
 """
 import asyncio
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from datetime import timedelta
 from itertools import groupby
 import logging
@@ -14,12 +14,15 @@ import time
 import voluptuous as vol
 
 from homeassistant.const import (
-    HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE)
+    HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE,
+    EVENT_STATE_CHANGED)
+from homeassistant.core import State, callback
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import ATTR_HIDDEN
-from homeassistant.components.recorder.util import session_scope, execute
+from homeassistant.components.recorder.util import (
+    session_scope, execute_stream)
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -38,6 +41,17 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+ATTR_MIN_VALUE = 'min_value'
+ATTR_MAX_VALUE = 'max_value'
+
+# Cached results are bounded by the number of states they hold
+CACHE_MAX_STATES = 20000
+CACHE_MAX_RESULT_STATES = 5000
+MAX_BUCKETS = 10000
+
+# Default periods end on a full minute so that they share cache entries
+DEFAULT_PERIOD_ROUNDING = timedelta(minutes=1)
+
 
 def last_recorder_run(hass):
     """Retrieve the last closed recorder run from the database."""
@@ -63,10 +77,11 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
     thermostat so that we get current temperature in our graphs).
     """
     timer_start = time.perf_counter()
-    from homeassistant.components.recorder.models import States
+    from homeassistant.components.recorder.models import (
+        LazyState, States, state_columns)
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
+        query = session.query(*state_columns()).filter(
             (States.domain.in_(SIGNIFICANT_DOMAINS) |
              (States.last_changed == States.last_updated)) &
             (States.last_updated > start_time))
@@ -80,27 +95,30 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
         query = query.order_by(States.last_updated)
 
         states = (
-            state for state in execute(query)
-            if (_is_significant(state) and
-                not state.attributes.get(ATTR_HIDDEN, False)))
+            state for state in execute_stream(query, LazyState.from_row)
+            if _is_significant(state) and not _is_hidden(state))
+
+        # Rows are streamed, build the result while the session is open
+        result = states_to_json(
+            hass, states, start_time, entity_ids, filters,
+            include_start_time_state)
 
     if _LOGGER.isEnabledFor(logging.DEBUG):
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug(
             'get_significant_states took %fs', elapsed)
 
-    return states_to_json(
-        hass, states, start_time, entity_ids, filters,
-        include_start_time_state)
+    return result
 
 
 def state_changes_during_period(hass, start_time, end_time=None,
                                 entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
-    from homeassistant.components.recorder.models import States
+    from homeassistant.components.recorder.models import (
+        LazyState, States, state_columns)
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
+        query = session.query(*state_columns()).filter(
             (States.last_changed == States.last_updated) &
             (States.last_updated > start_time))
 
@@ -112,20 +130,21 @@ def state_changes_during_period(hass, start_time, end_time=None,
 
         entity_ids = [entity_id] if entity_id is not None else None
 
-        states = execute(
-            query.order_by(States.last_updated))
+        states = execute_stream(
+            query.order_by(States.last_updated), LazyState.from_row)
 
-    return states_to_json(hass, states, start_time, entity_ids)
+        return states_to_json(hass, states, start_time, entity_ids)
 
 
 def get_last_state_changes(hass, number_of_states, entity_id):
     """Return the last number_of_states."""
-    from homeassistant.components.recorder.models import States
+    from homeassistant.components.recorder.models import (
+        LazyState, States, state_columns)
 
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
+        query = session.query(*state_columns()).filter(
             (States.last_changed == States.last_updated))
 
         if entity_id is not None:
@@ -133,8 +152,9 @@ def get_last_state_changes(hass, number_of_states, entity_id):
 
         entity_ids = [entity_id] if entity_id is not None else None
 
-        states = execute(
-            query.order_by(States.last_updated.desc()).limit(number_of_states))
+        states = list(execute_stream(
+            query.order_by(States.last_updated.desc()).limit(number_of_states),
+            LazyState.from_row))
 
     return states_to_json(hass, reversed(states),
                           start_time,
@@ -145,7 +165,8 @@ def get_last_state_changes(hass, number_of_states, entity_id):
 def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
                filters=None):
     """Return the states at a specific point in time."""
-    from homeassistant.components.recorder.models import States
+    from homeassistant.components.recorder.models import (
+        LazyState, States, state_columns)
 
     if run is None:
         run = recorder.run_information(hass, utc_point_in_time)
@@ -204,7 +225,7 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
 
         most_recent_state_ids = most_recent_state_ids.subquery()
 
-        query = session.query(States).join(
+        query = session.query(*state_columns()).join(
             most_recent_state_ids,
             States.state_id == most_recent_state_ids.c.max_state_id
         ).filter((~States.domain.in_(IGNORE_DOMAINS)))
@@ -212,8 +233,8 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
         if filters:
             query = filters.apply(query, entity_ids)
 
-        return [state for state in execute(query)
-                if not state.attributes.get(ATTR_HIDDEN, False)]
+        return [state for state in execute_stream(query, LazyState.from_row)
+                if not _is_hidden(state)]
 
 
 def states_to_json(
@@ -253,6 +274,49 @@ def states_to_json(
     return result
 
 
+def downsample(states, start_time, end_time, buckets):
+    """Reduce a list of states of one entity to one state per time bucket.
+
+    The period from start_time to end_time is split in equally sized
+    buckets. Numeric states that share a bucket are replaced by one state
+    holding their mean, with the minimum and maximum as attributes next to
+    the attributes of the last state in the bucket. Buckets with a
+    non-numeric state are kept as they are.
+    """
+    bucket_size = (end_time - start_time) / buckets
+    if not bucket_size:
+        return states
+
+    result = []
+
+    def bucket_of(state):
+        """Return the index of the bucket the state falls in."""
+        return int((state.last_updated - start_time) / bucket_size)
+
+    for _, group in groupby(states, bucket_of):
+        group = list(group)
+
+        if len(group) == 1:
+            result.extend(group)
+            continue
+
+        try:
+            values = [float(state.state) for state in group]
+        except ValueError:
+            result.extend(group)
+            continue
+
+        first, last = group[0], group[-1]
+        attributes = dict(last.attributes)
+        attributes[ATTR_MIN_VALUE] = min(values)
+        attributes[ATTR_MAX_VALUE] = max(values)
+        result.append(State(
+            first.entity_id, sum(values) / len(values), attributes,
+            first.last_changed, first.last_updated))
+
+    return result
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = list(get_states(hass, utc_point_in_time, (entity_id,), run))
@@ -274,7 +338,8 @@ def async_setup(hass, config):
         filters.included_domains = include.get(CONF_DOMAINS, [])
     use_include_order = conf.get(CONF_ORDER)
 
-    hass.http.register_view(HistoryPeriodView(filters, use_include_order))
+    hass.http.register_view(HistoryPeriodView(
+        filters, use_include_order, HistoryCache(hass)))
     yield from hass.components.frontend.async_register_built_in_panel(
         'history', 'history', 'mdi:poll-box')
 
@@ -288,10 +353,11 @@ class HistoryPeriodView(HomeAssistantView):
     name = 'api:history:view-period'
     extra_urls = ['/api/history/period/{datetime}']
 
-    def __init__(self, filters, use_include_order):
+    def __init__(self, filters, use_include_order, cache):
         """Initialize the history period view."""
         self.filters = filters
         self.use_include_order = use_include_order
+        self.cache = cache
 
     @asyncio.coroutine
     def get(self, request, datetime=None):
@@ -309,7 +375,12 @@ class HistoryPeriodView(HomeAssistantView):
         if datetime:
             start_time = dt_util.as_utc(datetime)
         else:
-            start_time = now - one_day
+            # The period still covers now, a state change in the rest of
+            # the minute drops the cached result
+            period_end = now.replace(second=0, microsecond=0)
+            if period_end < now:
+                period_end += DEFAULT_PERIOD_ROUNDING
+            start_time = period_end - one_day
 
         if start_time > now:
             return self.json([])
@@ -328,8 +399,24 @@ class HistoryPeriodView(HomeAssistantView):
             entity_ids = entity_ids.lower().split(',')
         include_start_time_state = 'skip_initial_state' not in request.query
 
+        buckets = request.query.get('buckets')
+        if buckets is not None:
+            try:
+                buckets = int(buckets)
+            except ValueError:
+                buckets = 0
+            if not 0 < buckets <= MAX_BUCKETS:
+                return self.json_message('Invalid buckets', HTTP_BAD_REQUEST)
+
         hass = request.app['hass']
 
+        cache_key = (frozenset(entity_ids) if entity_ids else None,
+                     start_time, end_time, include_start_time_state, buckets)
+        result = self.cache.get(cache_key)
+        if result is not None:
+            return self.json(result)
+
+        token = self.cache.async_token()
         result = yield from hass.async_add_job(
             get_significant_states, hass, start_time, end_time,
             entity_ids, self.filters, include_start_time_state)
@@ -339,6 +426,10 @@ class HistoryPeriodView(HomeAssistantView):
             _LOGGER.debug(
                 'Extracted %d states in %fs', sum(map(len, result)), elapsed)
 
+        if buckets is not None:
+            result = [downsample(states, start_time, end_time, buckets)
+                      for states in result]
+
         # Optionally reorder the result to respect the ordering given
         # by any entities explicitly included in the configuration.
 
@@ -353,10 +444,119 @@ class HistoryPeriodView(HomeAssistantView):
             sorted_result.extend(result)
             result = sorted_result
 
+        self.cache.async_set(cache_key, result, token)
+
         response = yield from hass.async_add_job(self.json, result)
         return response
 
 
+class HistoryCache(object):
+    """LRU cache of history results.
+
+    Results are keyed by (entity ids, start time, end time, include start
+    time state, buckets). A state change drops the results whose period
+    covers it and that include the entity; results of past periods stay
+    until the recorder purges the database. The cache holds at most
+    max_states states; results with more than max_result_states states
+    are not cached.
+    """
+
+    def __init__(self, hass, max_states=CACHE_MAX_STATES,
+                 max_result_states=CACHE_MAX_RESULT_STATES):
+        """Initialize the cache and listen for state changes."""
+        self.hass = hass
+        self.max_states = max_states
+        self.max_result_states = max_result_states
+        self.states = 0
+        self._results = OrderedDict()
+        self._seq = 0
+        self._last_change = {}
+        self._purge_count = 0
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    def _recorder_purge_count(self):
+        """Return the number of purges done by the recorder."""
+        instance = self.hass.data.get(recorder.DATA_INSTANCE)
+        return 0 if instance is None else instance.purge_count
+
+    def get(self, key):
+        """Return the cached result for key or None."""
+        purge_count = self._recorder_purge_count()
+        if purge_count != self._purge_count:
+            self._results.clear()
+            self.states = 0
+            self._purge_count = purge_count
+
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+
+        self._results.move_to_end(key)
+        return entry[0]
+
+    @callback
+    def async_token(self):
+        """Return a token to take before querying the database.
+
+        A result is only cached if nothing it depends on changed since the
+        token was taken. When the recorder still has events to write the
+        database is behind and the token never allows caching.
+        """
+        instance = self.hass.data.get(recorder.DATA_INSTANCE)
+        if instance is not None and instance.queue.unfinished_tasks:
+            return None
+        return self._seq, self._recorder_purge_count()
+
+    @callback
+    def async_set(self, key, result, token):
+        """Cache the result for key if it is still current."""
+        if token is None:
+            return
+
+        seq, purge_count = token
+        if purge_count != self._recorder_purge_count():
+            return
+
+        entity_ids = key[0]
+        if entity_ids is None:
+            if self._seq != seq:
+                return
+        elif any(self._last_change.get(entity_id, 0) > seq
+                 for entity_id in entity_ids):
+            return
+
+        size = sum(map(len, result))
+        if size > self.max_result_states:
+            return
+
+        self._remove(key)
+        self._results[key] = (result, size)
+        self.states += size
+        while self.states > self.max_states:
+            _, (_, evicted) = self._results.popitem(last=False)
+            self.states -= evicted
+
+    def _remove(self, key):
+        """Remove the cached result for key, if any."""
+        entry = self._results.pop(key, None)
+        if entry is not None:
+            self.states -= entry[1]
+
+    @callback
+    def _async_state_changed(self, event):
+        """Drop the results a state change invalidates."""
+        entity_id = event.data['entity_id']
+        self._seq += 1
+        self._last_change[entity_id] = self._seq
+
+        time_fired = event.time_fired
+        for key in list(self._results):
+            entity_ids, start_time, end_time = key[:3]
+            if (entity_ids is None or entity_id in entity_ids) and \
+                    start_time <= time_fired <= end_time:
+                self._remove(key)
+
+
 class Filters(object):
     """Container for the configured include and exclude filters."""
 
@@ -417,6 +617,16 @@ class Filters(object):
         return query
 
 
+def _is_hidden(state):
+    """Test if a state is hidden.
+
+    Attributes are only decoded when the stored JSON mentions the key.
+    """
+    if '"{}"'.format(ATTR_HIDDEN) not in state.attributes_json():
+        return False
+    return state.attributes.get(ATTR_HIDDEN, False)
+
+
 def _is_significant(state):
     """Test if state is significant for history charts.
 
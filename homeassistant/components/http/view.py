@@ -5,15 +5,14 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/http/
 """
 import asyncio
-import json
 import logging
 
 from aiohttp import web
 from aiohttp.web_exceptions import HTTPUnauthorized, HTTPInternalServerError
 
-import homeassistant.remote as rem
 from homeassistant.core import is_callback
 from homeassistant.const import CONTENT_TYPE_JSON
+import homeassistant.util.json as json_util
 
 from .const import KEY_AUTHENTICATED, KEY_REAL_IP
 
@@ -32,8 +31,7 @@ class HomeAssistantView(object):
     def json(self, result, status_code=200, headers=None):
         """Return a JSON response."""
         try:
-            msg = json.dumps(
-                result, sort_keys=True, cls=rem.JSONEncoder).encode('UTF-8')
+            msg = json_util.dumps(result).encode('UTF-8')
         except TypeError as err:
             _LOGGER.error('Unable to serialize to JSON: %s\n%s', err, result)
             raise HTTPInternalServerError
@@ -4,6 +4,7 @@ A component which allows you to send data to an Influx database.
 For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/influxdb/
 """
+from datetime import timedelta
 import logging
 import re
 import queue
@@ -21,6 +22,7 @@ from homeassistant.const import (
 from homeassistant.helpers import state as state_helper
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_values import EntityValues
+import homeassistant.util.dt as dt_util
 
 REQUIREMENTS = ['influxdb==5.0.0']
 
@@ -89,6 +91,29 @@ CONFIG_SCHEMA = vol.Schema({
 RE_DIGIT_TAIL = re.compile(r'^[^\.]*\d+\.?\d+[^\.]*$')
 RE_DECIMAL = re.compile(r'[^\d.]+')
 
+ESCAPE_MEASUREMENT = str.maketrans({
+    '\\': '\\\\', ',': '\\,', ' ': '\\ '})
+ESCAPE_KEY = str.maketrans({
+    '\\': '\\\\', ',': '\\,', '=': '\\=', ' ': '\\ '})
+ESCAPE_STRING = str.maketrans({
+    '\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+EPOCH = dt_util.utc_from_timestamp(0)
+TIME_PRECISION = 'u'
+TIME_UNIT = timedelta(microseconds=1)
+
+
+def _escape_tag(value):
+    """Escape a tag key, tag value or field key for line protocol."""
+    return str(value).translate(ESCAPE_KEY)
+
+
+def _format_field(value):
+    """Format a float or string field value for line protocol."""
+    if isinstance(value, float):
+        return repr(value)
+    return '"{}"'.format(value.translate(ESCAPE_STRING))
+
 
 def setup(hass, config):
     """Set up the InfluxDB component."""
@@ -144,92 +169,113 @@ def setup(hass, config):
                       "READ/WRITE", exc)
         return False
 
-    def event_to_json(event):
-        """Add an event to the outgoing Influx list."""
+    plans = {}
+
+    def make_plan(state, schema):
+        """Resolve how the states of an entity are written."""
+        entity_id = state.entity_id
+        if entity_id in blacklist_e or state.domain in blacklist_d or \
+                (whitelist_e and entity_id not in whitelist_e) or \
+                (whitelist_d and state.domain not in whitelist_d):
+            return ExportPlan(schema, None)
+
+        uom = schema[1]
+        include_uom = True
+        measurement = component_config.get(entity_id).get(
+            CONF_OVERRIDE_MEASUREMENT)
+        if measurement in (None, ''):
+            if override_measurement:
+                measurement = override_measurement
+            elif uom in (None, ''):
+                if default_measurement:
+                    measurement = default_measurement
+                else:
+                    measurement = entity_id
+            else:
+                measurement = uom
+                include_uom = False
+
+        tag_keys = [key for key in schema[0]
+                    if key in tags_attributes and key not in tags]
+        fixed_tags = {
+            'domain': state.domain,
+            'entity_id': state.object_id,
+        }
+        for key in tag_keys:
+            fixed_tags.pop(key, None)
+        fixed_tags.update(tags)
+
+        plan_tags = sorted(
+            [(key, _escape_tag(value), None)
+             for key, value in fixed_tags.items()] +
+            [(key, None, key) for key in tag_keys])
+        plan_tags = [(_escape_tag(key), value, attribute)
+                     for key, value, attribute in plan_tags
+                     if value != '']
+
+        field_keys = tuple(
+            key for key in schema[0] if key not in tags_attributes and
+            (key != 'unit_of_measurement' or include_uom))
+
+        return ExportPlan(
+            schema, measurement.translate(ESCAPE_MEASUREMENT), plan_tags,
+            field_keys)
+
+    def event_to_line(event):
+        """Format an event as a line of InfluxDB line protocol."""
         state = event.data.get('new_state')
         if state is None or state.state in (
-                STATE_UNKNOWN, '', STATE_UNAVAILABLE) or \
-                state.entity_id in blacklist_e or state.domain in blacklist_d:
+                STATE_UNKNOWN, '', STATE_UNAVAILABLE):
             return
 
-        try:
-            if (whitelist_e and state.entity_id not in whitelist_e) or \
-                    (whitelist_d and state.domain not in whitelist_d):
-                return
+        attributes = state.attributes
+        schema = (tuple(attributes), attributes.get('unit_of_measurement'))
+        plan = plans.get(state.entity_id)
+        if plan is None or plan.schema != schema:
+            plan = plans[state.entity_id] = make_plan(state, schema)
 
-            _include_state = _include_value = False
+        if plan.measurement is None:
+            return
 
-            _state_as_value = float(state.state)
-            _include_value = True
+        fields = {}
+        try:
+            fields['value'] = float(state.state)
         except ValueError:
+            fields['state'] = state.state
             try:
-                _state_as_value = float(state_helper.state_as_number(state))
-                _include_state = _include_value = True
+                fields['value'] = float(state_helper.state_as_number(state))
             except ValueError:
-                _include_state = True
-
-        include_uom = True
-        measurement = component_config.get(state.entity_id).get(
-            CONF_OVERRIDE_MEASUREMENT)
-        if measurement in (None, ''):
-            if override_measurement:
-                measurement = override_measurement
+                pass
+
+        for key in plan.field_keys:
+            value = attributes[key]
+            # If the key is already in fields
+            if key in fields:
+                key = key + "_"
+            if isinstance(value, (int, float)):
+                fields[key] = float(value)
             else:
-                measurement = state.attributes.get('unit_of_measurement')
-                if measurement in (None, ''):
-                    if default_measurement:
-                        measurement = default_measurement
-                    else:
-                        measurement = state.entity_id
-                else:
-                    include_uom = False
-
-        json = {
-            'measurement': measurement,
-            'tags': {
-                'domain': state.domain,
-                'entity_id': state.object_id,
-            },
-            'time': event.time_fired,
-            'fields': {}
-        }
-        if _include_state:
-            json['fields']['state'] = state.state
-        if _include_value:
-            json['fields']['value'] = _state_as_value
-
-        for key, value in state.attributes.items():
-            if key in tags_attributes:
-                json['tags'][key] = value
-            elif key != 'unit_of_measurement' or include_uom:
-                # If the key is already in fields
-                if key in json['fields']:
-                    key = key + "_"
                 # Prevent column data errors in influxDB.
                 # For each value we try to cast it as float
                 # But if we can not do it we store the value
                 # as string add "_str" postfix to the field key
                 try:
-                    json['fields'][key] = float(value)
+                    fields[key] = float(value)
                 except (ValueError, TypeError):
-                    new_key = "{}_str".format(key)
                     new_value = str(value)
-                    json['fields'][new_key] = new_value
+                    fields[key + "_str"] = new_value
 
                     if RE_DIGIT_TAIL.match(new_value):
-                        json['fields'][key] = float(
-                            RE_DECIMAL.sub('', new_value))
+                        fields[key] = float(RE_DECIMAL.sub('', new_value))
 
-                # Infinity is not a valid float in InfluxDB
-                if (key, float("inf")) in json['fields'].items():
-                    del json['fields'][key]
+            # Infinity is not a valid float in InfluxDB
+            if fields.get(key) == float("inf"):
+                del fields[key]
 
-        json['tags'].update(tags)
-
-        return json
+        return plan.format(attributes, fields, event.time_fired)
 
     instance = hass.data[DOMAIN] = InfluxThread(
-        hass, influx, event_to_json, max_tries)
+        hass, influx, event_to_line, max_tries)
     instance.start()
 
     def shutdown(event):
@@ -243,15 +289,61 @@ def setup(hass, config):
     return True
 
 
+class ExportPlan(object):
+    """Line protocol layout of the states of one entity.
+
+    A plan is made for an entity on its first state change and reused as
+    long as the attribute keys and the unit of measurement stay the same, so
+    the filters, measurement overrides and tag attributes are only resolved
+    once. Excluded entities get a plan without measurement.
+    """
+
+    __slots__ = ['schema', 'measurement', 'tags', 'field_keys', 'prefix']
+
+    def __init__(self, schema, measurement, tags=(), field_keys=()):
+        """Initialize the plan."""
+        self.schema = schema
+        self.measurement = measurement
+        self.tags = tags
+        self.field_keys = field_keys
+
+        if measurement is None or \
+                any(attribute is not None for _, _, attribute in tags):
+            self.prefix = None
+        else:
+            self.prefix = ','.join(
+                [measurement] +
+                ['{}={}'.format(key, value) for key, value, _ in tags])
+
+    def format(self, attributes, fields, time_fired):
+        """Return the line for fields of a state with attributes."""
+        prefix = self.prefix
+        if prefix is None:
+            parts = [self.measurement]
+            for key, value, attribute in self.tags:
+                if attribute is not None:
+                    value = _escape_tag(attributes[attribute])
+                    if value == '':
+                        continue
+                parts.append('{}={}'.format(key, value))
+            prefix = ','.join(parts)
+
+        return '{} {} {}'.format(
+            prefix,
+            ','.join('{}={}'.format(_escape_tag(key), _format_field(value))
+                     for key, value in sorted(fields.items())),
+            (time_fired - EPOCH) // TIME_UNIT)
+
+
 class InfluxThread(threading.Thread):
     """A threaded event handler class."""
 
-    def __init__(self, hass, influx, event_to_json, max_tries):
+    def __init__(self, hass, influx, event_to_line, max_tries):
         """Initialize the listener."""
         threading.Thread.__init__(self, name='InfluxDB')
         self.queue = queue.Queue()
         self.influx = influx
-        self.event_to_json = event_to_json
+        self.event_to_line = event_to_line
         self.max_tries = max_tries
         self.write_errors = 0
         self.shutdown = False
@@ -267,17 +359,17 @@ class InfluxThread(threading.Thread):
         """Return number of seconds to wait for more events."""
         return BATCH_TIMEOUT
 
-    def get_events_json(self):
+    def get_events_lines(self):
         """Return a batch of events formatted for writing."""
         queue_seconds = QUEUE_BACKLOG_SECONDS + self.max_tries*RETRY_DELAY
 
         count = 0
-        json = []
+        lines = []
 
         dropped = 0
 
         try:
-            while len(json) < BATCH_BUFFER_SIZE and not self.shutdown:
+            while len(lines) < BATCH_BUFFER_SIZE and not self.shutdown:
                 timeout = None if count == 0 else self.batch_timeout()
                 item = self.queue.get(timeout=timeout)
                 count += 1
@@ -289,9 +381,9 @@ class InfluxThread(threading.Thread):
                     age = time.monotonic() - timestamp
 
                     if age < queue_seconds:
-                        event_json = self.event_to_json(event)
-                        if event_json:
-                            json.append(event_json)
+                        line = self.event_to_line(event)
+                        if line:
+                            lines.append(line)
                     else:
                         dropped += 1
 
@@ -301,21 +393,22 @@ class InfluxThread(threading.Thread):
         if dropped:
             _LOGGER.warning("Catching up, dropped %d old events", dropped)
 
-        return count, json
+        return count, lines
 
-    def write_to_influxdb(self, json):
+    def write_to_influxdb(self, lines):
         """Write preprocessed events to influxdb, with retry."""
         from influxdb import exceptions
 
         for retry in range(self.max_tries+1):
             try:
-                self.influx.write_points(json)
+                self.influx.write_points(
+                    lines, time_precision=TIME_PRECISION, protocol='line')
 
                 if self.write_errors:
                     _LOGGER.error("Resumed, lost %d events", self.write_errors)
                     self.write_errors = 0
 
-                _LOGGER.debug("Wrote %d events", len(json))
+                _LOGGER.debug("Wrote %d events", len(lines))
                 break
             except (exceptions.InfluxDBClientError, IOError):
                 if retry < self.max_tries:
@@ -323,14 +416,14 @@ class InfluxThread(threading.Thread):
                 else:
                     if not self.write_errors:
                         _LOGGER.exception("Write error")
-                    self.write_errors += len(json)
+                    self.write_errors += len(lines)
 
     def run(self):
         """Process incoming events."""
         while not self.shutdown:
-            count, json = self.get_events_json()
-            if json:
-                self.write_to_influxdb(json)
+            count, lines = self.get_events_lines()
+            if lines:
+                self.write_to_influxdb(lines)
             for _ in range(count):
                 self.queue.task_done()
 
@@ -276,7 +276,7 @@ def _get_events(hass, config, start_day, end_day):
     """Get events for a period of time."""
     from homeassistant.components.recorder.models import Events, States
     from homeassistant.components.recorder.util import (
-        execute, session_scope)
+        execute_stream, session_scope)
 
     with session_scope(hass=hass) as session:
         query = session.query(Events).order_by(Events.time_fired) \
@@ -286,12 +286,12 @@ def _get_events(hass, config, start_day, end_day):
                     & (Events.time_fired < end_day)) \
             .filter((States.last_updated == States.last_changed)
                     | (States.state_id.is_(None)))
-        events = execute(query)
-    return humanify(_exclude_events(events, config))
+        # Rows are streamed, convert them while the session is open
+        return list(humanify(_exclude_events(execute_stream(query), config)))
 
 
 def _exclude_events(events, config):
-    """Get list of filtered events."""
+    """Filter events, yielding the ones to show."""
     excluded_entities = []
     excluded_domains = []
     included_entities = []
@@ -305,7 +305,6 @@ def _exclude_events(events, config):
         included_entities = include[CONF_ENTITIES]
         included_domains = include[CONF_DOMAINS]
 
-    filtered_events = []
     for event in events:
         domain, entity_id = None, None
 
@@ -376,8 +375,7 @@ def _exclude_events(events, config):
             # check if logbook entry is excluded for this entity
             if entity_id in excluded_entities:
                 continue
-        filtered_events.append(event)
-    return filtered_events
+        yield event
 
 
 # pylint: disable=too-many-return-statements
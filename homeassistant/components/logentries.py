@@ -13,6 +13,7 @@ import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from homeassistant.const import (CONF_TOKEN, EVENT_STATE_CHANGED)
 from homeassistant.helpers import state as state_helper
+from homeassistant.helpers.export import ExportThread
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,16 +34,18 @@ def setup(hass, config):
     token = conf.get(CONF_TOKEN)
     le_wh = '{}{}'.format(DEFAULT_HOST, token)
 
-    def logentries_event_listener(event):
-        """Listen for new messages on the bus and sends them to Logentries."""
+    session = requests.Session()
+
+    def event_to_json(event):
+        """Convert a state change to the Logentries event body."""
         state = event.data.get('new_state')
         if state is None:
-            return
+            return None
         try:
             _state = state_helper.state_as_number(state)
         except ValueError:
             _state = state.state
-        json_body = [
+        return [
             {
                 'domain': state.domain,
                 'entity_id': state.object_id,
@@ -51,15 +54,20 @@ def setup(hass, config):
                 'value': _state,
             }
         ]
-        try:
-            payload = {
+
+    def write_batch(batch):
+        """Send a batch of events to Logentries, one per line."""
+        data = '\n'.join(
+            json.dumps({
                 "host": le_wh,
                 "event": json_body
-            }
-            requests.post(le_wh, data=json.dumps(payload), timeout=10)
-        except requests.exceptions.RequestException as error:
-            _LOGGER.exception("Error sending to Logentries: %s", error)
+            })
+            for json_body in batch)
+        response = session.post(le_wh, data=data, timeout=10)
+        response.raise_for_status()
 
-    hass.bus.listen(EVENT_STATE_CHANGED, logentries_event_listener)
+    thread = hass.data[DOMAIN] = ExportThread(hass, 'Logentries', write_batch)
+    thread.listen(EVENT_STATE_CHANGED, event_to_json)
+    thread.start()
 
     return True
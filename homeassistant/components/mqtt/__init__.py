@@ -6,14 +6,14 @@ https://home-assistant.io/components/mqtt/
 """
 import asyncio
 from itertools import groupby
-from typing import Optional, Any, Union, Callable, List, cast  # noqa: F401
+from typing import (  # noqa: F401
+    Optional, Any, Union, Callable, Dict, List, cast)
 from operator import attrgetter
 import logging
 import os
 import socket
 import time
 import ssl
-import re
 import requests.certs
 import attr
 
@@ -449,6 +449,104 @@ class Message(object):
     retain = attr.ib(type=bool, default=False)
 
 
+class _TopicNode(object):
+    """A single topic level in the subscription trie."""
+
+    __slots__ = ['children', 'subscriptions']
+
+    def __init__(self) -> None:
+        """Initialize an empty topic level."""
+        self.children = {}  # type: Dict[str, _TopicNode]
+        self.subscriptions = []  # type: List[Subscription]
+
+
+class TopicMatcher(object):
+    """Index subscriptions by topic level.
+
+    Resolving the subscriptions that match a topic takes time proportional
+    to the depth of the topic instead of the number of subscriptions.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty matcher."""
+        self._root = _TopicNode()
+
+    def add(self, subscription: Subscription) -> None:
+        """Add a subscription to the index."""
+        node = self._root
+        for level in subscription.topic.split('/'):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.subscriptions.append(subscription)
+
+    def remove(self, subscription: Subscription) -> None:
+        """Remove a subscription from the index.
+
+        Raises ValueError if the subscription is not indexed.
+        """
+        path = []
+        node = self._root
+        for level in subscription.topic.split('/'):
+            child = node.children.get(level)
+            if child is None:
+                raise ValueError(subscription.topic)
+            path.append((node, level))
+            node = child
+        node.subscriptions.remove(subscription)
+
+        # Prune levels that no longer lead to a subscription.
+        for parent, level in reversed(path):
+            child = parent.children[level]
+            if child.subscriptions or child.children:
+                break
+            del parent.children[level]
+
+    def has_topic(self, topic: str) -> bool:
+        """Return True if a subscription exists for exactly this topic."""
+        node = self._root
+        for level in topic.split('/'):
+            node = node.children.get(level)
+            if node is None:
+                return False
+        return bool(node.subscriptions)
+
+    def match(self, topic: str) -> List[Subscription]:
+        """Return all subscriptions matching a topic."""
+        levels = topic.split('/')
+        depth = len(levels)
+        matches = []  # type: List[Subscription]
+        stack = [(self._root, 0)]
+
+        while stack:
+            node, index = stack.pop()
+            children = node.children
+
+            # A multi-level wildcard matches the parent level and any number
+            # of sub levels.
+            wildcard = children.get('#')
+            if wildcard is not None:
+                matches.extend(wildcard.subscriptions)
+
+            if index == depth:
+                matches.extend(node.subscriptions)
+                continue
+
+            level = levels[index]
+            child = children.get(level)
+            if child is not None:
+                stack.append((child, index + 1))
+
+            # A single-level wildcard only matches non-empty levels.
+            if level:
+                child = children.get('+')
+                if child is not None:
+                    stack.append((child, index + 1))
+
+        return matches
+
+
 class MQTT(object):
     """Home Assistant MQTT client."""
 
@@ -467,6 +565,7 @@ class MQTT(object):
         self.port = port
         self.keepalive = keepalive
         self.subscriptions = []  # type: List[Subscription]
+        self._matcher = TopicMatcher()
         self.birth_message = birth_message
         self._mqttc = None  # type: mqtt.Client
         self._paho_lock = asyncio.Lock(loop=hass.loop)
@@ -555,6 +654,7 @@ class MQTT(object):
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._matcher.add(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -564,8 +664,9 @@ class MQTT(object):
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._matcher.remove(subscription)
 
-            if any(other.topic == topic for other in self.subscriptions):
+            if self._matcher.has_topic(topic):
                 # Other subscriptions on topic remaining - don't unsubscribe.
                 return
             self.hass.async_add_job(self._async_unsubscribe(topic))
@@ -628,10 +729,7 @@ class MQTT(object):
     def _mqtt_handle_message(self, msg) -> None:
         _LOGGER.debug("Received message on %s: %s", msg.topic, msg.payload)
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
-
+        for subscription in self._matcher.match(msg.topic):
             payload = msg.payload  # type: SubscribePayloadType
             if subscription.encoding is not None:
                 try:
@@ -680,27 +778,6 @@ def _raise_on_error(result_code: int) -> None:
             'Error talking to MQTT: {}'.format(mqtt.error_string(result_code)))
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    reg_ex_parts = []  # type: List[str]
-    suffix = ""
-    if subscription.endswith('#'):
-        subscription = subscription[:-2]
-        suffix = "(.*)"
-    sub_parts = subscription.split('/')
-    for sub_part in sub_parts:
-        if sub_part == "+":
-            reg_ex_parts.append(r"([^\/]+)")
-        else:
-            reg_ex_parts.append(re.escape(sub_part))
-
-    reg_ex = "^" + (r'\/'.join(reg_ex_parts)) + suffix + "$"
-
-    reg = re.compile(reg_ex)
-
-    return reg.match(topic) is not None
-
-
 class MqttAvailability(Entity):
     """Mixin used for platforms that report availability."""
 
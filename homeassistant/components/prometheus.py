@@ -5,15 +5,19 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/prometheus/
 """
 import asyncio
+import gzip
 import logging
+import math
+import re
 
 import voluptuous as vol
 from aiohttp import web
+from aiohttp.hdrs import ACCEPT_ENCODING, CONTENT_ENCODING, VARY
 
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components import recorder
 from homeassistant.const import (
-    CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE,
+    CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE, CONF_MODE,
     EVENT_STATE_CHANGED, TEMP_FAHRENHEIT, CONTENT_TYPE_TEXT_PLAIN,
     ATTR_TEMPERATURE, ATTR_UNIT_OF_MEASUREMENT)
 from homeassistant import core as hacore
@@ -29,8 +33,17 @@ API_ENDPOINT = '/api/prometheus'
 DOMAIN = 'prometheus'
 DEPENDENCIES = ['http']
 
+MODE_COLLECTOR = 'collector'
+MODE_EVENTS = 'events'
+
+# Seconds a collector render is served to further scrapes
+RENDER_CACHE_TIME = 5
+
 CONFIG_SCHEMA = vol.Schema({
-    DOMAIN: recorder.FILTER_SCHEMA,
+    DOMAIN: recorder.FILTER_SCHEMA.extend({
+        vol.Optional(CONF_MODE, default=MODE_EVENTS):
+            vol.In([MODE_EVENTS, MODE_COLLECTOR]),
+    }),
 }, extra=vol.ALLOW_EXTRA)
 
 
@@ -38,27 +51,172 @@ def setup(hass, config):
     """Activate Prometheus component."""
     import prometheus_client
 
-    hass.http.register_view(PrometheusView(prometheus_client))
-
     conf = config.get(DOMAIN, {})
     exclude = conf.get(CONF_EXCLUDE, {})
     include = conf.get(CONF_INCLUDE, {})
-    metrics = Metrics(prometheus_client, exclude, include)
+    is_included = _entity_filter(exclude, include)
+
+    if conf.get(CONF_MODE) == MODE_COLLECTOR:
+        collector = StateCollector(hass, prometheus_client, is_included)
+        hass.http.register_view(PrometheusView(prometheus_client, collector))
+        hass.bus.listen(EVENT_STATE_CHANGED, collector.async_handle_event)
+        return True
+
+    hass.http.register_view(PrometheusView(prometheus_client))
+    metrics = Metrics(prometheus_client, is_included)
 
     hass.bus.listen(EVENT_STATE_CHANGED, metrics.handle_event)
     return True
 
 
+def _entity_filter(exclude, include):
+    """Return a function telling if an entity id is exported."""
+    exclude = exclude.get(CONF_ENTITIES, []) + exclude.get(CONF_DOMAINS, [])
+    include_domains = include.get(CONF_DOMAINS, [])
+    include_entities = include.get(CONF_ENTITIES, [])
+
+    def is_included(entity_id):
+        """Return True if the entity should be exported."""
+        domain, _ = hacore.split_entity_id(entity_id)
+
+        if entity_id in exclude:
+            return False
+        if domain in exclude and entity_id not in include_entities:
+            return False
+        if include_domains and domain not in include_domains:
+            return False
+        if not exclude and (include_entities and
+                            entity_id not in include_entities):
+            return False
+        return True
+
+    return is_included
+
+
+def _battery_samples(state):
+    if 'battery_level' in state.attributes:
+        try:
+            value = float(state.attributes['battery_level'])
+        except ValueError:
+            return []
+        return [('battery_level_percent',
+                 'Battery level as a percentage of its capacity', value)]
+    return []
+
+
+def _binary_sensor_samples(state):
+    return [('binary_sensor_state', 'State of the binary sensor (0/1)',
+             state_helper.state_as_number(state))]
+
+
+def _device_tracker_samples(state):
+    return [('device_tracker_state', 'State of the device tracker (0/1)',
+             state_helper.state_as_number(state))]
+
+
+def _light_samples(state):
+    try:
+        if 'brightness' in state.attributes:
+            value = state.attributes['brightness'] / 255.0
+        else:
+            value = state_helper.state_as_number(state)
+        value = value * 100
+    except ValueError:
+        return []
+    return [('light_state', 'Load level of a light (0..1)', value)]
+
+
+def _lock_samples(state):
+    return [('lock_state', 'State of the lock (0/1)',
+             state_helper.state_as_number(state))]
+
+
+def _climate_samples(state):
+    samples = []
+
+    temp = state.attributes.get(ATTR_TEMPERATURE)
+    if temp:
+        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+        if unit == TEMP_FAHRENHEIT:
+            temp = fahrenheit_to_celsius(temp)
+        samples.append(
+            ('temperature_c', 'Temperature in degrees Celsius', temp))
+
+    try:
+        samples.append(('climate_state', 'State of the thermostat (0/1)',
+                        state_helper.state_as_number(state)))
+    except ValueError:
+        pass
+
+    return samples
+
+
+def _sensor_samples(state):
+    samples = []
+
+    unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+    metric = state.entity_id.split(".")[1]
+
+    if '_' not in str(metric):
+        metric = state.entity_id.replace('.', '_')
+
+    try:
+        int(metric.split("_")[-1])
+        metric = "_".join(metric.split("_")[:-1])
+    except ValueError:
+        pass
+
+    try:
+        value = state_helper.state_as_number(state)
+        if unit == TEMP_FAHRENHEIT:
+            value = fahrenheit_to_celsius(value)
+        samples.append((metric, state.entity_id, value))
+    except ValueError:
+        pass
+
+    return samples + _battery_samples(state)
+
+
+def _switch_samples(state):
+    try:
+        return [('switch_state', 'State of the switch (0/1)',
+                 state_helper.state_as_number(state))]
+    except ValueError:
+        return []
+
+
+# Gauge samples, (metric, documentation, value), of the states of a domain
+STATE_SAMPLES = {
+    'binary_sensor': _binary_sensor_samples,
+    'climate': _climate_samples,
+    'device_tracker': _device_tracker_samples,
+    'light': _light_samples,
+    'lock': _lock_samples,
+    'sensor': _sensor_samples,
+    'switch': _switch_samples,
+    'zwave': _battery_samples,
+}
+
+AUTOMATION_METRIC = 'automation_triggered_count'
+AUTOMATION_DOCUMENTATION = 'Count of times an automation has been triggered'
+
+METRIC_NAME = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*\Z')
+
+
+def _labels(state):
+    return {
+        'entity': state.entity_id,
+        'friendly_name': state.attributes.get('friendly_name'),
+    }
+
+
 class Metrics(object):
     """Model all of the metrics which should be exposed to Prometheus."""
 
-    def __init__(self, prometheus_client, exclude, include):
+    def __init__(self, prometheus_client, is_included):
         """Initialize Prometheus Metrics."""
         self.prometheus_client = prometheus_client
-        self.exclude = exclude.get(CONF_ENTITIES, []) + \
-            exclude.get(CONF_DOMAINS, [])
-        self.include_domains = include.get(CONF_DOMAINS, [])
-        self.include_entities = include.get(CONF_ENTITIES, [])
+        self.is_included = is_included
         self._metrics = {}
 
     def handle_event(self, event):
@@ -69,22 +227,26 @@ class Metrics(object):
 
         entity_id = state.entity_id
         _LOGGER.debug("Handling state update for %s", entity_id)
-        domain, _ = hacore.split_entity_id(entity_id)
 
-        if entity_id in self.exclude:
-            return
-        if domain in self.exclude and entity_id not in self.include_entities:
+        if not self.is_included(entity_id):
             return
-        if self.include_domains and domain not in self.include_domains:
-            return
-        if not self.exclude and (self.include_entities and
-                                 entity_id not in self.include_entities):
+
+        if state.domain == 'automation':
+            metric = self._metric(
+                AUTOMATION_METRIC,
+                self.prometheus_client.Counter,
+                AUTOMATION_DOCUMENTATION,
+            )
+            metric.labels(**_labels(state)).inc()
             return
 
-        handler = '_handle_{}'.format(domain)
+        samples = STATE_SAMPLES.get(state.domain)
+        if samples is None:
+            return
 
-        if hasattr(self, handler):
-            getattr(self, handler)(state)
+        for metric, documentation, value in samples(state):
+            self._metric(metric, self.prometheus_client.Gauge,
+                         documentation).labels(**_labels(state)).set(value)
 
     def _metric(self, metric, factory, documentation, labels=None):
         if labels is None:
@@ -96,141 +258,176 @@ class Metrics(object):
             self._metrics[metric] = factory(metric, documentation, labels)
             return self._metrics[metric]
 
-    @staticmethod
-    def _labels(state):
-        return {
-            'entity': state.entity_id,
-            'friendly_name': state.attributes.get('friendly_name'),
-        }
 
-    def _battery(self, state):
-        if 'battery_level' in state.attributes:
-            metric = self._metric(
-                'battery_level_percent',
-                self.prometheus_client.Gauge,
-                'Battery level as a percentage of its capacity',
-            )
-            try:
-                value = float(state.attributes['battery_level'])
-                metric.labels(**self._labels(state)).set(value)
-            except ValueError:
-                pass
-
-    def _handle_binary_sensor(self, state):
-        metric = self._metric(
-            'binary_sensor_state',
-            self.prometheus_client.Gauge,
-            'State of the binary sensor (0/1)',
-        )
-        value = state_helper.state_as_number(state)
-        metric.labels(**self._labels(state)).set(value)
-
-    def _handle_device_tracker(self, state):
-        metric = self._metric(
-            'device_tracker_state',
-            self.prometheus_client.Gauge,
-            'State of the device tracker (0/1)',
-        )
-        value = state_helper.state_as_number(state)
-        metric.labels(**self._labels(state)).set(value)
+def _escape_label(value):
+    """Escape a label value for the text exposition format."""
+    return str(value).replace('\\', '\\\\').replace(
+        '"', '\\"').replace('\n', '\\n')
 
-    def _handle_light(self, state):
-        metric = self._metric(
-            'light_state',
-            self.prometheus_client.Gauge,
-            'Load level of a light (0..1)',
-        )
 
-        try:
-            if 'brightness' in state.attributes:
-                value = state.attributes['brightness'] / 255.0
-            else:
-                value = state_helper.state_as_number(state)
-            value = value * 100
-            metric.labels(**self._labels(state)).set(value)
-        except ValueError:
-            pass
-
-    def _handle_lock(self, state):
-        metric = self._metric(
-            'lock_state',
-            self.prometheus_client.Gauge,
-            'State of the lock (0/1)',
-        )
-        value = state_helper.state_as_number(state)
-        metric.labels(**self._labels(state)).set(value)
-
-    def _handle_climate(self, state):
-        temp = state.attributes.get(ATTR_TEMPERATURE)
-        if temp:
-            unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
-            if unit == TEMP_FAHRENHEIT:
-                temp = fahrenheit_to_celsius(temp)
-            metric = self._metric(
-                'temperature_c', self.prometheus_client.Gauge,
-                'Temperature in degrees Celsius')
-            metric.labels(**self._labels(state)).set(temp)
+def _format_value(value):
+    """Format a sample value like prometheus_client does."""
+    value = float(value)
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(value)
 
-        metric = self._metric(
-            'climate_state', self.prometheus_client.Gauge,
-            'State of the thermostat (0/1)')
-        try:
-            value = state_helper.state_as_number(state)
-            metric.labels(**self._labels(state)).set(value)
-        except ValueError:
-            pass
-
-    def _handle_sensor(self, state):
 
-        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
-        metric = state.entity_id.split(".")[1]
+class StateCollector(object):
+    """Render the metrics from the state machine when Prometheus scrapes.
 
-        if '_' not in str(metric):
-            metric = state.entity_id.replace('.', '_')
+    Nothing is kept per entity between scrapes except the automation
+    trigger counts, which can not be read from the states. A render is
+    generated in the executor and served to every scrape for
+    RENDER_CACHE_TIME seconds.
+    """
 
-        try:
-            int(metric.split("_")[-1])
-            metric = "_".join(metric.split("_")[:-1])
-        except ValueError:
-            pass
+    def __init__(self, hass, prometheus_client, is_included):
+        """Initialize the collector."""
+        self.hass = hass
+        self.prometheus_client = prometheus_client
+        self.is_included = is_included
+        self._automation_counts = {}
+        self._render = None
+        self._rendered_at = None
+        self._gzip = None
+        self._skipped = set()
+
+    @hacore.callback
+    def async_handle_event(self, event):
+        """Count automation triggers."""
+        state = event.data.get('new_state')
+        if state is None or state.domain != 'automation' or \
+                not self.is_included(state.entity_id):
+            return
 
-        _metric = self._metric(metric, self.prometheus_client.Gauge,
-                               state.entity_id)
+        key = (state.entity_id, state.attributes.get('friendly_name'))
+        self._automation_counts[key] = \
+            self._automation_counts.get(key, 0) + 1
+
+    def render(self, states, automation_counts):
+        """Render states in the text exposition format."""
+        registry = self.prometheus_client.generate_latest()
+        # Names taken by other families can not be used by state samples
+        reserved = {line.split()[2].decode('utf-8')
+                    for line in registry.splitlines()
+                    if line.startswith(b'# TYPE ')}
+        reserved.add(AUTOMATION_METRIC)
+        metrics = {}
+        sensor_values = []
+
+        for state in states:
+            samples = STATE_SAMPLES.get(state.domain)
+            if samples is None or not self.is_included(state.entity_id):
+                continue
 
-        try:
-            value = state_helper.state_as_number(state)
-            if unit == TEMP_FAHRENHEIT:
-                value = fahrenheit_to_celsius(value)
-            _metric.labels(**self._labels(state)).set(value)
-        except ValueError:
-            pass
-
-        self._battery(state)
+            try:
+                samples = samples(state)
+            except ValueError:
+                continue
+
+            labels = None
+            for metric, documentation, value in samples:
+                try:
+                    value = _format_value(value)
+                except (TypeError, ValueError):
+                    continue
+
+                if labels is None:
+                    labels = '{{entity="{}",friendly_name="{}"}}'.format(
+                        _escape_label(state.entity_id), _escape_label(
+                            state.attributes.get('friendly_name')))
+
+                sample = (state.entity_id, metric, documentation,
+                          '{}{} {}'.format(metric, labels, value))
+                if documentation == state.entity_id:
+                    # Sensor values are documented by the entity, their
+                    # families are added last so they can't take over others
+                    sensor_values.append(sample)
+                else:
+                    self._add_sample(metrics, reserved, documentation,
+                                     *sample)
+
+        for sample in sensor_values:
+            self._add_sample(metrics, reserved, None, *sample)
+
+        metrics = {metric: ('gauge', documentation, lines)
+                   for metric, (_, documentation, lines) in metrics.items()}
+
+        if automation_counts:
+            metrics[AUTOMATION_METRIC] = (
+                'counter', AUTOMATION_DOCUMENTATION, [
+                    '{}{{entity="{}",friendly_name="{}"}} {}'.format(
+                        AUTOMATION_METRIC, _escape_label(entity_id),
+                        _escape_label(friendly_name), float(count))
+                    for (entity_id, friendly_name), count
+                    in sorted(automation_counts.items(), key=str)])
+
+        output = []
+        for metric, (metric_type, documentation, lines) in metrics.items():
+            output.append('# HELP {} {}'.format(
+                metric, documentation.replace('\\', '\\\\').replace(
+                    '\n', '\\n')))
+            output.append('# TYPE {} {}'.format(metric, metric_type))
+            output.extend(lines)
+        output.append('')
+
+        return registry + '\n'.join(output).encode('utf-8')
+
+    def _add_sample(self, metrics, reserved, kind, entity_id, metric,
+                    documentation, line):
+        """Add a sample line unless its metric name can't be used.
+
+        Samples share a family when they have the same kind; the first
+        sample documents the family.
+        """
+        family = metrics.get(metric)
+        if family is None and metric not in reserved and \
+                METRIC_NAME.match(metric):
+            family = metrics[metric] = (kind, documentation, [])
+        elif family is None or family[0] != kind:
+            if (entity_id, metric) not in self._skipped:
+                self._skipped.add((entity_id, metric))
+                _LOGGER.warning(
+                    "Not exporting %s as %s, the name is invalid or used by "
+                    "another metric", entity_id, metric)
+            return
 
-    def _handle_switch(self, state):
-        metric = self._metric(
-            'switch_state',
-            self.prometheus_client.Gauge,
-            'State of the switch (0/1)',
-        )
+        family[2].append(line)
 
+    @asyncio.coroutine
+    def async_render(self, compress):
+        """Return the exposition text, gzip compressed if compress."""
+        now = self.hass.loop.time()
+        if self._render is None or \
+                now - self._rendered_at >= RENDER_CACHE_TIME:
+            self._rendered_at = now
+            self._gzip = None
+            self._render = self.hass.async_add_job(
+                self.render, self.hass.states.async_all(),
+                dict(self._automation_counts))
+
+        render = self._render
         try:
-            value = state_helper.state_as_number(state)
-            metric.labels(**self._labels(state)).set(value)
-        except ValueError:
-            pass
+            body = yield from asyncio.shield(render)
+        except Exception:
+            if self._render is render:
+                self._render = None
+            raise
 
-    def _handle_zwave(self, state):
-        self._battery(state)
+        if not compress:
+            return body
 
-    def _handle_automation(self, state):
-        metric = self._metric(
-            'automation_triggered_count',
-            self.prometheus_client.Counter,
-            'Count of times an automation has been triggered',
-        )
+        if render is not self._render:
+            return (yield from self.hass.async_add_job(gzip.compress, body))
 
-        metric.labels(**self._labels(state)).inc()
+        if self._gzip is None:
+            self._gzip = self.hass.async_add_job(gzip.compress, body)
+        return (yield from asyncio.shield(self._gzip))
 
 
 class PrometheusView(HomeAssistantView):
@@ -239,15 +436,27 @@ class PrometheusView(HomeAssistantView):
     url = API_ENDPOINT
     name = 'api:prometheus'
 
-    def __init__(self, prometheus_client):
+    def __init__(self, prometheus_client, collector=None):
         """Initialize Prometheus view."""
         self.prometheus_client = prometheus_client
+        self.collector = collector
 
     @asyncio.coroutine
     def get(self, request):
         """Handle request for Prometheus metrics."""
         _LOGGER.debug("Received Prometheus metrics request")
 
+        if self.collector is None:
+            body = yield from request.app['hass'].async_add_job(
+                self.prometheus_client.generate_latest)
+            return web.Response(
+                body=body, content_type=CONTENT_TYPE_TEXT_PLAIN)
+
+        compress = 'gzip' in request.headers.get(ACCEPT_ENCODING, '')
+        body = yield from self.collector.async_render(compress)
+        headers = {VARY: ACCEPT_ENCODING}
+        if compress:
+            headers[CONTENT_ENCODING] = 'gzip'
+
         return web.Response(
-            body=self.prometheus_client.generate_latest(),
-            content_type=CONTENT_TYPE_TEXT_PLAIN)
+            body=body, content_type=CONTENT_TYPE_TEXT_PLAIN, headers=headers)
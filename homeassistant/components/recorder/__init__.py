@@ -58,6 +58,11 @@ CONF_DB_URL = 'db_url'
 CONF_PURGE_KEEP_DAYS = 'purge_keep_days'
 CONF_PURGE_INTERVAL = 'purge_interval'
 CONF_EVENT_TYPES = 'event_types'
+CONF_COMMIT_INTERVAL = 'commit_interval'
+CONF_MAX_BATCH_SIZE = 'max_batch_size'
+
+DEFAULT_COMMIT_INTERVAL = 0
+DEFAULT_MAX_BATCH_SIZE = 1
 
 CONNECT_RETRY_WAIT = 3
 
@@ -80,6 +85,10 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_INTERVAL, default=1):
             vol.All(vol.Coerce(int), vol.Range(min=0)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MAX_BATCH_SIZE, default=DEFAULT_MAX_BATCH_SIZE):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
     })
 }, extra=vol.ALLOW_EXTRA)
 
@@ -117,6 +126,8 @@ def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     conf = config.get(DOMAIN, {})
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_interval = conf.get(CONF_COMMIT_INTERVAL, DEFAULT_COMMIT_INTERVAL)
+    max_batch_size = conf.get(CONF_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE)
 
     db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
@@ -127,7 +138,8 @@ def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     exclude = conf.get(CONF_EXCLUDE, {})
     instance = hass.data[DATA_INSTANCE] = Recorder(
         hass=hass, keep_days=keep_days, purge_interval=purge_interval,
-        uri=db_url, include=include, exclude=exclude)
+        uri=db_url, include=include, exclude=exclude,
+        commit_interval=commit_interval, max_batch_size=max_batch_size)
     instance.async_initialize()
     instance.start()
 
@@ -151,19 +163,25 @@ class Recorder(threading.Thread):
 
     def __init__(self, hass: HomeAssistant, keep_days: int,
                  purge_interval: int, uri: str,
-                 include: Dict, exclude: Dict) -> None:
+                 include: Dict, exclude: Dict,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name='Recorder')
 
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
         self.queue = queue.Queue()  # type: Any
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
         self.async_db_ready = asyncio.Future(loop=hass.loop)
         self.engine = None  # type: Any
         self.run_info = None  # type: Any
+        # Number of purges done, lets readers drop results of purged data
+        self.purge_count = 0
 
         self.entity_filter = generate_filter(
             include.get(CONF_DOMAINS, []), include.get(CONF_ENTITIES, []),
@@ -186,7 +204,7 @@ class Recorder(threading.Thread):
 
     def run(self):
         """Start processing events to save."""
-        from .models import States, Events
+        from .models import Events
         from homeassistant.components import persistent_notification
         from sqlalchemy import exc
 
@@ -278,8 +296,14 @@ class Recorder(threading.Thread):
 
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
+        # Control task received while collecting a batch
+        pending = []
+
         while True:
-            event = self.queue.get()
+            if pending:
+                event = pending.pop()
+            else:
+                event = self.queue.get()
 
             if event is None:
                 self._close_run()
@@ -288,36 +312,40 @@ class Recorder(threading.Thread):
                 return
             elif isinstance(event, PurgeTask):
                 purge.purge_old_data(self, event.keep_days, event.repack)
+                self.purge_count += 1
                 self.queue.task_done()
                 continue
-            elif event.event_type == EVENT_TIME_CHANGED:
-                self.queue.task_done()
-                continue
-            elif event.event_type in self.exclude_t:
+            elif not self._should_record(event):
                 self.queue.task_done()
                 continue
 
-            entity_id = event.data.get(ATTR_ENTITY_ID)
-            if entity_id is not None:
-                if not self.entity_filter(entity_id):
+            # Collect more events for the same transaction until the batch
+            # is full, the commit interval passed or a control task arrives.
+            events = [event]
+            deadline = time.monotonic() + self.commit_interval
+            while len(events) < self.max_batch_size:
+                try:
+                    event = self.queue.get(
+                        timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+                if event is None or isinstance(event, PurgeTask):
+                    pending.append(event)
+                    break
+                elif not self._should_record(event):
                     self.queue.task_done()
                     continue
 
+                events.append(event)
+
             tries = 1
             updated = False
             while not updated and tries <= 10:
                 if tries != 1:
                     time.sleep(CONNECT_RETRY_WAIT)
                 try:
-                    with session_scope(session=self.get_session()) as session:
-                        dbevent = Events.from_event(event)
-                        session.add(dbevent)
-                        session.flush()
-
-                        if event.event_type == EVENT_STATE_CHANGED:
-                            dbstate = States.from_event(event)
-                            dbstate.event_id = dbevent.event_id
-                            session.add(dbstate)
+                    self._save_events(events)
                     updated = True
 
                 except exc.OperationalError as err:
@@ -328,9 +356,37 @@ class Recorder(threading.Thread):
 
             if not updated:
                 _LOGGER.error("Error in database update. Could not save "
-                              "after %d tries. Giving up", tries)
+                              "%d events after %d tries. Giving up",
+                              len(events), tries)
+
+            for _ in events:
+                self.queue.task_done()
+
+    def _should_record(self, event):
+        """Return True if an event should be written to the database."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return False
+        elif event.event_type in self.exclude_t:
+            return False
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        return entity_id is None or self.entity_filter(entity_id)
+
+    def _save_events(self, events):
+        """Write a batch of events in a single transaction."""
+        from .models import States, Events
+
+        with session_scope(session=self.get_session()) as session:
+            dbevents = [Events.from_event(event) for event in events]
+            session.add_all(dbevents)
+            # Flush to get the event ids the states refer to
+            session.flush()
 
-            self.queue.task_done()
+            for event, dbevent in zip(events, dbevents):
+                if event.event_type == EVENT_STATE_CHANGED:
+                    dbstate = States.from_event(event)
+                    dbstate.event_id = dbevent.event_id
+                    session.add(dbstate)
 
     @callback
     def event_listener(self, event):
@@ -2,6 +2,7 @@
 import json
 from datetime import datetime
 import logging
+from types import MappingProxyType
 
 from sqlalchemy import (
     Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text,
@@ -94,8 +95,7 @@ class States(Base):   # type: ignore
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes),
-                                            cls=JSONEncoder)
+            dbstate.attributes = state.attributes_json()
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -164,11 +164,75 @@ class SchemaChanges(Base):   # type: ignore
     changed = Column(DateTime(timezone=True), default=datetime.utcnow)
 
 
+class LazyState(State):
+    """A native State built from selected columns of a States row.
+
+    The attributes are only decoded when they are used. Serializing the
+    state reuses the stored attributes JSON after checking that it parses,
+    without keeping the decoded attributes.
+    """
+
+    __slots__ = ['_attributes', '_attributes_valid']
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, entity_id, state, attributes_json, last_changed,
+                 last_updated):
+        """Initialize the state without validating the recorded data."""
+        self.entity_id = entity_id
+        self.state = state
+        self.last_changed = last_changed
+        self.last_updated = last_updated
+        self._as_json = None
+        self._attributes_json = attributes_json
+        self._attributes = None
+        self._attributes_valid = False
+
+    @classmethod
+    def from_row(cls, row):
+        """Create a state from a row selected with state_columns()."""
+        return cls(row[0], row[1], row[2] or '{}',
+                   _process_timestamp(row[3]), _process_timestamp(row[4]))
+
+    @property
+    def attributes(self):
+        """Return the decoded attributes."""
+        if self._attributes is None:
+            self._attributes = MappingProxyType(self._decode_attributes())
+        return self._attributes
+
+    def attributes_json(self):
+        """Return the stored attributes JSON once it is known to parse."""
+        if not self._attributes_valid:
+            self._decode_attributes()
+        return self._attributes_json
+
+    def _decode_attributes(self):
+        """Decode the stored attributes, replacing corrupt ones by {}."""
+        try:
+            attributes = json.loads(self._attributes_json)
+            if not isinstance(attributes, dict):
+                raise ValueError("Attributes are not an object")
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state: %s",
+                              self.entity_id)
+            attributes = {}
+            self._attributes_json = '{}'
+        self._attributes_valid = True
+        return attributes
+
+
+def state_columns():
+    """Return the States columns that make up a LazyState."""
+    return (States.entity_id, States.state, States.attributes,
+            States.last_changed, States.last_updated)
+
+
 def _process_timestamp(ts):
     """Process a timestamp into datetime object."""
     if ts is None:
         return None
     elif ts.tzinfo is None:
-        return dt_util.UTC.localize(ts)
+        return ts.replace(tzinfo=dt_util.UTC)
 
     return dt_util.as_utc(ts)
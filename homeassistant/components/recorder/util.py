@@ -9,6 +9,7 @@ _LOGGER = logging.getLogger(__name__)
 
 RETRIES = 3
 QUERY_RETRY_WAIT = 0.1
+STREAM_BATCH_SIZE = 1000
 
 
 @contextmanager
@@ -78,3 +79,49 @@ def execute(qry):
                 raise
             else:
                 time.sleep(QUERY_RETRY_WAIT)
+
+
+def execute_stream(qry, to_native=None):
+    """Query the database and yield the rows in HA native form.
+
+    Rows are fetched from the cursor in batches instead of all at once and
+    converted one by one, so memory use does not grow with the size of the
+    result. The generator has to be consumed while the session is open.
+    to_native converts a row and defaults to the to_native method of the
+    model, use it for queries that select columns.
+
+    Like execute, the query is retried a few times in the case of stale
+    connections, as long as no row was yielded yet.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+
+    if to_native is None:
+        def to_native(row):
+            """Convert a model instance."""
+            return row.to_native()
+
+    for tryno in range(0, RETRIES):
+        timer_start = time.perf_counter()
+        count = 0
+
+        try:
+            for row in qry.yield_per(STREAM_BATCH_SIZE):
+                native = to_native(row)
+                if native is not None:
+                    count += 1
+                    yield native
+        except SQLAlchemyError as err:
+            _LOGGER.error("Error executing query: %s", err)
+
+            # Rows that were handed out can not be taken back
+            if count or tryno == RETRIES - 1:
+                raise
+            else:
+                time.sleep(QUERY_RETRY_WAIT)
+                continue
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug('streaming %d rows as native objects took %fs',
+                          count, elapsed)
+        return
@@ -5,7 +5,7 @@ For more details about this platform, please refer to the documentation at
 https://home-assistant.io/components/sensor.filter/
 """
 import logging
-import statistics
+import math
 from collections import deque, Counter
 from numbers import Number
 from functools import partial
@@ -25,6 +25,7 @@ from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import async_track_state_change
 import homeassistant.components.history as history
 import homeassistant.util.dt as dt_util
+from homeassistant.util.rolling import RollingStatistics, TimeWeightedWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -256,6 +257,11 @@ class FilterState(object):
             self.state = float(state.state)
         except ValueError:
             self.state = state.state
+        else:
+            # The windows keep running sums a NaN would poison
+            if not math.isfinite(self.state):
+                raise ValueError(
+                    "{} is not a finite number".format(state.state))
 
     def set_precision(self, precision):
         """Set precision of Number based states."""
@@ -338,12 +344,12 @@ class OutlierFilter(Filter):
         super().__init__(FILTER_NAME_OUTLIER, window_size, precision, entity)
         self._radius = radius
         self._stats_internal = Counter()
+        self._window = RollingStatistics(maxlen=window_size)
 
     def _filter_state(self, new_state):
         """Implement the outlier filter."""
         if (len(self.states) == self.states.maxlen and
-                abs(new_state.state -
-                    statistics.median([s.state for s in self.states])) >
+                abs(new_state.state - self._window.median()) >
                 self._radius):
 
             self._stats_internal['erasures'] += 1
@@ -354,6 +360,12 @@ class OutlierFilter(Filter):
             return self.states[-1]
         return new_state
 
+    def filter_state(self, new_state):
+        """Filter the state and keep the median window in step."""
+        new_state = super().filter_state(new_state)
+        self._window.append(self.states[-1].state)
+        return new_state
+
 
 @FILTERS.register(FILTER_NAME_LOWPASS)
 class LowPassFilter(Filter):
@@ -395,32 +407,12 @@ class TimeSMAFilter(Filter):
         """Initialize Filter."""
         super().__init__(FILTER_NAME_TIME_SMA, window_size, precision, entity)
         self._time_window = window_size
-        self.last_leak = None
-        self.queue = deque()
-
-    def _leak(self, left_boundary):
-        """Remove timeouted elements."""
-        while self.queue:
-            if self.queue[0].timestamp + self._time_window <= left_boundary:
-                self.last_leak = self.queue.popleft()
-            else:
-                return
+        self._window = TimeWeightedWindow(window_size)
 
     def _filter_state(self, new_state):
         """Implement the Simple Moving Average filter."""
-        self._leak(new_state.timestamp)
-        self.queue.append(copy(new_state))
-
-        moving_sum = 0
-        start = new_state.timestamp - self._time_window
-        prev_state = self.last_leak or self.queue[0]
-        for state in self.queue:
-            moving_sum += (state.timestamp-start).total_seconds()\
-                          * prev_state.state
-            start = state.timestamp
-            prev_state = state
-
-        new_state.state = moving_sum / self._time_window.total_seconds()
+        self._window.append(new_state.timestamp, new_state.state)
+        new_state.state = self._window.average(new_state.timestamp)
 
         return new_state
 
@@ -7,7 +7,6 @@ https://home-assistant.io/components/sensor.statistics/
 import asyncio
 import logging
 import statistics
-from collections import deque
 
 import voluptuous as vol
 
@@ -19,6 +18,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import async_track_state_change
 from homeassistant.util import dt as dt_util
+from homeassistant.util.rolling import RollingStatistics, RollingWindow
 from homeassistant.components.recorder.util import session_scope, execute
 
 _LOGGER = logging.getLogger(__name__)
@@ -83,9 +83,9 @@ class StatisticsSensor(Entity):
         self._sampling_size = sampling_size
         self._max_age = max_age
         self._unit_of_measurement = None
-        self.states = deque(maxlen=self._sampling_size)
+        self.states = RollingStatistics(maxlen=self._sampling_size)
         if self._max_age is not None:
-            self.ages = deque(maxlen=self._sampling_size)
+            self.ages = RollingWindow(maxlen=self._sampling_size)
 
         self.median = self.mean = self.variance = self.stdev = 0
         self.min = self.max = self.total = self.count = 0
@@ -185,31 +185,31 @@ class StatisticsSensor(Entity):
 
         if not self.is_binary:
             try:  # require only one data point
-                self.mean = round(statistics.mean(self.states), 2)
-                self.median = round(statistics.median(self.states), 2)
+                self.mean = round(self.states.mean(), 2)
+                self.median = round(self.states.median(), 2)
             except statistics.StatisticsError as err:
                 _LOGGER.error(err)
                 self.mean = self.median = STATE_UNKNOWN
 
             try:  # require at least two data points
-                self.stdev = round(statistics.stdev(self.states), 2)
-                self.variance = round(statistics.variance(self.states), 2)
+                self.stdev = round(self.states.stdev(), 2)
+                self.variance = round(self.states.variance(), 2)
             except statistics.StatisticsError as err:
                 _LOGGER.error(err)
                 self.stdev = self.variance = STATE_UNKNOWN
 
             if self.states:
                 self.count = len(self.states)
-                self.total = round(sum(self.states), 2)
-                self.min = min(self.states)
-                self.max = max(self.states)
+                self.total = round(self.states.total(), 2)
+                self.min = self.states.min()
+                self.max = self.states.max()
                 self.change = self.states[-1] - self.states[0]
                 self.average_change = self.change
                 if len(self.states) > 1:
                     self.average_change /= len(self.states) - 1
                 if self._max_age is not None:
-                    self.max_age = max(self.ages)
-                    self.min_age = min(self.ages)
+                    self.max_age = self.ages.max()
+                    self.min_age = self.ages.min()
             else:
                 self.min = self.max = self.total = STATE_UNKNOWN
                 self.average_change = self.change = STATE_UNKNOWN
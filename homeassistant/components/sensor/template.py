@@ -14,12 +14,12 @@ from homeassistant.components.sensor import ENTITY_ID_FORMAT, PLATFORM_SCHEMA
 from homeassistant.const import (
     ATTR_FRIENDLY_NAME, ATTR_UNIT_OF_MEASUREMENT, CONF_VALUE_TEMPLATE,
     CONF_ICON_TEMPLATE, CONF_ENTITY_PICTURE_TEMPLATE, ATTR_ENTITY_ID,
-    CONF_SENSORS, EVENT_HOMEASSISTANT_START, CONF_FRIENDLY_NAME_TEMPLATE,
-    MATCH_ALL)
+    CONF_SENSORS, EVENT_HOMEASSISTANT_START, CONF_FRIENDLY_NAME_TEMPLATE)
 from homeassistant.exceptions import TemplateError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    TemplateDependencyTracker, async_track_state_change)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,28 +53,13 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
         friendly_name_template = device_config.get(CONF_FRIENDLY_NAME_TEMPLATE)
         unit_of_measurement = device_config.get(ATTR_UNIT_OF_MEASUREMENT)
 
-        entity_ids = set()
-        manual_entity_ids = device_config.get(ATTR_ENTITY_ID)
+        # Without entity ids the states the templates read are tracked
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
 
         for template in (state_template, icon_template,
                          entity_picture_template, friendly_name_template):
-            if template is None:
-                continue
-            template.hass = hass
-
-            if entity_ids == MATCH_ALL or manual_entity_ids is not None:
-                continue
-
-            template_entity_ids = template.extract_entities()
-            if template_entity_ids == MATCH_ALL:
-                entity_ids = MATCH_ALL
-            else:
-                entity_ids |= set(template_entity_ids)
-
-        if manual_entity_ids is not None:
-            entity_ids = manual_entity_ids
-        elif entity_ids != MATCH_ALL:
-            entity_ids = list(entity_ids)
+            if template is not None:
+                template.hass = hass
 
         sensors.append(
             SensorTemplate(
@@ -116,6 +101,8 @@ class SensorTemplate(Entity):
         self._icon = None
         self._entity_picture = None
         self._entities = entity_ids
+        self._tracker = None
+        self._render_infos = []
 
     @asyncio.coroutine
     def async_added_to_hass(self):
@@ -128,8 +115,12 @@ class SensorTemplate(Entity):
         @callback
         def template_sensor_startup(event):
             """Update template on startup."""
-            async_track_state_change(
-                self.hass, self._entities, template_sensor_state_listener)
+            if self._entities is None:
+                self._tracker = TemplateDependencyTracker(
+                    self.hass, template_sensor_state_listener)
+            else:
+                async_track_state_change(
+                    self.hass, self._entities, template_sensor_state_listener)
 
             self.async_schedule_update_ha_state(True)
 
@@ -169,8 +160,9 @@ class SensorTemplate(Entity):
     @asyncio.coroutine
     def async_update(self):
         """Update the state from the template."""
+        self._render_infos = []
         try:
-            self._state = self._template.async_render()
+            self._state = self._async_render(self._template)
         except TemplateError as ex:
             if ex.args and ex.args[0].startswith(
                     "UndefinedError: 'None' has no attribute"):
@@ -189,7 +181,7 @@ class SensorTemplate(Entity):
                 continue
 
             try:
-                setattr(self, property_name, template.async_render())
+                setattr(self, property_name, self._async_render(template))
             except TemplateError as ex:
                 friendly_property_name = property_name[1:].replace('_', ' ')
                 if ex.args and ex.args[0].startswith(
@@ -206,3 +198,16 @@ class SensorTemplate(Entity):
                 except AttributeError:
                     _LOGGER.error('Could not render %s template %s: %s',
                                   friendly_property_name, self._name, ex)
+
+        if self._tracker is not None:
+            self._tracker.async_update(*self._render_infos)
+
+    def _async_render(self, template):
+        """Render a template and remember the states it depended on."""
+        info = template.async_render_info_cached()
+        self._render_infos.append(info)
+
+        if info.exception is not None:
+            raise info.exception
+
+        return info.result
@@ -15,6 +15,7 @@ from homeassistant.const import (
     CONF_SSL, CONF_HOST, CONF_NAME, CONF_PORT, CONF_TOKEN, EVENT_STATE_CHANGED)
 from homeassistant.helpers import state as state_helper
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.export import ExportThread
 from homeassistant.remote import JSONEncoder
 
 _LOGGER = logging.getLogger(__name__)
@@ -55,19 +56,21 @@ def setup(hass, config):
         uri_scheme, host, port)
     headers = {AUTHORIZATION: 'Splunk {}'.format(token)}
 
-    def splunk_event_listener(event):
-        """Listen for new messages on the bus and sends them to Splunk."""
+    session = requests.Session()
+
+    def event_to_json(event):
+        """Convert a state change to the Splunk event body."""
         state = event.data.get('new_state')
 
         if state is None:
-            return
+            return None
 
         try:
             _state = state_helper.state_as_number(state)
         except ValueError:
             _state = state.state
 
-        json_body = [
+        return [
             {
                 'domain': state.domain,
                 'entity_id': state.object_id,
@@ -78,17 +81,20 @@ def setup(hass, config):
             }
         ]
 
-        try:
-            payload = {
+    def write_batch(batch):
+        """Send a batch of events to the Splunk HTTP event collector."""
+        data = ''.join(
+            json.dumps({
                 "host": event_collector,
                 "event": json_body,
-            }
-            requests.post(event_collector,
-                          data=json.dumps(payload, cls=JSONEncoder),
-                          headers=headers, timeout=10)
-        except requests.exceptions.RequestException as error:
-            _LOGGER.exception("Error saving event to Splunk: %s", error)
-
-    hass.bus.listen(EVENT_STATE_CHANGED, splunk_event_listener)
+            }, cls=JSONEncoder)
+            for json_body in batch)
+        response = session.post(
+            event_collector, data=data, headers=headers, timeout=10)
+        response.raise_for_status()
+
+    thread = hass.data[DOMAIN] = ExportThread(hass, 'Splunk', write_batch)
+    thread.listen(EVENT_STATE_CHANGED, event_to_json)
+    thread.start()
 
     return True
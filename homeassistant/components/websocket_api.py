@@ -16,13 +16,16 @@ import voluptuous as vol
 from voluptuous.humanize import humanize_error
 
 from homeassistant.const import (
-    MATCH_ALL, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
-    __version__)
+    MATCH_ALL, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED,
+    EVENT_HOMEASSISTANT_STOP, __version__)
 from homeassistant.components import frontend
-from homeassistant.core import callback
+from homeassistant.core import Event, State, callback, split_entity_id
 from homeassistant.remote import JSONEncoder
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event_broadcast import (
+    MessageQueue, async_subscribe)
 from homeassistant.helpers.service import async_get_all_descriptions
+import homeassistant.util.json as json_util
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.http.auth import validate_password
 from homeassistant.components.http.const import KEY_AUTHENTICATED
@@ -52,7 +55,9 @@ TYPE_GET_STATES = 'get_states'
 TYPE_PING = 'ping'
 TYPE_PONG = 'pong'
 TYPE_RESULT = 'result'
+TYPE_STATE_DIFF = 'state_diff'
 TYPE_SUBSCRIBE_EVENTS = 'subscribe_events'
+TYPE_SUBSCRIBE_STATES = 'subscribe_states'
 TYPE_UNSUBSCRIBE_EVENTS = 'unsubscribe_events'
 
 _LOGGER = logging.getLogger(__name__)
@@ -68,6 +73,16 @@ SUBSCRIBE_EVENTS_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('id'): cv.positive_int,
     vol.Required('type'): TYPE_SUBSCRIBE_EVENTS,
     vol.Optional('event_type', default=MATCH_ALL): str,
+    vol.Optional('entity_ids'): cv.entity_ids,
+    vol.Optional('domains'): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional('attributes'): vol.All(cv.ensure_list, [cv.string]),
+})
+
+SUBSCRIBE_STATES_MESSAGE_SCHEMA = vol.Schema({
+    vol.Required('id'): cv.positive_int,
+    vol.Required('type'): TYPE_SUBSCRIBE_STATES,
+    vol.Optional('entity_ids'): cv.entity_ids,
+    vol.Optional('domains'): vol.All(cv.ensure_list, [cv.string]),
 })
 
 UNSUBSCRIBE_EVENTS_MESSAGE_SCHEMA = vol.Schema({
@@ -113,6 +128,7 @@ BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('id'): cv.positive_int,
     vol.Required('type'): vol.Any(TYPE_CALL_SERVICE,
                                   TYPE_SUBSCRIBE_EVENTS,
+                                  TYPE_SUBSCRIBE_STATES,
                                   TYPE_UNSUBSCRIBE_EVENTS,
                                   TYPE_GET_STATES,
                                   TYPE_GET_SERVICES,
@@ -160,6 +176,107 @@ def event_message(iden, event):
     }
 
 
+def event_message_json(iden, event):
+    """Return a serialized event message reusing the event's cached JSON."""
+    return '{{"event": {}, "id": {}, "type": "{}"}}'.format(
+        event.as_json(), iden, TYPE_EVENT)
+
+
+def state_diff_message(iden, entity_id, diff):
+    """Return a state diff message."""
+    return {
+        'id': iden,
+        'type': TYPE_STATE_DIFF,
+        'entity_id': entity_id,
+        'diff': diff,
+    }
+
+
+def state_diff(old_state, new_state):
+    """Return what changed between two states of an entity.
+
+    A new entity gets its full state, a removed one {'removed': True}.
+    Otherwise only the state, timestamps and attributes that changed are
+    included, with removed attribute keys in attributes_removed.
+    """
+    if new_state is None:
+        return {'removed': True}
+
+    if old_state is None:
+        diff = new_state.as_dict()
+        del diff['entity_id']
+        return diff
+
+    diff = {'last_updated': new_state.last_updated}
+
+    if new_state.state != old_state.state:
+        diff['state'] = new_state.state
+
+    if new_state.last_changed != old_state.last_changed:
+        diff['last_changed'] = new_state.last_changed
+
+    old_attributes = old_state.attributes
+    changed = {key: value for key, value in new_state.attributes.items()
+               if key not in old_attributes or old_attributes[key] != value}
+    if changed:
+        diff['attributes'] = changed
+
+    removed = [key for key in old_attributes
+               if key not in new_state.attributes]
+    if removed:
+        diff['attributes_removed'] = removed
+
+    return diff
+
+
+def _entity_matcher(msg):
+    """Return a test for entity ids from the filter of a subscription.
+
+    Returns None when the subscription does not filter on entities.
+    """
+    if 'entity_ids' not in msg and 'domains' not in msg:
+        return None
+
+    entity_ids = set(msg.get('entity_ids', ()))
+    domains = set(msg.get('domains', ()))
+
+    def matches(entity_id):
+        """Return if the entity id passes the filter."""
+        return isinstance(entity_id, str) and (
+            entity_id in entity_ids or
+            split_entity_id(entity_id)[0] in domains)
+
+    return matches
+
+
+class _PendingStateDiff(object):
+    """Latest state of an entity waiting to be sent as a diff."""
+
+    __slots__ = ['iden', 'entity_id', 'new_state']
+
+    def __init__(self, iden, entity_id, new_state):
+        """Initialize the pending diff."""
+        self.iden = iden
+        self.entity_id = entity_id
+        self.new_state = new_state
+
+
+def _event_with_attributes(event, attributes):
+    """Return a state_changed event with only whitelisted attributes."""
+    data = dict(event.data)
+
+    for key in ('old_state', 'new_state'):
+        state = data.get(key)
+        if state is not None:
+            data[key] = State(
+                state.entity_id, state.state,
+                {attr: value for attr, value in state.attributes.items()
+                 if attr in attributes},
+                state.last_changed, state.last_updated)
+
+    return Event(event.event_type, data, event.origin, event.time_fired)
+
+
 def error_message(iden, code, message):
     """Return an error result message."""
     return {
@@ -191,6 +308,15 @@ def result_message(iden, result=None):
     }
 
 
+def result_message_json(iden, result):
+    """Return a serialized success result message.
+
+    Cached JSON of the result, such as that of states, is reused.
+    """
+    return '{{"id": {}, "result": {}, "success": true, "type": "{}"}}'.format(
+        iden, json_util.dumps(result), TYPE_RESULT)
+
+
 async def async_setup(hass, config):
     """Initialize the websocket API."""
     hass.http.register_view(WebsocketAPIView)
@@ -219,7 +345,8 @@ class ActiveConnection:
         self.request = request
         self.wsock = None
         self.event_listeners = {}
-        self.to_write = asyncio.Queue(maxsize=MAX_PENDING_MSG, loop=hass.loop)
+        self.sent_states = {}
+        self.to_write = MessageQueue(hass.loop, MAX_PENDING_MSG)
         self._handle_task = None
         self._writer_task = None
 
@@ -239,23 +366,56 @@ class ActiveConnection:
                 message = await self.to_write.get()
                 if message is None:
                     break
+                if isinstance(message, _PendingStateDiff):
+                    message = self._render_state_diff(message)
+                    if message is None:
+                        continue
                 self.debug("Sending", message)
                 try:
-                    await self.wsock.send_json(message, dumps=JSON_DUMP)
+                    if isinstance(message, str):
+                        await self.wsock.send_str(message)
+                    else:
+                        await self.wsock.send_json(message, dumps=JSON_DUMP)
                 except TypeError as err:
                     _LOGGER.error('Unable to serialize to JSON: %s\n%s',
                                   err, message)
 
+    def _render_state_diff(self, pending):
+        """Turn a pending diff into a message against the last sent state.
+
+        Diffs are computed when written, so updates that were coalesced
+        while the client fell behind are folded into the next one.
+        """
+        sent = self.sent_states.get(pending.iden)
+        if sent is None:
+            # Unsubscribed while the diff was pending
+            return None
+
+        diff = state_diff(sent.get(pending.entity_id), pending.new_state)
+
+        if pending.new_state is None:
+            sent.pop(pending.entity_id, None)
+        else:
+            sent[pending.entity_id] = pending.new_state
+
+        return state_diff_message(pending.iden, pending.entity_id, diff)
+
     @callback
-    def send_message_outside(self, message):
+    def send_message_outside(self, message, key=None):
         """Send a message to the client outside of the main task.
 
-        Closes connection if the client is not reading the messages.
+        When the client falls behind, a pending message with the same key is
+        replaced and the oldest keyed message is set aside until the client
+        catches up. Closes connection if the client is not reading messages
+        that cannot be set aside.
 
         Async friendly.
         """
+        deferred = self.to_write.deferred
         try:
-            self.to_write.put_nowait(message)
+            self.to_write.put_nowait(message, key)
+            if self.to_write.deferred != deferred:
+                self.debug("Deferred message, client is falling behind")
         except asyncio.QueueFull:
             self.log_error("Client exceeded max pending messages [2]:",
                            MAX_PENDING_MSG)
@@ -410,18 +570,73 @@ class ActiveConnection:
         """
         msg = SUBSCRIBE_EVENTS_MESSAGE_SCHEMA(msg)
 
-        async def forward_events(event):
+        matches = _entity_matcher(msg)
+        attributes = msg.get('attributes')
+        if attributes is not None:
+            attributes = set(attributes)
+
+        @callback
+        def forward_events(event):
             """Forward events to websocket."""
             if event.event_type == EVENT_TIME_CHANGED:
                 return
 
-            self.send_message_outside(event_message(msg['id'], event))
+            if matches is not None and \
+                    not matches(event.data.get('entity_id')):
+                return
+
+            if attributes is not None and \
+                    event.event_type == EVENT_STATE_CHANGED:
+                event = _event_with_attributes(event, attributes)
+
+            key = None
+            if event.event_type == EVENT_STATE_CHANGED:
+                key = (msg['id'], event.data['entity_id'])
 
-        self.event_listeners[msg['id']] = self.hass.bus.async_listen(
-            msg['event_type'], forward_events)
+            self.send_message_outside(
+                event_message_json(msg['id'], event), key)
+
+        self.event_listeners[msg['id']] = async_subscribe(
+            self.hass, msg['event_type'], forward_events)
 
         self.to_write.put_nowait(result_message(msg['id']))
 
+    def handle_subscribe_states(self, msg):
+        """Handle subscribe states command.
+
+        The result is a snapshot of the current states. Every change after
+        it is sent as a state_diff message against the state the client
+        last received.
+
+        Async friendly.
+        """
+        msg = SUBSCRIBE_STATES_MESSAGE_SCHEMA(msg)
+        iden = msg['id']
+        matches = _entity_matcher(msg)
+
+        states = self.hass.states.async_all()
+        if matches is not None:
+            states = [state for state in states if matches(state.entity_id)]
+
+        self.sent_states[iden] = {state.entity_id: state for state in states}
+
+        @callback
+        def forward_state_changes(event):
+            """Queue the new state to be sent as a diff."""
+            entity_id = event.data['entity_id']
+
+            if matches is not None and not matches(entity_id):
+                return
+
+            self.send_message_outside(
+                _PendingStateDiff(iden, entity_id, event.data['new_state']),
+                (iden, entity_id))
+
+        self.event_listeners[iden] = async_subscribe(
+            self.hass, EVENT_STATE_CHANGED, forward_state_changes)
+
+        self.to_write.put_nowait(result_message_json(iden, states))
+
     def handle_unsubscribe_events(self, msg):
         """Handle unsubscribe events command.
 
@@ -433,6 +648,7 @@ class ActiveConnection:
 
         if subscription in self.event_listeners:
             self.event_listeners.pop(subscription)()
+            self.sent_states.pop(subscription, None)
             self.to_write.put_nowait(result_message(msg['id']))
         else:
             self.to_write.put_nowait(error_message(
@@ -461,7 +677,7 @@ class ActiveConnection:
         """
         msg = GET_STATES_MESSAGE_SCHEMA(msg)
 
-        self.to_write.put_nowait(result_message(
+        self.to_write.put_nowait(result_message_json(
             msg['id'], self.hass.states.async_all()))
 
     def handle_get_services(self, msg):
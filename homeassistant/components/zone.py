@@ -6,6 +6,7 @@ https://home-assistant.io/components/zone/
 """
 import asyncio
 import logging
+import math
 
 import voluptuous as vol
 
@@ -13,9 +14,11 @@ import homeassistant.helpers.config_validation as cv
 from homeassistant.const import (
     ATTR_HIDDEN, ATTR_LATITUDE, ATTR_LONGITUDE, CONF_NAME, CONF_LATITUDE,
     CONF_LONGITUDE, CONF_ICON, CONF_RADIUS)
+from homeassistant.core import callback
 from homeassistant.loader import bind_hass
 from homeassistant.helpers import config_per_platform
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
+from homeassistant.helpers.event import async_track_domain_state_change
 from homeassistant.util.async_ import run_callback_threadsafe
 from homeassistant.util.location import distance
 
@@ -39,6 +42,17 @@ ICON_IMPORT = 'mdi:import'
 
 STATE = 'zoning'
 
+DATA_ZONE_INDEX = 'zone_index'
+
+# Size in degrees of the cells of the zone index
+INDEX_CELL_DEGREES = 0.01
+# Lower bound of the meters in a degree, with a margin, to size cell ranges
+INDEX_METERS_PER_DEGREE = 100000
+# Lookups that span more cells are checked without the grid
+INDEX_MAX_CELLS = 400
+# Larger zones are always checked instead of widening every lookup
+INDEX_MAX_RADIUS = 2000
+
 # The config that zone accepts is the same as if it has platforms.
 PLATFORM_SCHEMA = vol.Schema({
     vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
@@ -64,17 +78,19 @@ def async_active_zone(hass, latitude, longitude, radius=0):
 
     This method must be run in the event loop.
     """
+    index = hass.data.get(DATA_ZONE_INDEX)
+
+    if index is None:
+        index = hass.data[DATA_ZONE_INDEX] = ZoneIndex(hass)
+
     # Sort entity IDs so that we are deterministic if equal distance to 2 zones
-    zones = (hass.states.get(entity_id) for entity_id
-             in sorted(hass.states.async_entity_ids(DOMAIN)))
+    zones = sorted(index.async_candidates(latitude, longitude, radius),
+                   key=lambda zone: zone.entity_id)
 
     min_dist = None
     closest = None
 
     for zone in zones:
-        if zone.attributes.get(ATTR_PASSIVE):
-            continue
-
         zone_dist = distance(
             latitude, longitude,
             zone.attributes[ATTR_LATITUDE], zone.attributes[ATTR_LONGITUDE])
@@ -92,6 +108,125 @@ def async_active_zone(hass, latitude, longitude, radius=0):
     return closest
 
 
+class ZoneIndex(object):
+    """Grid of the active zones to find the zones near a point.
+
+    Zones are stored in the cell of their center. A lookup searches all cells
+    within its radius plus the largest indexed zone radius. The index is
+    rebuilt after a zone state changed.
+    """
+
+    def __init__(self, hass):
+        """Initialize the index and follow the zone states."""
+        self.hass = hass
+        self._cells = None
+        self._unindexed = None
+        self._zones = None
+        self._max_radius = 0
+        async_track_domain_state_change(
+            hass, DOMAIN, self._async_state_changed)
+
+    @callback
+    def _async_state_changed(self, entity_id, old_state, new_state):
+        """Invalidate the index when a zone changes."""
+        self._cells = None
+
+    @callback
+    def _async_build(self):
+        """Index the non-passive zones."""
+        self._cells = cells = {}
+        self._unindexed = unindexed = []
+        self._zones = zones = []
+        self._max_radius = 0
+
+        for zone in self.hass.states.async_domain_states(DOMAIN):
+            if zone.attributes.get(ATTR_PASSIVE):
+                continue
+
+            zones.append(zone)
+
+            try:
+                radius = float(zone.attributes[ATTR_RADIUS])
+                cell = _cell(zone.attributes[ATTR_LATITUDE],
+                             zone.attributes[ATTR_LONGITUDE])
+            except (KeyError, TypeError, ValueError):
+                cell = None
+
+            # Zones that can't be indexed are checked on every lookup
+            if cell is None or not 0 <= radius <= INDEX_MAX_RADIUS:
+                unindexed.append(zone)
+                continue
+
+            cells.setdefault(cell, []).append(zone)
+            self._max_radius = max(self._max_radius, radius)
+
+    @callback
+    def async_candidates(self, latitude, longitude, radius=0):
+        """Return the active zones that can contain the point.
+
+        Other active zones are guaranteed not to contain the point.
+        """
+        if self._cells is None:
+            self._async_build()
+
+        query_cells = _cell_range(
+            latitude, longitude, radius + self._max_radius)
+
+        if query_cells is None:
+            return list(self._zones)
+
+        candidates = list(self._unindexed)
+        cells = self._cells
+
+        for cell in query_cells:
+            zones = cells.get(cell)
+            if zones is not None:
+                candidates.extend(zones)
+
+        return candidates
+
+
+def _cell(latitude, longitude):
+    """Return the index cell of a point."""
+    lon_cells = round(360 / INDEX_CELL_DEGREES)
+    return (math.floor(latitude / INDEX_CELL_DEGREES),
+            math.floor(longitude / INDEX_CELL_DEGREES) % lon_cells)
+
+
+def _cell_range(latitude, longitude, meters):
+    """Return the index cells of all points within meters of a point.
+
+    Returns None if that would be too many cells.
+    """
+    delta_lat = meters / INDEX_METERS_PER_DEGREE
+    min_lat = latitude - delta_lat
+    max_lat = latitude + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return None
+
+    delta_lon = delta_lat / math.cos(
+        math.radians(max(abs(min_lat), abs(max_lat))))
+
+    # The bound of the longitude only holds for short distances
+    if delta_lon > 10:
+        return None
+
+    lat_range = range(math.floor(min_lat / INDEX_CELL_DEGREES),
+                      math.floor(max_lat / INDEX_CELL_DEGREES) + 1)
+    lon_range = range(
+        math.floor((longitude - delta_lon) / INDEX_CELL_DEGREES),
+        math.floor((longitude + delta_lon) / INDEX_CELL_DEGREES) + 1)
+
+    if len(lat_range) * len(lon_range) > INDEX_MAX_CELLS:
+        return None
+
+    lon_cells = round(360 / INDEX_CELL_DEGREES)
+
+    return [(lat_cell, lon_cell % lon_cells)
+            for lat_cell in lat_range for lon_cell in lon_range]
+
+
 def in_zone(zone, latitude, longitude, radius=0):
     """Test if given latitude, longitude is in given zone.
 
@@ -22,7 +22,7 @@ from homeassistant.const import (
 from homeassistant.core import callback, DOMAIN as CONF_CORE
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import get_component, get_platform
-from homeassistant.util.yaml import load_yaml, SECRET_YAML
+from homeassistant.util.yaml import load_yaml, load_yaml_cached, SECRET_YAML
 import homeassistant.helpers.config_validation as cv
 from homeassistant.util import dt as date_util, location as loc_util
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM
@@ -37,6 +37,7 @@ RE_ASCII = re.compile(r"\033\[[^m]*m")
 HA_COMPONENT_URL = '[{}](https://home-assistant.io/components/{}/)'
 YAML_CONFIG_FILE = 'configuration.yaml'
 VERSION_FILE = '.HA_VERSION'
+CONFIG_CACHE_FILE = '.config_cache'
 CONFIG_DIR_NAME = '.homeassistant'
 DATA_CUSTOMIZE = 'hass_customize'
 
@@ -275,7 +276,7 @@ async def async_hass_config_yaml(hass):
     """
     def _load_hass_yaml_config():
         path = find_config_file(hass.config.config_dir)
-        conf = load_yaml_config_file(path)
+        conf = load_yaml_config_file(path, cache=True)
         return conf
 
     conf = await hass.async_add_job(_load_hass_yaml_config)
@@ -292,13 +293,21 @@ def find_config_file(config_dir):
     return config_path if os.path.isfile(config_path) else None
 
 
-def load_yaml_config_file(config_path):
+def load_yaml_config_file(config_path, cache=False, files=None):
     """Parse a YAML configuration file.
 
+    With cache, the parsed file is stored in the config cache next to it and
+    reused until one of the files it was loaded from changes. The names of
+    the YAML files it was loaded from are added to files when given.
+
     This method needs to run in an executor.
     """
     try:
-        conf_dict = load_yaml(config_path)
+        if cache:
+            conf_dict = load_yaml_cached(config_path, os.path.join(
+                os.path.dirname(config_path), CONFIG_CACHE_FILE), files)
+        else:
+            conf_dict = load_yaml(config_path)
     except FileNotFoundError as err:
         raise HomeAssistantError("Config file not found: {}".format(
             getattr(err, 'filename', err)))
@@ -38,6 +38,7 @@ from homeassistant.util.async_ import (
     fire_coroutine_threadsafe)
 import homeassistant.util as util
 import homeassistant.util.dt as dt_util
+import homeassistant.util.json as json_util
 import homeassistant.util.location as location
 from homeassistant.util.unit_system import UnitSystem, METRIC_SYSTEM  # NOQA
 
@@ -82,6 +83,27 @@ def is_callback(func: Callable[..., Any]) -> bool:
     return '_hass_callback' in getattr(func, '__dict__', {})
 
 
+class HassJobType(enum.Enum):
+    """Represent how a job is scheduled on the event loop."""
+
+    callback = 'callback'
+    coroutinefunction = 'coroutinefunction'
+    executor = 'executor'
+
+
+def get_hass_job_type(target: Callable[..., Any]) -> HassJobType:
+    """Determine how a job should be scheduled.
+
+    Resolve this once for targets that are called often, so the checks don't
+    have to be repeated for every call.
+    """
+    if is_callback(target):
+        return HassJobType.callback
+    if asyncio.iscoroutinefunction(target):
+        return HassJobType.coroutinefunction
+    return HassJobType.executor
+
+
 @callback
 def async_loop_exception_handler(loop, context):
     """Handle all exception inside the core loop."""
@@ -225,6 +247,33 @@ class HomeAssistant(object):
 
         return task
 
+    @callback
+    def async_add_hass_job(self, job_type: HassJobType,
+                           target: Callable[..., None],
+                           *args: Any) -> Optional[asyncio.Future]:
+        """Add a job of a known type from within the eventloop.
+
+        This method must be run in the event loop.
+
+        job_type: how to schedule target, see get_hass_job_type.
+        target: target to call.
+        args: parameters for method to call.
+        """
+        if job_type is HassJobType.callback:
+            self.loop.call_soon(target, *args)
+            return None
+
+        if job_type is HassJobType.coroutinefunction:
+            task = self.loop.create_task(target(*args))
+        else:
+            task = self.loop.run_in_executor(None, target, *args)
+
+        # If a task is scheduled
+        if self._track_task:
+            self._pending_tasks.append(task)
+
+        return task
+
     @callback
     def async_track_tasks(self):
         """Track tasks so you can wait for all tasks to be done."""
@@ -307,7 +356,7 @@ class EventOrigin(enum.Enum):
 class Event(object):
     """Representation of an event within the bus."""
 
-    __slots__ = ['event_type', 'data', 'origin', 'time_fired']
+    __slots__ = ['event_type', 'data', 'origin', 'time_fired', '_as_json']
 
     def __init__(self, event_type, data=None, origin=EventOrigin.local,
                  time_fired=None):
@@ -316,6 +365,7 @@ class Event(object):
         self.data = data or {}
         self.origin = origin
         self.time_fired = time_fired or dt_util.utcnow()
+        self._as_json = None
 
     def as_dict(self):
         """Create a dict representation of this Event.
@@ -329,6 +379,18 @@ class Event(object):
             'time_fired': self.time_fired,
         }
 
+    def as_json(self):
+        """Return the JSON representation of this Event.
+
+        Computed on first use and shared by every consumer, so the data must
+        not be changed once the event has been fired.
+
+        Async friendly.
+        """
+        if self._as_json is None:
+            self._as_json = json_util.dumps(self.as_dict())
+        return self._as_json
+
     def __repr__(self):
         """Return the representation."""
         # pylint: disable=maybe-no-member
@@ -354,6 +416,7 @@ class EventBus(object):
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
+        # Maps event type to a list of (listener, job type) tuples
         self._listeners = {}
         self._hass = hass
 
@@ -385,24 +448,41 @@ class EventBus(object):
 
         This method must be run in the event loop.
         """
-        listeners = self._listeners.get(event_type, [])
+        listeners = self._listeners.get(event_type)
 
         # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if (match_all_listeners is not None and
-                event_type != EVENT_HOMEASSISTANT_CLOSE):
-            listeners = match_all_listeners + listeners
+        if event_type == EVENT_HOMEASSISTANT_CLOSE:
+            match_all_listeners = None
+        else:
+            match_all_listeners = self._listeners.get(MATCH_ALL)
 
         event = Event(event_type, event_data, origin)
 
-        if event_type != EVENT_TIME_CHANGED:
+        # Only pay for the logging call when INFO is enabled
+        if event_type != EVENT_TIME_CHANGED and \
+                _LOGGER.isEnabledFor(logging.INFO):
             _LOGGER.info("Bus:Handling %s", event)
 
-        if not listeners:
-            return
+        if match_all_listeners:
+            self._async_dispatch(match_all_listeners, event)
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        if listeners:
+            self._async_dispatch(listeners, event)
+
+    @callback
+    def _async_dispatch(self, listeners, event):
+        """Schedule listeners with their pre-resolved job type.
+
+        This method must be run in the event loop.
+        """
+        hass = self._hass
+        call_soon = hass.loop.call_soon
+
+        for func, job_type in listeners:
+            if job_type is HassJobType.callback:
+                call_soon(func, event)
+            else:
+                hass.async_add_hass_job(job_type, func, event)
 
     def listen(self, event_type, listener):
         """Listen for all events or events of a specific type.
@@ -429,10 +509,12 @@ class EventBus(object):
 
         This method must be run in the event loop.
         """
+        entry = (listener, get_hass_job_type(listener))
+
         if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
+            self._listeners[event_type].append(entry)
         else:
-            self._listeners[event_type] = [listener]
+            self._listeners[event_type] = [entry]
 
         def remove_listener():
             """Remove the listener."""
@@ -493,10 +575,17 @@ class EventBus(object):
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(listener)
+            listeners = self._listeners[event_type]
+
+            for idx, (func, _) in enumerate(listeners):
+                if func == listener:
+                    del listeners[idx]
+                    break
+            else:
+                raise ValueError(listener)
 
             # delete event_type list if empty
-            if not self._listeners[event_type]:
+            if not listeners:
                 self._listeners.pop(event_type)
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
@@ -515,7 +604,8 @@ class State(object):
     """
 
     __slots__ = ['entity_id', 'state', 'attributes',
-                 'last_changed', 'last_updated']
+                 'last_changed', 'last_updated', '_as_json',
+                 '_attributes_json']
 
     def __init__(self, entity_id, state, attributes=None, last_changed=None,
                  last_updated=None):
@@ -537,6 +627,8 @@ class State(object):
         self.attributes = MappingProxyType(attributes or {})
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
+        self._as_json = None
+        self._attributes_json = None
 
     @property
     def domain(self):
@@ -569,6 +661,33 @@ class State(object):
                 'last_changed': self.last_changed,
                 'last_updated': self.last_updated}
 
+    def attributes_json(self):
+        """Return the JSON representation of the attributes.
+
+        Async friendly.
+        """
+        if self._attributes_json is None:
+            self._attributes_json = json_util.dumps(dict(self.attributes))
+        return self._attributes_json
+
+    def as_json(self):
+        """Return the JSON representation of the State.
+
+        Equal to the sorted JSON of as_dict(), computed once and reused by
+        the API, websocket connections and the recorder.
+
+        Async friendly.
+        """
+        if self._as_json is None:
+            self._as_json = (
+                '{{"attributes": {}, "entity_id": {}, "last_changed": {}, '
+                '"last_updated": {}, "state": {}}}').format(
+                    self.attributes_json(), json_util.dumps(self.entity_id),
+                    json_util.dumps(self.last_changed),
+                    json_util.dumps(self.last_updated),
+                    json_util.dumps(self.state))
+        return self._as_json
+
     @classmethod
     def from_dict(cls, json_dict):
         """Initialize a state from a dict.
@@ -617,6 +736,8 @@ class StateMachine(object):
     def __init__(self, bus, loop):
         """Initialize state machine."""
         self._states = {}
+        # Maps domain to a dict of entity_id to state in that domain
+        self._domain_index = {}
         self._bus = bus
         self._loop = loop
 
@@ -636,10 +757,15 @@ class StateMachine(object):
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        return list(self._domain_index.get(domain_filter.lower(), ()))
 
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+    @callback
+    def async_domain_states(self, domain):
+        """Create a list of all states in a domain.
+
+        This method must be run in the event loop.
+        """
+        return list(self._domain_index.get(domain.lower(), {}).values())
 
     def all(self):
         """Create a list of all states."""
@@ -690,6 +816,11 @@ class StateMachine(object):
         if old_state is None:
             return False
 
+        domain_states = self._domain_index[old_state.domain]
+        del domain_states[entity_id]
+        if not domain_states:
+            del self._domain_index[old_state.domain]
+
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -737,6 +868,11 @@ class StateMachine(object):
         last_changed = old_state.last_changed if same_state else None
         state = State(entity_id, new_state, attributes, last_changed)
         self._states[entity_id] = state
+
+        domain_states = self._domain_index.get(state.domain)
+        if domain_states is None:
+            domain_states = self._domain_index[state.domain] = {}
+        domain_states[entity_id] = state
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
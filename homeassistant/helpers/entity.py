@@ -11,7 +11,7 @@ from homeassistant.const import (
     ATTR_UNIT_OF_MEASUREMENT, DEVICE_DEFAULT_NAME, STATE_OFF, STATE_ON,
     STATE_UNAVAILABLE, STATE_UNKNOWN, TEMP_CELSIUS, TEMP_FAHRENHEIT,
     ATTR_ENTITY_PICTURE, ATTR_SUPPORTED_FEATURES, ATTR_DEVICE_CLASS)
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant, callback, split_entity_id
 from homeassistant.config import DATA_CUSTOMIZE
 from homeassistant.exceptions import NoEntitySpecifiedError
 from homeassistant.util import ensure_unique_string, slugify
@@ -49,7 +49,9 @@ def async_generate_entity_id(entity_id_format: str, name: Optional[str],
         if hass is None:
             raise ValueError("Missing required parameter currentids or hass")
 
-        current_ids = hass.states.async_entity_ids()
+        # Entity ids can only conflict within the domain
+        current_ids = hass.states.async_entity_ids(
+            split_entity_id(entity_id_format)[0])
     name = (name or DEVICE_DEFAULT_NAME).lower()
 
     return ensure_unique_string(
@@ -286,6 +288,10 @@ class Entity(object):
         self.hass.states.async_set(
             self.entity_id, state, attr, self.force_update)
 
+        # should_poll can change at runtime
+        if self.platform is not None:
+            self.platform.async_check_polling(self)
+
     def schedule_update_ha_state(self, force_refresh=False):
         """Schedule an update ha state change task.
 
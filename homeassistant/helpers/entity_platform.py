@@ -1,19 +1,27 @@
 """Class to manage the entities for a single platform."""
 import asyncio
+import heapq
+from itertools import count
+import random
+from timeit import default_timer as timer
 
 from homeassistant.const import DEVICE_DEFAULT_NAME
 from homeassistant.core import callback, valid_entity_id, split_entity_id
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
 from homeassistant.util.async_ import (
     run_callback_threadsafe, run_coroutine_threadsafe)
+import homeassistant.util.dt as dt_util
 
-from .event import async_track_time_interval, async_call_later
+from .event import async_track_point_in_utc_time, async_call_later
 from .entity_registry import async_get_registry
 
 SLOW_SETUP_WARNING = 10
 SLOW_SETUP_MAX_WAIT = 60
 PLATFORM_NOT_READY_RETRIES = 10
 
+# Slow or unavailable entities are polled up to this many intervals apart
+POLL_MAX_BACKOFF = 8
+
 
 class EntityPlatform(object):
     """Manage the entities for a single platform."""
@@ -43,11 +51,10 @@ class EntityPlatform(object):
         self.config_entry = None
         self.entities = {}
         self._tasks = []
-        # Method to cancel the state change listener
-        self._async_unsub_polling = None
+        # Schedules the updates of the polling entities
+        self.poller = EntityPoller(hass, logger, scan_interval)
         # Method to cancel the retry of setup
         self._async_cancel_retry_setup = None
-        self._process_updates = asyncio.Lock(loop=hass.loop)
 
         # Platform is None for the EntityComponent "catch-all" EntityPlatform
         # which powers entity_component.add_entities
@@ -219,15 +226,6 @@ class EntityPlatform(object):
         await asyncio.wait(tasks, loop=self.hass.loop)
         self.async_entities_added_callback()
 
-        if self._async_unsub_polling is not None or \
-           not any(entity.should_poll for entity
-                   in self.entities.values()):
-            return
-
-        self._async_unsub_polling = async_track_time_interval(
-            self.hass, self._update_entity_states, self.scan_interval
-        )
-
     async def _async_add_entity(self, entity, update_before_add,
                                 component_entities, registry):
         """Helper method to add an entity to the platform."""
@@ -313,8 +311,25 @@ class EntityPlatform(object):
         if hasattr(entity, 'async_added_to_hass'):
             await entity.async_added_to_hass()
 
+        # Also starts polling the entity if it should be polled
         await entity.async_update_ha_state()
 
+    @callback
+    def async_check_polling(self, entity):
+        """Start polling an entity of the platform if it should be polled.
+
+        Entities that stop polling are dropped by the poller when their next
+        update is due.
+        """
+        if entity.should_poll and \
+                self.entities.get(entity.entity_id) is entity:
+            self.poller.async_add(entity)
+
+    @property
+    def poll_stats(self):
+        """Return the polling statistics of the platform."""
+        return self.poller.stats
+
     async def async_reset(self):
         """Remove all entities and reset data.
 
@@ -332,51 +347,216 @@ class EntityPlatform(object):
 
         await asyncio.wait(tasks, loop=self.hass.loop)
 
-        if self._async_unsub_polling is not None:
-            self._async_unsub_polling()
-            self._async_unsub_polling = None
-
     async def async_remove_entity(self, entity_id):
         """Remove entity id from platform."""
         await self._async_remove_entity(entity_id)
 
-        # Clean up polling job if no longer needed
-        if (self._async_unsub_polling is not None and
-                not any(entity.should_poll for entity
-                        in self.entities.values())):
-            self._async_unsub_polling()
-            self._async_unsub_polling = None
-
     async def _async_remove_entity(self, entity_id):
         """Remove entity id from platform."""
         entity = self.entities.pop(entity_id)
+        self.poller.async_remove(entity_id)
 
         if hasattr(entity, 'async_will_remove_from_hass'):
             await entity.async_will_remove_from_hass()
 
         self.hass.states.async_remove(entity_id)
 
-    async def _update_entity_states(self, now):
-        """Update the states of all the polling entities.
 
-        To protect from flooding the executor, we will update async entities
-        in parallel and other entities sequential.
+class _PolledEntity(object):
+    """Polling state of a single entity."""
 
-        This method must be run in the event loop.
-        """
-        if self._process_updates.locked():
-            self.logger.warning(
-                "Updating %s %s took longer than the scheduled update "
-                "interval %s", self.platform_name, self.domain,
-                self.scan_interval)
+    __slots__ = ['entity', 'due', 'backoff', 'removed', 'overrun_reported']
+
+    def __init__(self, entity, due):
+        """Initialize the polled entity."""
+        self.entity = entity
+        self.due = due
+        self.backoff = 1
+        self.removed = False
+        self.overrun_reported = False
+
+
+class EntityPoller(object):
+    """Poll the entities of a platform spread over the scan interval.
+
+    Every entity gets a random phase within the interval so that entities
+    added together are not all updated at the same moment. An entity is not
+    updated again before its previous update finished. Entities that are
+    unavailable or take longer than the interval to update are polled less
+    often, up to POLL_MAX_BACKOFF intervals apart. Entities that no longer
+    should be polled are dropped when their next update is due.
+    """
+
+    def __init__(self, hass, logger, interval):
+        """Initialize the poller."""
+        self.hass = hass
+        self.logger = logger
+        self.interval = interval
+        self._polled = {}
+        self._queue = []
+        self._seq = count()
+        self._unsub_timer = None
+        self._timer_due = None
+        self._polls = 0
+        self._dispatches = 0
+        self._overruns = 0
+        self._backoffs = 0
+        self._total_duration = 0
+        self._max_duration = 0
+        self._total_lag = 0
+        self._max_lag = 0
+
+    @property
+    def stats(self):
+        """Return the polling statistics in seconds."""
+        polls = self._polls
+        dispatches = self._dispatches
+        return {
+            'entities': len(self._polled),
+            'polls': polls,
+            'overruns': self._overruns,
+            'backoffs': self._backoffs,
+            'mean_duration': self._total_duration / polls if polls else 0,
+            'max_duration': self._max_duration,
+            'mean_lag': self._total_lag / dispatches if dispatches else 0,
+            'max_lag': self._max_lag,
+        }
+
+    @callback
+    def async_add(self, entity):
+        """Start polling an entity if it is not polled yet."""
+        previous = self._polled.get(entity.entity_id)
+        if previous is not None:
+            if previous.entity is entity:
+                return
+            previous.removed = True
+
+        # A random phase in (0, interval] spreads the updates
+        due = dt_util.utcnow() + self.interval * (1 - random.random())
+        polled = _PolledEntity(entity, due)
+        self._polled[entity.entity_id] = polled
+        self._async_enqueue(polled)
+
+    @callback
+    def async_remove(self, entity_id):
+        """Stop polling an entity."""
+        polled = self._polled.pop(entity_id, None)
+        if polled is None:
+            return
+
+        polled.removed = True
+
+        if not self._polled:
+            self._queue.clear()
+            self._async_schedule_timer()
+
+    @callback
+    def _async_enqueue(self, polled):
+        """Queue the next update of an entity."""
+        heapq.heappush(self._queue, (polled.due, next(self._seq), polled))
+        self._async_schedule_timer()
+
+    @callback
+    def _async_schedule_timer(self):
+        """Make sure the timer fires when the next update is due."""
+        while self._queue and self._queue[0][2].removed:
+            heapq.heappop(self._queue)
+
+        due = self._queue[0][0] if self._queue else None
+
+        if due == self._timer_due:
             return
 
-        async with self._process_updates:
-            tasks = []
-            for entity in self.entities.values():
-                if not entity.should_poll:
-                    continue
-                tasks.append(entity.async_update_ha_state(True))
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        self._timer_due = due
+
+        if due is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._async_poll_due, due)
+
+    @callback
+    def _async_poll_due(self, now):
+        """Start the updates that are due."""
+        self._unsub_timer = None
+        self._timer_due = None
+        queue = self._queue
+
+        while queue and queue[0][0] <= now:
+            due, _, polled = heapq.heappop(queue)
+            if polled.removed:
+                continue
+
+            if not polled.entity.should_poll:
+                polled.removed = True
+                del self._polled[polled.entity.entity_id]
+                continue
+
+            lag = (now - due).total_seconds()
+            self._dispatches += 1
+            self._total_lag += lag
+            self._max_lag = max(self._max_lag, lag)
+
+            self.hass.async_add_job(self._async_update(polled))
+
+        self._async_schedule_timer()
+
+    async def _async_update(self, polled):
+        """Update an entity and queue its next update."""
+        entity = polled.entity
+        start = timer()
+        failed = False
+
+        try:
+            await entity.async_update_ha_state(True)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("Error updating %s", entity.entity_id)
+            failed = True
+
+        duration = timer() - start
+        self._polls += 1
+        self._total_duration += duration
+        self._max_duration = max(self._max_duration, duration)
+
+        if polled.removed:
+            return
+
+        interval = self.interval
+
+        if failed or not entity.available or \
+                duration > interval.total_seconds():
+            if polled.backoff < POLL_MAX_BACKOFF:
+                self._backoffs += 1
+            polled.backoff = min(polled.backoff * 2, POLL_MAX_BACKOFF)
+        else:
+            polled.backoff = 1
+
+        if self._async_next_due(polled, dt_util.utcnow()):
+            self._overruns += 1
+            # Report once until the entity keeps up again
+            if not polled.overrun_reported:
+                polled.overrun_reported = True
+                self.logger.warning(
+                    "Updating %s took longer than the scheduled update "
+                    "interval %s", entity.entity_id, interval)
+        else:
+            polled.overrun_reported = False
+
+        self._async_enqueue(polled)
+
+    @callback
+    def _async_next_due(self, polled, now):
+        """Move the due time of an entity to its next slot after now.
+
+        The phase of the entity within the interval is kept. Return True if
+        slots were skipped.
+        """
+        interval = self.interval
+        polled.due += interval * polled.backoff
+        if polled.due > now:
+            return False
 
-            if tasks:
-                await asyncio.wait(tasks, loop=self.hass.loop)
+        polled.due += interval * ((now - polled.due) // interval + 1)
+        return True
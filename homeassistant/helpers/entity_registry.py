@@ -12,7 +12,6 @@ from disk.
 """
 
 from collections import OrderedDict
-from itertools import chain
 import logging
 import os
 import weakref
@@ -21,7 +20,7 @@ import attr
 
 from ..core import callback, split_entity_id
 from ..loader import bind_hass
-from ..util import ensure_unique_string, slugify
+from ..util import slugify
 from ..util.yaml import load_yaml, save_yaml
 
 PATH_REGISTRY = 'entity_registry.yaml'
@@ -74,10 +73,27 @@ class EntityRegistry:
     def __init__(self, hass):
         """Initialize the registry."""
         self.hass = hass
-        self.entities = None
+        self._entities = None
+        self._unique_id_index = {}
         self._load_task = None
         self._sched_save = None
 
+    @property
+    def entities(self):
+        """Return the registered entities keyed by entity_id."""
+        return self._entities
+
+    @entities.setter
+    def entities(self, entities):
+        """Set the registered entities and index them by unique id."""
+        self._entities = entities
+        self._unique_id_index = {}
+
+        for entry in (entities or {}).values():
+            self._unique_id_index[
+                (entry.domain, entry.platform, entry.unique_id)] = \
+                entry.entity_id
+
     @callback
     def async_is_registered(self, entity_id):
         """Check if an entity_id is currently registered."""
@@ -89,20 +105,24 @@ class EntityRegistry:
 
         Conflicts checked against registered and currently existing entities.
         """
-        return ensure_unique_string(
-            '{}.{}'.format(domain, slugify(suggested_object_id)),
-            chain(self.entities.keys(),
-                  self.hass.states.async_entity_ids(domain))
-        )
+        preferred_id = '{}.{}'.format(domain, slugify(suggested_object_id))
+        entity_id = preferred_id
+        tries = 1
+
+        while entity_id in self.entities or \
+                self.hass.states.get(entity_id) is not None:
+            tries += 1
+            entity_id = '{}_{}'.format(preferred_id, tries)
+
+        return entity_id
 
     @callback
     def async_get_or_create(self, domain, platform, unique_id, *,
                             suggested_object_id=None):
         """Get entity. Create if it doesn't exist."""
-        for entity in self.entities.values():
-            if entity.domain == domain and entity.platform == platform and \
-               entity.unique_id == unique_id:
-                return entity
+        entity_id = self._unique_id_index.get((domain, platform, unique_id))
+        if entity_id is not None:
+            return self.entities[entity_id]
 
         entity_id = self.async_generate_entity_id(
             domain, suggested_object_id or '{}_{}'.format(platform, unique_id))
@@ -112,6 +132,7 @@ class EntityRegistry:
             platform=platform,
         )
         self.entities[entity_id] = entity
+        self._unique_id_index[(domain, platform, unique_id)] = entity_id
         _LOGGER.info('Registered new %s.%s entity: %s',
                      domain, platform, entity_id)
         self.async_schedule_save()
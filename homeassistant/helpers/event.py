@@ -1,15 +1,28 @@
 """Helpers for listening to events."""
-from datetime import timedelta
+from bisect import bisect_left
+from calendar import monthrange
+from datetime import datetime, timedelta
 import functools as ft
+import heapq
+from itertools import count
+import logging
 
 from homeassistant.loader import bind_hass
 from homeassistant.helpers.sun import get_astral_event_next
-from ..core import HomeAssistant, callback
+from ..core import HomeAssistant, callback, split_entity_id
 from ..const import (
     ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
 from ..util import dt as dt_util
 from ..util.async_ import run_callback_threadsafe
 
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STATE_CHANGE_DISPATCHER = 'state_change_dispatcher'
+DATA_TIME_PATTERN_SCHEDULER = 'time_pattern_scheduler'
+
+# How many years ahead we look for a time pattern match
+MAX_PATTERN_YEARS_AHEAD = 50
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -36,6 +49,110 @@ def threaded_listener_factory(async_factory):
     return factory
 
 
+class _StateChangeDispatcher(object):
+    """Route state changed events to the trackers of the changed entity.
+
+    A single bus listener is shared by all state change trackers, so a state
+    change only invokes the trackers interested in that entity or its domain.
+    """
+
+    def __init__(self, hass):
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self.listeners = {}
+        self.domain_listeners = {}
+        self.trackers = 0
+        self._unsub_bus = None
+
+    @callback
+    def async_add(self, entity_ids, listener, domains=()):
+        """Add a listener for the entity ids or MATCH_ALL and the domains.
+
+        Returns a function that can be called to remove the listener.
+        """
+        if entity_ids == MATCH_ALL:
+            entity_ids = frozenset((MATCH_ALL,))
+            domains = frozenset()
+        else:
+            domains = frozenset(domains)
+            # Entities of a tracked domain are already covered
+            entity_ids = frozenset(
+                entity_id for entity_id in entity_ids
+                if split_entity_id(entity_id)[0] not in domains)
+
+        for entity_id in entity_ids:
+            self.listeners.setdefault(entity_id, []).append(listener)
+
+        for domain in domains:
+            self.domain_listeners.setdefault(domain, []).append(listener)
+
+        self.trackers += 1
+        if self._unsub_bus is None:
+            self._unsub_bus = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed)
+
+        removed = False
+
+        @callback
+        def remove_listener():
+            """Remove the listener."""
+            nonlocal removed
+            if removed:
+                _LOGGER.warning("Unable to remove unknown listener %s",
+                                listener)
+                return
+            removed = True
+
+            for entity_id in entity_ids:
+                listeners = self.listeners[entity_id]
+                listeners.remove(listener)
+                if not listeners:
+                    del self.listeners[entity_id]
+
+            for domain in domains:
+                listeners = self.domain_listeners[domain]
+                listeners.remove(listener)
+                if not listeners:
+                    del self.domain_listeners[domain]
+
+            self.trackers -= 1
+            if not self.trackers:
+                self._unsub_bus()
+                self._unsub_bus = None
+
+        return remove_listener
+
+    @callback
+    def _async_state_changed(self, event):
+        """Call the listeners for the entity that changed."""
+        entity_id = event.data.get('entity_id')
+        # Copy, listeners might remove themselves while being called
+        listeners = list(self.listeners.get(entity_id, ()))
+
+        if self.domain_listeners and entity_id is not None:
+            listeners.extend(self.domain_listeners.get(
+                split_entity_id(entity_id)[0], ()))
+
+        listeners.extend(self.listeners.get(MATCH_ALL, ()))
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling state change of %s",
+                                  event.data.get('entity_id'))
+
+
+@callback
+def _async_get_state_change_dispatcher(hass):
+    """Return the state change dispatcher, creating it if needed."""
+    dispatcher = hass.data.get(DATA_STATE_CHANGE_DISPATCHER)
+    if dispatcher is None:
+        dispatcher = hass.data[DATA_STATE_CHANGE_DISPATCHER] = \
+            _StateChangeDispatcher(hass)
+    return dispatcher
+
+
 @callback
 @bind_hass
 def async_track_state_change(hass, entity_ids, action, from_state=None,
@@ -63,10 +180,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     @callback
     def state_change_listener(event):
         """Handle specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         old_state = event.data.get('old_state')
         if old_state is not None:
             old_state = old_state.state
@@ -80,26 +193,146 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
                                event.data.get('old_state'),
                                event.data.get('new_state'))
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    return _async_get_state_change_dispatcher(hass).async_add(
+        entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+@bind_hass
+def async_track_domain_state_change(hass, domains, action):
+    """Track the state changes of all entities in the domains.
+
+    domains can be a string or list. Other domains never reach the action.
+
+    Returns a function that can be called to remove the listener.
+
+    Must be run within the event loop.
+    """
+    if isinstance(domains, str):
+        domains = (domains.lower(),)
+    else:
+        domains = tuple(domain.lower() for domain in domains)
+
+    @callback
+    def state_change_listener(event):
+        """Handle the state change of an entity in the domains."""
+        hass.async_run_job(action, event.data.get('entity_id'),
+                           event.data.get('old_state'),
+                           event.data.get('new_state'))
+
+    return _async_get_state_change_dispatcher(hass).async_add(
+        (), state_change_listener, domains)
+
+
+track_domain_state_change = threaded_listener_factory(
+    async_track_domain_state_change)
+
+
+class TemplateDependencyTracker(object):
+    """Follow the states that the renders of templates depended on.
+
+    Call async_update with the RenderInfo of every render to subscribe to
+    exactly the entities and domains those renders read.
+    """
+
+    def __init__(self, hass, action):
+        """Initialize the tracker."""
+        self.hass = hass
+        self.action = action
+        self.entity_ids = frozenset()
+        self.domains = frozenset()
+        self._unsub = None
+        self._removed = False
+
+    @callback
+    def async_update(self, *render_infos):
+        """Resubscribe to the dependencies of the render infos."""
+        if self._removed:
+            return
+
+        entity_ids = set()
+        domains = set()
+
+        for info in render_infos:
+            info_entity_ids, info_domains = info.async_dependencies()
+            if info_entity_ids == MATCH_ALL:
+                entity_ids = MATCH_ALL
+                domains = set()
+                break
+            entity_ids.update(info_entity_ids)
+            domains.update(info_domains)
+
+        if entity_ids != MATCH_ALL:
+            entity_ids = frozenset(entity_ids)
+        domains = frozenset(domains)
+
+        if entity_ids == self.entity_ids and domains == self.domains:
+            return
+
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+        self.entity_ids = entity_ids
+        self.domains = domains
+
+        if not entity_ids and not domains:
+            return
+
+        dispatcher = _async_get_state_change_dispatcher(self.hass)
+        self._unsub = dispatcher.async_add(
+            entity_ids, self._async_state_changed, domains)
+
+    @callback
+    def async_remove(self):
+        """Stop following state changes."""
+        self._removed = True
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_state_changed(self, event):
+        """Run the action for a state change of a dependency."""
+        if self._removed:
+            return
+        self.hass.async_run_job(self.action, event.data.get('entity_id'),
+                                event.data.get('old_state'),
+                                event.data.get('new_state'))
+
+
 @callback
 @bind_hass
 def async_track_template(hass, template, action, variables=None):
-    """Add a listener that track state changes with template condition."""
-    from . import condition
+    """Add a listener that track state changes with template condition.
 
+    Only changes of the states that the last render of the template read
+    are tracked.
+    """
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
 
+    @callback
+    def async_check_template():
+        """Render the template and follow the states it depends on."""
+        info = template.async_render_info_cached(variables)
+        tracker.async_update(info)
+
+        if info.exception is not None:
+            _LOGGER.error("Error during template condition: %s",
+                          info.exception)
+            return False
+
+        return info.result.lower() == 'true'
+
     @callback
     def template_condition_listener(entity_id, from_s, to_s):
         """Check if condition is correct and run action."""
         nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+        template_result = async_check_template()
 
         # Check to see if template returns true
         if template_result and not already_triggered:
@@ -108,9 +341,11 @@ def async_track_template(hass, template, action, variables=None):
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables),
-        template_condition_listener)
+    tracker = TemplateDependencyTracker(hass, template_condition_listener)
+    # Render once to find out which states the template depends on
+    async_check_template()
+
+    return tracker.async_remove
 
 
 track_template = threaded_listener_factory(async_track_template)
@@ -333,29 +568,237 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
 
         return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
 
-    pmp = _process_time_match
-    year, month, day = pmp(year), pmp(month), pmp(day)
-    hour, minute, second = pmp(hour), pmp(minute), pmp(second)
+    scheduler = hass.data.get(DATA_TIME_PATTERN_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_TIME_PATTERN_SCHEDULER] = \
+            _TimePatternScheduler(hass)
+
+    return scheduler.async_add(_TimePatternListener(
+        action, local, year, month, day, hour, minute, second))
+
+
+track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
+
+
+class _TimePatternListener(object):
+    """A listener that fires when the time matches a pattern."""
+
+    __slots__ = ['action', 'local', 'removed', '_matchers', '_year',
+                 '_months', '_days', '_hours', '_minutes', '_seconds']
+
+    def __init__(self, action, local, year, month, day, hour, minute,
+                 second):
+        """Initialize the listener."""
+        self.action = action
+        self.local = local
+        self.removed = False
+
+        pmp = _process_time_match
+        self._matchers = (pmp(year), pmp(month), pmp(day), pmp(hour),
+                          pmp(minute), pmp(second))
+        self._year = self._matchers[0]
+        allowed = [
+            [value for value in values if matcher(value)]
+            for matcher, values in zip(self._matchers[1:], (
+                range(1, 13), range(1, 32), range(24), range(60),
+                range(60)))]
+        self._months, self._days, self._hours, self._minutes, \
+            self._seconds = allowed
+
+        # A pattern that can never match would be searched for years ahead
+        for name, pattern, values in zip(
+                ('month', 'day', 'hour', 'minute', 'second'),
+                (month, day, hour, minute, second), allowed):
+            if not values:
+                raise ValueError(
+                    "Time pattern {}={} never matches".format(name, pattern))
+
+    def matches(self, now):
+        """Return True if the time matches the pattern."""
+        year, month, day, hour, minute, second = self._matchers
+        # pylint: disable=too-many-boolean-expressions
+        return (second(now.second) and minute(now.minute) and
+                hour(now.hour) and day(now.day) and month(now.month) and
+                year(now.year))
+
+    def next_match(self, start):
+        """Return the first naive datetime from start matching the pattern.
+
+        Returns None if there is no match in the foreseeable future.
+        """
+        dattim = start
+        while dattim.year <= start.year + MAX_PATTERN_YEARS_AHEAD:
+            if not self._year(dattim.year):
+                dattim = datetime(dattim.year + 1, 1, 1)
+                continue
+
+            month = _next_allowed(self._months, dattim.month)
+            if month is None:
+                dattim = datetime(dattim.year + 1, 1, 1)
+                continue
+            if month != dattim.month:
+                dattim = datetime(dattim.year, month, 1)
+
+            day = _next_allowed(self._days, dattim.day)
+            if day is None or \
+                    day > monthrange(dattim.year, dattim.month)[1]:
+                dattim = datetime(dattim.year, dattim.month, 1) + \
+                    timedelta(days=32)
+                dattim = dattim.replace(day=1)
+                continue
+            if day != dattim.day:
+                dattim = datetime(dattim.year, dattim.month, day)
+
+            hour = _next_allowed(self._hours, dattim.hour)
+            if hour is None:
+                dattim = datetime(dattim.year, dattim.month, dattim.day) + \
+                    timedelta(days=1)
+                continue
+            if hour != dattim.hour:
+                dattim = datetime(dattim.year, dattim.month, dattim.day, hour)
+
+            minute = _next_allowed(self._minutes, dattim.minute)
+            if minute is None:
+                dattim = dattim.replace(minute=0, second=0) + \
+                    timedelta(hours=1)
+                continue
+            if minute != dattim.minute:
+                dattim = dattim.replace(minute=minute, second=0)
+
+            second = _next_allowed(self._seconds, dattim.second)
+            if second is None:
+                dattim = dattim.replace(second=0) + timedelta(minutes=1)
+                continue
+
+            return dattim.replace(second=second)
+
+        return None
+
+
+class _TimePatternScheduler(object):
+    """Schedule time pattern listeners on their next matching time.
+
+    Each listener is kept in a heap ordered by the earliest time it can match
+    next, so a time changed event only evaluates the listeners that are due.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap = []
+        self._new = []
+        self._sequence = count()
+        self._listeners = 0
+        self._removed = 0
+        self._last_now = None
+        self._unsub_bus = None
 
     @callback
-    def pattern_time_change_listener(event):
-        """Listen for matching time_changed events."""
+    def async_add(self, listener):
+        """Add a time pattern listener.
+
+        Returns a function that can be called to remove the listener.
+        """
+        # The next match is calculated on the next time changed event, as
+        # that is the clock we follow.
+        self._new.append(listener)
+        self._listeners += 1
+
+        if self._unsub_bus is None:
+            self._unsub_bus = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed)
+
+        @callback
+        def remove_listener():
+            """Remove the listener."""
+            if listener.removed:
+                _LOGGER.warning("Unable to remove unknown listener %s",
+                                listener.action)
+                return
+
+            listener.removed = True
+            self._listeners -= 1
+            self._removed += 1
+
+            if not self._listeners:
+                self._unsub_bus()
+                self._unsub_bus = None
+                self._heap = []
+                self._new = []
+                self._removed = 0
+                self._last_now = None
+            elif self._removed > self._listeners:
+                self._compact()
+
+        return remove_listener
+
+    def _compact(self):
+        """Drop removed listeners."""
+        self._heap = [item for item in self._heap if not item[2].removed]
+        heapq.heapify(self._heap)
+        self._new = [listener for listener in self._new
+                     if not listener.removed]
+        self._removed = 0
+
+    def _schedule(self, listener, now, inclusive):
+        """Push a listener on the heap at the next time it can match."""
+        base = dt_util.as_local(now) if listener.local else now
+        start = base.replace(microsecond=0, tzinfo=None)
+        earliest = _event_time_as_utc(now).replace(microsecond=0)
+
+        if not inclusive:
+            start += timedelta(seconds=1)
+            earliest += timedelta(seconds=1)
+
+        next_match = listener.next_match(start)
+
+        if next_match is None:
+            return
+
+        # Never schedule in the past, for example around DST transitions.
+        due = max(_naive_to_utc(next_match, base.tzinfo), earliest)
+        heapq.heappush(self._heap, (due, next(self._sequence), listener))
+
+    @callback
+    def _async_time_changed(self, event):
+        """Fire the listeners that match the new time."""
         now = event.data[ATTR_NOW]
+        utc_now = _event_time_as_utc(now)
 
-        if local:
-            now = dt_util.as_local(now)
+        if self._last_now is not None and utc_now <= self._last_now:
+            # Time did not move forward, calculate all matches again.
+            self._compact()
+            self._new.extend(item[2] for item in self._heap)
+            self._heap = []
 
-        # pylint: disable=too-many-boolean-expressions
-        if second(now.second) and minute(now.minute) and hour(now.hour) and \
-           day(now.day) and month(now.month) and year(now.year):
+        self._last_now = utc_now
 
-            hass.async_run_job(action, now)
+        new, self._new = self._new, []
+        for listener in new:
+            if listener.removed:
+                self._removed -= 1
+            else:
+                self._schedule(listener, now, True)
 
-    return hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                 pattern_time_change_listener)
+        heap = self._heap
+        while heap and heap[0][0] <= utc_now:
+            listener = heapq.heappop(heap)[2]
 
+            if listener.removed:
+                self._removed -= 1
+                continue
 
-track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
+            local_now = dt_util.as_local(now) if listener.local else now
+            self._schedule(listener, now, False)
+
+            if not listener.matches(local_now):
+                continue
+
+            try:
+                self.hass.async_run_job(listener.action, local_now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running time pattern listener %s",
+                                  listener.action)
 
 
 @callback
@@ -382,6 +825,38 @@ def _process_state_match(parameter):
     return lambda state: state in parameter
 
 
+def _next_allowed(values, current):
+    """Return the first of the sorted values at or after current."""
+    idx = bisect_left(values, current)
+    return values[idx] if idx < len(values) else None
+
+
+def _event_time_as_utc(dattim):
+    """Return the time of a time changed event as UTC.
+
+    Naive times are treated as UTC, like dt_util.as_local does.
+    """
+    if dattim.tzinfo is None:
+        return dattim.replace(tzinfo=dt_util.UTC)
+    return dt_util.as_utc(dattim)
+
+
+def _naive_to_utc(dattim, time_zone):
+    """Convert a naive datetime in a time zone to UTC.
+
+    Ambiguous or non-existing local times resolve to the earliest candidate.
+    """
+    if time_zone is None:
+        return dattim.replace(tzinfo=dt_util.UTC)
+
+    if hasattr(time_zone, 'localize'):
+        return dt_util.as_utc(min(
+            time_zone.localize(dattim, is_dst=True),
+            time_zone.localize(dattim, is_dst=False)))
+
+    return dt_util.as_utc(dattim.replace(tzinfo=time_zone))
+
+
 def _process_time_match(parameter):
     """Wrap parameter in a tuple if it is not one and returns it."""
     if parameter is None or parameter == MATCH_ALL:
@@ -0,0 +1,203 @@
+"""Helpers to fan out bus events to many API clients."""
+import asyncio
+from collections import OrderedDict
+import logging
+
+from homeassistant.core import callback
+from homeassistant.loader import bind_hass
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_EVENT_BROADCASTER = 'event_broadcaster'
+
+
+@callback
+@bind_hass
+def async_subscribe(hass, event_type, target):
+    """Subscribe a callback to events of event_type through the broadcaster.
+
+    The broadcaster listens on the bus once per event type, however many
+    clients are subscribed. Target is called from within the event loop.
+
+    This method must be run in the event loop.
+    """
+    broadcaster = hass.data.get(DATA_EVENT_BROADCASTER)
+
+    if broadcaster is None:
+        broadcaster = hass.data[DATA_EVENT_BROADCASTER] = \
+            EventBroadcaster(hass)
+
+    return broadcaster.async_subscribe(event_type, target)
+
+
+class EventBroadcaster(object):
+    """Share one bus listener per event type between subscribers."""
+
+    def __init__(self, hass):
+        """Initialize the broadcaster."""
+        self.hass = hass
+        self._targets = {}
+        self._unsub_bus = {}
+
+    @callback
+    def async_subscribe(self, event_type, target):
+        """Subscribe target to events of event_type."""
+        if event_type not in self._targets:
+            self._targets[event_type] = []
+            self._unsub_bus[event_type] = self.hass.bus.async_listen(
+                event_type, self._broadcaster(event_type))
+
+        # Copy on write, a broadcast may be iterating over the list
+        self._targets[event_type] = self._targets[event_type] + [target]
+
+        @callback
+        def async_unsubscribe():
+            """Unsubscribe target."""
+            self._async_unsubscribe(event_type, target)
+
+        return async_unsubscribe
+
+    @callback
+    def _async_unsubscribe(self, event_type, target):
+        """Remove target and stop listening once nobody is subscribed."""
+        targets = self._targets.get(event_type)
+
+        if targets is None or target not in targets:
+            _LOGGER.warning("Unable to remove unknown subscriber %s", target)
+            return
+
+        targets = [other for other in targets if other is not target]
+
+        if targets:
+            self._targets[event_type] = targets
+            return
+
+        del self._targets[event_type]
+        self._unsub_bus.pop(event_type)()
+
+    def _broadcaster(self, event_type):
+        """Return the bus listener for event_type."""
+        @callback
+        def async_broadcast(event):
+            """Hand an event to every subscriber."""
+            for target in self._targets.get(event_type, ()):
+                try:
+                    target(event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error broadcasting %s", event)
+
+        return async_broadcast
+
+
+class MessageQueue(object):
+    """Queue of outgoing messages for one client with backpressure.
+
+    Messages are delivered in the order they were put. Once more than
+    coalesce_size messages are pending the client is falling behind: a
+    message put with a key then replaces the latest pending message with
+    the same key and moves to the end of the queue, so a slow client only
+    receives the latest of a series of updates. When the queue is full the
+    oldest keyed message is set aside to make room. It keeps its place in
+    the delivery order and is replaced by the next message with its key, so
+    the latest message for a key is never lost and set aside messages are
+    bounded by the number of keys. Messages without a key cannot be set
+    aside; asyncio.QueueFull is raised when the queue holds nothing else.
+    """
+
+    def __init__(self, loop, maxsize, coalesce_size=None):
+        """Initialize an empty queue."""
+        self.maxsize = maxsize
+        self.coalesce_size = maxsize // 2 if coalesce_size is None \
+            else coalesce_size
+        self.coalesced = 0
+        self.deferred = 0
+        self._loop = loop
+        self._pending = OrderedDict()
+        self._deferred = OrderedDict()
+        self._latest = {}
+        self._keyed = 0
+        self._seq = 0
+        self._waiter = None
+
+    def __len__(self):
+        """Return the number of pending messages."""
+        return len(self._pending) + len(self._deferred)
+
+    def put_nowait(self, message, key=None):
+        """Queue a message for the client."""
+        if key is not None:
+            slot = self._latest.get(key)
+
+            if slot is None:
+                pass
+            elif slot in self._deferred:
+                self._deferred[slot] = (key, message)
+                self.coalesced += 1
+                return
+            elif len(self._pending) >= self.coalesce_size:
+                del self._pending[slot]
+                self._keyed -= 1
+                self.coalesced += 1
+
+        if len(self._pending) >= self.maxsize:
+            self._defer_oldest()
+
+        slot = self._seq
+        self._seq += 1
+        self._pending[slot] = (key, message)
+        if key is not None:
+            self._latest[key] = slot
+            self._keyed += 1
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def clear(self):
+        """Remove all pending messages."""
+        self._pending.clear()
+        self._deferred.clear()
+        self._latest.clear()
+        self._keyed = 0
+
+    def _defer_oldest(self):
+        """Set the oldest keyed message aside."""
+        if not self._keyed:
+            raise asyncio.QueueFull
+
+        for slot, (key, message) in self._pending.items():
+            if key is not None:
+                break
+
+        # pylint: disable=undefined-loop-variable
+        del self._pending[slot]
+        self._keyed -= 1
+
+        if self._latest[key] == slot:
+            self._deferred[slot] = (key, message)
+            self.deferred += 1
+        else:
+            # A later message with the same key is pending
+            self.coalesced += 1
+
+    async def get(self):
+        """Remove and return the oldest message, waiting for one."""
+        while not self._pending and not self._deferred:
+            self._waiter = self._loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        # Slots increase in the order messages are put
+        if self._deferred and (
+                not self._pending or
+                next(iter(self._deferred)) < next(iter(self._pending))):
+            slot, (key, message) = self._deferred.popitem(last=False)
+        else:
+            slot, (key, message) = self._pending.popitem(last=False)
+            if key is not None:
+                self._keyed -= 1
+
+        if key is not None and self._latest.get(key) == slot:
+            del self._latest[key]
+        return message
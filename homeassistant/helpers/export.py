@@ -0,0 +1,179 @@
+"""Helpers to export events to external services in batches."""
+import logging
+import queue
+import threading
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+BATCH_TIMEOUT = 1
+BATCH_BUFFER_SIZE = 100
+QUEUE_SIZE = 10000
+QUEUE_BACKLOG_SECONDS = 30
+RETRY_DELAY = 1
+MAX_RETRY_DELAY = 60
+
+
+class ExportThread(threading.Thread):
+    """Write bus events to an external service from a worker thread.
+
+    Listeners only put events in a bounded queue. The thread converts them
+    with the converter registered for the event type and hands batches of
+    up to batch_size items to write_batch. A batch is written batch_timeout
+    seconds after its first event arrived, or as soon as the queue runs
+    empty after that, even when the converter skips most events. Failed
+    writes are retried with exponential backoff. Events are dropped and
+    counted when the queue is full or when they waited too long because the
+    service is down.
+    """
+
+    def __init__(self, hass, name, write_batch, *, max_tries=3,
+                 retry_exceptions=(IOError,), batch_size=BATCH_BUFFER_SIZE,
+                 batch_timeout=BATCH_TIMEOUT, queue_size=QUEUE_SIZE):
+        """Initialize the thread."""
+        threading.Thread.__init__(self, name=name)
+        self.daemon = True
+        self.hass = hass
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.write_batch = write_batch
+        self.max_tries = max_tries
+        self.retry_exceptions = retry_exceptions
+        self.batch_size = batch_size
+        self._batch_timeout = batch_timeout
+        self.shutdown = False
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._full = False
+
+    def listen(self, event_type, converter):
+        """Export events of event_type converted to an item by converter.
+
+        The converter runs in the worker thread and returns None to skip an
+        event.
+        """
+        @callback
+        def event_listener(event):
+            """Queue the event for export."""
+            try:
+                self.queue.put_nowait((time.monotonic(), converter, event))
+                self._full = False
+            except queue.Full:
+                self.dropped += 1
+                if not self._full:
+                    self._full = True
+                    _LOGGER.warning("%s export queue is full, dropping events",
+                                    self.name)
+
+        self.hass.bus.listen(event_type, event_listener)
+
+    def start(self):
+        """Start the thread and stop it when Home Assistant stops."""
+        super().start()
+
+        def shutdown(event):
+            """Shut down the thread after writing the queued events."""
+            self.queue.put(None)
+            self.join()
+
+        self.hass.bus.listen_once(EVENT_HOMEASSISTANT_STOP, shutdown)
+
+    def batch_timeout(self):
+        """Return number of seconds to wait for more events."""
+        return self._batch_timeout
+
+    def retry_delay(self, retry):
+        """Return the number of seconds to wait before a retry."""
+        return min(RETRY_DELAY * 2 ** retry, MAX_RETRY_DELAY)
+
+    def get_batch(self):
+        """Return the number of queue entries taken and a batch of items."""
+        queue_seconds = QUEUE_BACKLOG_SECONDS + sum(
+            self.retry_delay(retry) for retry in range(self.max_tries))
+
+        count = 0
+        batch = []
+        dropped = 0
+        deadline = None
+
+        try:
+            while len(batch) < self.batch_size and not self.shutdown:
+                timeout = None if deadline is None else \
+                    max(0, deadline - time.monotonic())
+                item = self.queue.get(timeout=timeout)
+                count += 1
+
+                if deadline is None:
+                    deadline = time.monotonic() + self.batch_timeout()
+
+                if item is None:
+                    self.shutdown = True
+                    continue
+
+                timestamp, converter, event = item
+                if time.monotonic() - timestamp >= queue_seconds:
+                    dropped += 1
+                    continue
+
+                try:
+                    converted = converter(event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error converting %s for %s",
+                                      event, self.name)
+                    continue
+
+                if converted is not None:
+                    batch.append(converted)
+
+        except queue.Empty:
+            pass
+
+        if dropped:
+            self.dropped += dropped
+            _LOGGER.warning("%s catching up, dropped %d old events",
+                            self.name, dropped)
+
+        return count, batch
+
+    def write(self, batch):
+        """Write a batch, with retry."""
+        for retry in range(self.max_tries + 1):
+            try:
+                self.write_batch(batch)
+            except self.retry_exceptions:
+                if retry < self.max_tries:
+                    time.sleep(self.retry_delay(retry))
+                    continue
+
+                if not self.write_errors:
+                    _LOGGER.exception("%s write error", self.name)
+                self.write_errors += len(batch)
+                return
+
+            if self.write_errors:
+                _LOGGER.error("%s resumed, lost %d events",
+                              self.name, self.write_errors)
+                self.write_errors = 0
+
+            self.written += len(batch)
+            _LOGGER.debug("%s wrote %d events", self.name, len(batch))
+            return
+
+    def run(self):
+        """Process queued events."""
+        while not self.shutdown:
+            count, batch = self.get_batch()
+            if batch:
+                try:
+                    self.write(batch)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error writing to %s", self.name)
+            for _ in range(count):
+                self.queue.task_done()
+
+    def block_till_done(self):
+        """Block till all events processed."""
+        self.queue.join()
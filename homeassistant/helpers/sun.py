@@ -1,4 +1,5 @@
 """Helpers for sun events."""
+from collections import OrderedDict
 import datetime
 
 from homeassistant.core import callback
@@ -6,6 +7,10 @@ from homeassistant.util import dt as dt_util
 from homeassistant.loader import bind_hass
 
 DATA_LOCATION_CACHE = 'astral_location_cache'
+DATA_EVENT_CACHE = 'astral_event_cache'
+
+# Number of (event, date) results kept for the configured location
+EVENT_CACHE_SIZE = 256
 
 
 @callback
@@ -14,11 +19,7 @@ def get_astral_location(hass):
     """Get an astral location for the current Home Assistant configuration."""
     from astral import Location
 
-    latitude = hass.config.latitude
-    longitude = hass.config.longitude
-    timezone = hass.config.time_zone.zone
-    elevation = hass.config.elevation
-    info = ('', '', latitude, longitude, timezone, elevation)
+    info = _location_info(hass)
 
     # Cache astral locations so they aren't recreated with the same args
     if DATA_LOCATION_CACHE not in hass.data:
@@ -30,31 +31,68 @@ def get_astral_location(hass):
     return hass.data[DATA_LOCATION_CACHE][info]
 
 
+def _location_info(hass):
+    """Return the astral location info of the configuration."""
+    return ('', '', hass.config.latitude, hass.config.longitude,
+            hass.config.time_zone.zone, hass.config.elevation)
+
+
 @callback
-@bind_hass
-def get_astral_event_next(hass, event, utc_point_in_time=None, offset=None):
-    """Calculate the next specified solar event."""
+def _get_astral_event(hass, event, date):
+    """Return the UTC time of an event on a date, None if it doesn't occur.
+
+    Results are cached until the configured location changes.
+    """
+    info = _location_info(hass)
+    cache = hass.data.get(DATA_EVENT_CACHE)
+
+    if cache is None or cache[0] != info:
+        cache = hass.data[DATA_EVENT_CACHE] = (info, OrderedDict())
+
+    events = cache[1]
+    key = (event, date)
+
+    try:
+        result = events[key]
+    except KeyError:
+        pass
+    else:
+        events.move_to_end(key)
+        return result
+
     import astral
 
-    location = get_astral_location(hass)
+    try:
+        result = getattr(get_astral_location(hass), event)(date, local=False)
+    except astral.AstralError:
+        # Event never occurs for specified date.
+        result = None
 
+    events[key] = result
+
+    if len(events) > EVENT_CACHE_SIZE:
+        events.popitem(last=False)
+
+    return result
+
+
+@callback
+@bind_hass
+def get_astral_event_next(hass, event, utc_point_in_time=None, offset=None):
+    """Calculate the next specified solar event."""
     if offset is None:
         offset = datetime.timedelta()
 
     if utc_point_in_time is None:
         utc_point_in_time = dt_util.utcnow()
 
+    today = dt_util.as_local(utc_point_in_time).date()
     mod = -1
     while True:
-        try:
-            next_dt = getattr(location, event)(
-                dt_util.as_local(utc_point_in_time).date() +
-                datetime.timedelta(days=mod),
-                local=False) + offset
-            if next_dt > utc_point_in_time:
-                return next_dt
-        except astral.AstralError:
-            pass
+        next_dt = _get_astral_event(
+            hass, event, today + datetime.timedelta(days=mod))
+        if next_dt is not None and next_dt + offset > utc_point_in_time:
+            return next_dt + offset
         mod += 1
 
 
@@ -62,21 +100,13 @@ def get_astral_event_next(hass, event, utc_point_in_time=None, offset=None):
 @bind_hass
 def get_astral_event_date(hass, event, date=None):
     """Calculate the astral event time for the specified date."""
-    import astral
-
-    location = get_astral_location(hass)
-
     if date is None:
         date = dt_util.now().date()
 
     if isinstance(date, datetime.datetime):
         date = dt_util.as_local(date).date()
 
-    try:
-        return getattr(location, event)(date, local=False)
-    except astral.AstralError:
-        # Event never occurs for specified date.
-        return None
+    return _get_astral_event(hass, event, date)
 
 
 @callback
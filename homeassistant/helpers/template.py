@@ -5,15 +5,16 @@ import logging
 import math
 import random
 import re
+import threading
 
 import jinja2
 from jinja2 import contextfilter
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 
 from homeassistant.const import (
-    ATTR_LATITUDE, ATTR_LONGITUDE, ATTR_UNIT_OF_MEASUREMENT, MATCH_ALL,
-    STATE_UNKNOWN)
-from homeassistant.core import State, valid_entity_id
+    ATTR_FRIENDLY_NAME, ATTR_LATITUDE, ATTR_LONGITUDE,
+    ATTR_UNIT_OF_MEASUREMENT, MATCH_ALL, STATE_UNKNOWN)
+from homeassistant.core import State, callback, valid_entity_id
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import location as loc_helper
 from homeassistant.loader import bind_hass, get_component
@@ -27,6 +28,9 @@ _SENTINEL = object()
 DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
+# Templates whose result can change without any state changing
+_RE_VOLATILE = re.compile(
+    r"\b(?:now|utcnow|relative_time|random|distance|closest)\b")
 _RE_GET_ENTITIES = re.compile(
     r"(?:(?:states\.|(?:is_state|is_state_attr|state_attr|states)"
     r"\((?:[\ \'\"]?))([\w]+\.[\w]+)|([\w]+))", re.I | re.M
@@ -82,6 +86,121 @@ def extract_entities(template, variables=None):
     return MATCH_ALL
 
 
+# Holds the RenderInfo of the template that is being rendered.
+_RENDER_INFO = threading.local()
+
+# Pseudo field that marks a dependency on the entire state object.
+_ALL_FIELDS = '*'
+
+
+def _get_render_info():
+    """Return the RenderInfo of the current render, if it is recorded."""
+    return getattr(_RENDER_INFO, 'info', None)
+
+
+class RenderInfo(object):
+    """Record the states a template accessed while rendering."""
+
+    def __init__(self, template, variables):
+        """Initialize the render info."""
+        self.template = template
+        self.variables = variables
+        self.result = None
+        self.exception = None
+        # Iterated over all states
+        self.all_states = None
+        # Maps domain to the states of the domain that were iterated over
+        self.domains = {}
+        # Maps entity_id to the state at render time and the fields read
+        self.entities = {}
+
+    def async_record_all_states(self, states):
+        """Record that all states were accessed."""
+        self.all_states = tuple(states)
+
+    def async_record_domain(self, domain, states):
+        """Record that all states of a domain were accessed."""
+        self.domains[domain] = tuple(states)
+
+    def async_record_entity(self, entity_id, state, field=None):
+        """Record that a field of an entity was accessed.
+
+        Without field only the existence of the entity was checked. An
+        attribute is recorded as an ('attributes', key) tuple.
+        """
+        entry = self.entities.get(entity_id)
+        if entry is None:
+            entry = self.entities[entity_id] = (state, set())
+        if field is not None:
+            entry[1].add(field)
+
+    @callback
+    def async_dependencies(self):
+        """Return the entity ids and domains the result depends on.
+
+        The entity ids are MATCH_ALL if any state change can alter the result.
+        Like extract_entities, a template that read no state at all depends
+        on every state.
+        """
+        if self.all_states is not None or \
+                not self.entities and not self.domains:
+            return MATCH_ALL, frozenset()
+
+        entity_ids = set(self.entities)
+
+        if self.template.is_volatile:
+            # Also follow the entities that branches not taken refer to
+            extracted = extract_entities(
+                self.template.template, self.variables)
+            if extracted == MATCH_ALL:
+                return MATCH_ALL, frozenset()
+            entity_ids.update(extracted)
+
+        return frozenset(entity_ids), frozenset(self.domains)
+
+    @callback
+    def async_has_changed(self, hass):
+        """Return if any of the accessed states changed since the render."""
+        states = hass.states
+
+        if self.all_states is not None and \
+                _states_changed(self.all_states, states.async_all()):
+            return True
+
+        for domain, domain_states in self.domains.items():
+            if _states_changed(
+                    domain_states, states.async_domain_states(domain)):
+                return True
+
+        for entity_id, (old_state, fields) in self.entities.items():
+            new_state = states.get(entity_id)
+
+            if new_state is old_state:
+                continue
+            elif new_state is None or old_state is None or \
+                    _ALL_FIELDS in fields:
+                return True
+
+            for field in fields:
+                if field == 'state':
+                    if new_state.state != old_state.state:
+                        return True
+                elif field == 'attributes':
+                    if new_state.attributes != old_state.attributes:
+                        return True
+                elif new_state.attributes.get(field[1]) != \
+                        old_state.attributes.get(field[1]):
+                    return True
+
+        return False
+
+
+def _states_changed(old_states, new_states):
+    """Return if a list of states is not made of the same state objects."""
+    return len(old_states) != len(new_states) or any(
+        old is not new for old, new in zip(old_states, new_states))
+
+
 class Template(object):
     """Class to hold a template and manage caching and rendering."""
 
@@ -93,6 +212,8 @@ class Template(object):
         self.template = template
         self._compiled_code = None
         self._compiled = None
+        self.is_volatile = _RE_VOLATILE.search(template) is not None
+        self._render_cache = None
         self.hass = hass
 
     def ensure_valid(self):
@@ -133,6 +254,69 @@ class Template(object):
         except jinja2.TemplateError as err:
             raise TemplateError(err)
 
+    def async_render_cached(self, variables=None, **kwargs):
+        """Render given template, reusing the previous result if possible.
+
+        The previous result is returned if the variables are the same and
+        none of the states that the previous render read have changed.
+
+        This method must be run in the event loop.
+        """
+        info = self.async_render_info_cached(variables, **kwargs)
+
+        if info.exception is not None:
+            raise info.exception
+
+        return info.result
+
+    def async_render_info_cached(self, variables=None, **kwargs):
+        """Return the RenderInfo of the previous render if still valid.
+
+        Renders the template if the previous result can not be reused.
+
+        This method must be run in the event loop.
+        """
+        if variables is not None:
+            kwargs.update(variables)
+
+        cache = self._render_cache
+        if cache is not None and cache.variables == kwargs and \
+                not cache.async_has_changed(self.hass):
+            return cache
+
+        info = self.async_render_with_info(kwargs)
+
+        if self.is_volatile or info.exception is not None:
+            self._render_cache = None
+        else:
+            self._render_cache = info
+
+        return info
+
+    def async_render_with_info(self, variables=None, **kwargs):
+        """Render given template and record which states it accessed.
+
+        Returns a RenderInfo with the result, or with the TemplateError if
+        the template failed to render.
+
+        This method must be run in the event loop.
+        """
+        if variables is not None:
+            kwargs.update(variables)
+
+        info = RenderInfo(self, kwargs)
+        previous = _get_render_info()
+        _RENDER_INFO.info = info
+
+        try:
+            info.result = self.async_render(kwargs)
+        except TemplateError as ex:
+            info.exception = ex
+        finally:
+            _RENDER_INFO.info = previous
+
+        return info
+
     def render_with_possible_json_value(self, value, error_value=_SENTINEL):
         """Render template with value exposed.
 
@@ -180,7 +364,7 @@ class Template(object):
         global_vars = ENV.make_globals({
             'closest': template_methods.closest,
             'distance': template_methods.distance,
-            'is_state': self.hass.states.is_state,
+            'is_state': template_methods.is_state,
             'is_state_attr': template_methods.is_state_attr,
             'state_attr': template_methods.state_attr,
             'states': AllStates(self.hass),
@@ -211,18 +395,26 @@ class AllStates(object):
 
     def __iter__(self):
         """Return all states."""
+        states = self._hass.states.async_all()
+        info = _get_render_info()
+        if info is not None:
+            info.async_record_all_states(states)
+
         return iter(
             _wrap_state(state) for state in
-            sorted(self._hass.states.async_all(),
-                   key=lambda state: state.entity_id))
+            sorted(states, key=lambda state: state.entity_id))
 
     def __len__(self):
         """Return number of states."""
+        info = _get_render_info()
+        if info is not None:
+            info.async_record_all_states(self._hass.states.async_all())
+
         return len(self._hass.states.async_entity_ids())
 
     def __call__(self, entity_id):
         """Return the states."""
-        state = self._hass.states.get(entity_id)
+        state = _get_state(self._hass, entity_id, 'state')
         return STATE_UNKNOWN if state is None else state.state
 
 
@@ -237,18 +429,26 @@ class DomainStates(object):
     def __getattr__(self, name):
         """Return the states."""
         return _wrap_state(
-            self._hass.states.get('{}.{}'.format(self._domain, name)))
+            _get_state(self._hass, '{}.{}'.format(self._domain, name)))
 
     def __iter__(self):
         """Return the iteration over all the states."""
+        states = self._domain_states()
         return iter(sorted(
-            (_wrap_state(state) for state in self._hass.states.async_all()
-             if state.domain == self._domain),
+            (_wrap_state(state) for state in states),
             key=lambda state: state.entity_id))
 
     def __len__(self):
         """Return number of states."""
-        return len(self._hass.states.async_entity_ids(self._domain))
+        return len(self._domain_states())
+
+    def _domain_states(self):
+        """Return the states of the domain and record the access."""
+        states = self._hass.states.async_domain_states(self._domain)
+        info = _get_render_info()
+        if info is not None:
+            info.async_record_domain(self._domain.lower(), states)
+        return states
 
 
 class TemplateState(State):
@@ -264,6 +464,12 @@ class TemplateState(State):
     def state_with_unit(self):
         """Return the state concatenated with the unit if available."""
         state = object.__getattribute__(self, '_state')
+        info = _get_render_info()
+        if info is not None:
+            info.async_record_entity(state.entity_id, state, 'state')
+            info.async_record_entity(
+                state.entity_id, state,
+                ('attributes', ATTR_UNIT_OF_MEASUREMENT))
         unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
         if unit is None:
             return state.state
@@ -273,12 +479,31 @@ class TemplateState(State):
         """Return an attribute of the state."""
         if name in TemplateState.__dict__:
             return object.__getattribute__(self, name)
-        return getattr(object.__getattribute__(self, '_state'), name)
+
+        state = object.__getattribute__(self, '_state')
+        info = _get_render_info()
+        if info is None or name.startswith('_') or \
+                name in ('entity_id', 'domain', 'object_id'):
+            return getattr(state, name)
+
+        if name in ('state', 'attributes'):
+            info.async_record_entity(state.entity_id, state, name)
+        elif name == 'name':
+            info.async_record_entity(
+                state.entity_id, state, ('attributes', ATTR_FRIENDLY_NAME))
+        else:
+            info.async_record_entity(state.entity_id, state, _ALL_FIELDS)
+
+        return getattr(state, name)
 
     def __repr__(self):
         """Representation of Template State."""
-        rep = object.__getattribute__(self, '_state').__repr__()
-        return '<template ' + rep[1:]
+        state = object.__getattribute__(self, '_state')
+        info = _get_render_info()
+        if info is not None:
+            # Also used by str(), the output shows the entire state
+            info.async_record_entity(state.entity_id, state, _ALL_FIELDS)
+        return '<template ' + state.__repr__()[1:]
 
 
 def _wrap_state(state):
@@ -286,6 +511,15 @@ def _wrap_state(state):
     return None if state is None else TemplateState(state)
 
 
+def _get_state(hass, entity_id, field=None):
+    """Get a state and record the access if the render is recorded."""
+    state = hass.states.get(entity_id)
+    info = _get_render_info()
+    if info is not None:
+        info.async_record_entity(entity_id.lower(), state, field)
+    return state
+
+
 class TemplateMethods(object):
     """Class to expose helpers to templates."""
 
@@ -404,6 +638,11 @@ class TemplateMethods(object):
         return self._hass.config.units.length(
             loc_util.distance(*locations[0] + locations[1]), 'm')
 
+    def is_state(self, entity_id, state):
+        """Test if an entity is a specific state."""
+        state_obj = _get_state(self._hass, entity_id, 'state')
+        return state_obj is not None and state_obj.state == state
+
     def is_state_attr(self, entity_id, name, value):
         """Test if a state is a specific attribute."""
         state_attr = self.state_attr(entity_id, name)
@@ -411,7 +650,8 @@ class TemplateMethods(object):
 
     def state_attr(self, entity_id, name):
         """Get a specific attribute from a state."""
-        state_obj = self._hass.states.get(entity_id)
+        state_obj = _get_state(
+            self._hass, entity_id, ('attributes', name))
         if state_obj is not None:
             return state_obj.attributes.get(name)
         return None
@@ -7,7 +7,6 @@ HomeAssistantError will be raised.
 For more details about the Python API, please refer to the documentation at
 https://home-assistant.io/developers/python_api/
 """
-from datetime import datetime
 import enum
 import json
 import logging
@@ -24,6 +23,7 @@ from homeassistant.const import (
     URL_API_SERVICES, CONTENT_TYPE_JSON, HTTP_HEADER_HA_AUTH,
     URL_API_EVENTS_EVENT, URL_API_STATES_ENTITY, URL_API_SERVICES_SERVICE)
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.json import JSONEncoder
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -107,25 +107,6 @@ class API(object):
             self.base_url, 'yes' if self.api_password is not None else 'no')
 
 
-class JSONEncoder(json.JSONEncoder):
-    """JSONEncoder that supports Home Assistant objects."""
-
-    # pylint: disable=method-hidden
-    def default(self, o):
-        """Convert Home Assistant objects.
-
-        Hand other objects to the original method.
-        """
-        if isinstance(o, datetime):
-            return o.isoformat()
-        elif isinstance(o, set):
-            return list(o)
-        elif hasattr(o, 'as_dict'):
-            return o.as_dict()
-
-        return json.JSONEncoder.default(self, o)
-
-
 def validate_api(api):
     """Make a call to validate API."""
     try:
@@ -4,10 +4,14 @@ from functools import partial
 import logging
 import os
 
+from homeassistant.exceptions import HomeAssistantError
 import homeassistant.util.package as pkg_util
+from homeassistant.util.json import load_json, save_json
 
 DATA_PIP_LOCK = 'pip_lock'
+DATA_REQUIREMENTS_CACHE = 'requirements_cache'
 CONSTRAINT_FILE = 'package_constraints.txt'
+REQUIREMENTS_CACHE_FILE = '.requirements_cache'
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -24,7 +28,26 @@ async def async_process_requirements(hass, name, requirements):
                           **pip_kwargs(hass.config.config_dir))
 
     async with pip_lock:
-        for req in requirements:
+        cache_path = hass.config.path(REQUIREMENTS_CACHE_FILE)
+        satisfied = hass.data.get(DATA_REQUIREMENTS_CACHE)
+        if satisfied is None:
+            satisfied = hass.data[DATA_REQUIREMENTS_CACHE] = \
+                await hass.async_add_job(load_requirements_cache, cache_path)
+
+        missing = [req for req in requirements if req not in satisfied]
+        if not missing:
+            return True
+
+        installed = await hass.async_add_job(
+            _installed_requirements, missing)
+        if installed:
+            satisfied.update(installed)
+            await hass.async_add_job(
+                save_requirements_cache, cache_path, satisfied)
+
+        for req in missing:
+            if req in installed:
+                continue
             ret = await hass.async_add_job(pip_install, req)
             if not ret:
                 _LOGGER.error("Not initializing %s because could not install "
@@ -34,6 +57,41 @@ async def async_process_requirements(hass, name, requirements):
     return True
 
 
+def _installed_requirements(requirements):
+    """Return the requirements that are already met."""
+    with pkg_util.INSTALL_LOCK:
+        return {req for req in requirements
+                if pkg_util.check_package_exists(req)}
+
+
+def load_requirements_cache(path):
+    """Load the requirements found met in this Python environment before.
+
+    The cache is discarded when the environment changed since it was saved.
+    """
+    try:
+        data = load_json(path)
+    except HomeAssistantError:
+        return set()
+
+    if not data or not isinstance(data, dict) or \
+            data.get('environment') != pkg_util.environment_key():
+        return set()
+
+    return set(data.get('requirements', []))
+
+
+def save_requirements_cache(path, requirements):
+    """Save the requirements known to be met in this Python environment."""
+    try:
+        save_json(path, {
+            'environment': pkg_util.environment_key(),
+            'requirements': sorted(requirements),
+        })
+    except HomeAssistantError:
+        pass
+
+
 def pip_kwargs(config_dir):
     """Return keyword arguments for PIP install."""
     kwargs = {
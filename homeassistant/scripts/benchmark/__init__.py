@@ -1,9 +1,12 @@
 """Script to run benchmarks."""
 import argparse
 import asyncio
+from collections import OrderedDict
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+import os
+import tempfile
 from timeit import default_timer as timer
 
 from homeassistant import core
@@ -81,6 +84,38 @@ async def async_million_events(hass):
 # pylint: disable=invalid-name
 async def async_million_time_changed_helper(hass):
     """Run a million events through time changed helper."""
+    def track(listener):
+        """Track the pattern through the scheduler."""
+        hass.helpers.event.async_track_time_change(
+            listener, minute=0, second=0)
+
+    return await _async_million_time_changed(hass, track)
+
+
+@benchmark
+# pylint: disable=invalid-name
+async def async_million_time_changed_legacy(hass):
+    """Run a million events through a pattern bus listener.
+
+    This evaluates the pattern on every event, like the time change helper
+    did before it used a scheduler.
+    """
+    def track(listener):
+        """Track the pattern with a bus listener."""
+        @core.callback
+        def pattern_listener(event):
+            """Call the listener when the pattern matches."""
+            now = event.data[ATTR_NOW]
+            if now.minute == 0 and now.second == 0:
+                listener(now)
+
+        hass.bus.async_listen(EVENT_TIME_CHANGED, pattern_listener)
+
+    return await _async_million_time_changed(hass, track)
+
+
+async def _async_million_time_changed(hass, track):
+    """Fire a million matching time changed events at a tracked pattern."""
     count = 0
     event = asyncio.Event(loop=hass.loop)
 
@@ -93,7 +128,7 @@ async def async_million_time_changed_helper(hass):
         if count == 10**6:
             event.set()
 
-    hass.helpers.event.async_track_time_change(listener, minute=0, second=0)
+    track(listener)
     event_data = {
         ATTR_NOW: datetime(2017, 10, 10, 15, 0, 0, tzinfo=dt_util.UTC)
     }
@@ -108,10 +143,77 @@ async def async_million_time_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+# pylint: disable=invalid-name
+async def async_thousand_time_patterns_helper(hass):
+    """Run a day of time changed events past 1,000 time patterns."""
+    count = 0
+
+    @core.callback
+    def listener(_):
+        """Handle time change."""
+        nonlocal count
+        count += 1
+
+    for idx in range(1000):
+        hass.helpers.event.async_track_utc_time_change(
+            listener, minute=idx % 60, second=0)
+
+    return await _async_run_time_changed_day(hass)
+
+
+@benchmark
+# pylint: disable=invalid-name
+async def async_thousand_time_patterns_legacy(hass):
+    """Run a day of time changed events past 1,000 pattern bus listeners.
+
+    This evaluates every pattern on every event, like the time change
+    helper did before it used a scheduler.
+    """
+    count = 0
+
+    def pattern_listener(minute):
+        """Create a listener matching a minute."""
+        @core.callback
+        def listener(event):
+            """Handle time change."""
+            nonlocal count
+            now = event.data[ATTR_NOW]
+            if now.second == 0 and now.minute == minute:
+                count += 1
+
+        return listener
+
+    for idx in range(1000):
+        hass.bus.async_listen(EVENT_TIME_CHANGED, pattern_listener(idx % 60))
+
+    return await _async_run_time_changed_day(hass)
+
+
+async def _async_run_time_changed_day(hass):
+    """Fire a time changed event for every second of a day."""
+    now = datetime(2017, 10, 10, 0, 0, 0, tzinfo=dt_util.UTC)
+
+    start = timer()
+
+    for _ in range(86400):
+        now += timedelta(seconds=1)
+        hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: now})
+        # Process the listeners
+        await asyncio.sleep(0, loop=hass.loop)
+
+    await hass.async_block_till_done()
+
+    return timer() - start
+
+
 @benchmark
 # pylint: disable=invalid-name
 async def async_million_state_changed_helper(hass):
-    """Run a million events through state changed helper."""
+    """Run a million events through state changed helper.
+
+    1,000 trackers for unrelated entities are registered as well.
+    """
     count = 0
     entity_id = 'light.kitchen'
     event = asyncio.Event(loop=hass.loop)
@@ -127,6 +229,12 @@ async def async_million_state_changed_helper(hass):
 
     hass.helpers.event.async_track_state_change(
         entity_id, listener, 'off', 'on')
+
+    # Trackers for other entities should not slow down the dispatch.
+    for idx in range(1000):
+        hass.helpers.event.async_track_state_change(
+            'sensor.unrelated_{}'.format(idx), listener)
+
     event_data = {
         'entity_id': entity_id,
         'old_state': core.State(entity_id, 'off'),
@@ -143,6 +251,244 @@ async def async_million_state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def mqtt_million_messages(hass):
+    """Dispatch a million messages across thousands of subscriptions."""
+    from homeassistant.components.mqtt import Subscription, TopicMatcher
+
+    count = 0
+
+    @core.callback
+    def listener(*args):
+        """Handle message."""
+        nonlocal count
+        count += 1
+
+    matcher = TopicMatcher()
+    topics = []
+
+    for device in range(1000):
+        topic = 'zigbee2mqtt/device_{}'.format(device)
+        topics.append(topic)
+        matcher.add(Subscription(topic, listener))
+        matcher.add(Subscription(topic + '/availability', listener))
+        matcher.add(Subscription('tele/device_{}/+'.format(device), listener))
+
+    matcher.add(Subscription('homeassistant/#', listener))
+
+    start = timer()
+
+    for idx in range(10**6):
+        for subscription in matcher.match(topics[idx % 1000]):
+            subscription.callback()
+
+    return timer() - start
+
+
+@benchmark
+async def recorder_sustained_events(hass):
+    """Write 10,000 state changes through the recorder.
+
+    Set RECORDER_MAX_BATCH_SIZE and RECORDER_COMMIT_INTERVAL to compare
+    batch settings.
+    """
+    from homeassistant.components import recorder
+    from homeassistant.setup import async_setup_component
+
+    count = 10**4
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        await async_setup_component(hass, recorder.DOMAIN, {
+            recorder.DOMAIN: {
+                recorder.CONF_DB_URL: 'sqlite:///{}'.format(
+                    os.path.join(tmpdir, 'benchmark.db')),
+                recorder.CONF_MAX_BATCH_SIZE: int(
+                    os.environ.get('RECORDER_MAX_BATCH_SIZE', 1)),
+                recorder.CONF_COMMIT_INTERVAL: float(
+                    os.environ.get('RECORDER_COMMIT_INTERVAL', 0)),
+            }
+        })
+        await hass.async_start()
+        instance = hass.data[recorder.DATA_INSTANCE]
+        await hass.async_add_job(instance.block_till_done)
+
+        start = timer()
+
+        for idx in range(count):
+            hass.states.async_set(
+                'sensor.power_{}'.format(idx % 100), idx, {'unit': 'W'})
+
+        await hass.async_add_job(instance.block_till_done)
+        runtime = timer() - start
+
+        # Close the database before the directory is removed
+        instance.queue.put(None)
+        await hass.async_add_job(instance.join)
+
+    return runtime
+
+
+@benchmark
+async def entity_registry_get_or_create(hass):
+    """Register 10,000 entities and look them up again, like a restart."""
+    from homeassistant.helpers import entity_registry
+
+    registry = entity_registry.EntityRegistry(hass)
+    registry.entities = OrderedDict()
+
+    start = timer()
+
+    for _ in range(2):
+        for idx in range(10**4):
+            registry.async_get_or_create(
+                'sensor', 'benchmark', str(idx),
+                suggested_object_id='sensor {}'.format(idx % 100))
+
+    runtime = timer() - start
+
+    registry._sched_save.cancel()  # pylint: disable=protected-access
+
+    return runtime
+
+
+@benchmark
+async def group_nested_state_churn(hass):
+    """Toggle 300 lights 10,000 times through nested groups.
+
+    Every light is in group.all_lights and one of ten room groups, which are
+    in turn members of group.all_rooms.
+    """
+    from homeassistant.components.group import Group
+
+    hass.async_track_tasks()
+    # The entity registry is loaded from the configuration directory
+    hass.config.config_dir = tempfile.gettempdir()
+
+    lights = ['light.light_{}'.format(idx) for idx in range(300)]
+    for entity_id in lights:
+        hass.states.async_set(entity_id, 'off')
+
+    await Group.async_create_group(hass, 'all lights', lights)
+    rooms = []
+    for room in range(10):
+        group = await Group.async_create_group(
+            hass, 'room {}'.format(room), lights[room::10])
+        rooms.append(group.entity_id)
+    await Group.async_create_group(hass, 'all rooms', rooms)
+    await hass.async_block_till_done()
+
+    start = timer()
+
+    for idx in range(10**4):
+        hass.states.async_set(
+            lights[idx % 300], 'on' if idx // 300 % 2 == 0 else 'off')
+        if idx % 100 == 0:
+            await hass.async_block_till_done()
+
+    await hass.async_block_till_done()
+
+    return timer() - start
+
+
+@benchmark
+async def zone_active_zone_lookup(hass):
+    """Resolve 10,000 GPS reports against 120 zones."""
+    from homeassistant.components import zone
+
+    for idx in range(120):
+        hass.states.async_set('zone.zone_{}'.format(idx), zone.STATE, {
+            'latitude': 52.3 + idx % 12 * 0.01,
+            'longitude': 4.8 + idx // 12 * 0.01,
+            'radius': 100 + idx % 5 * 50,
+            'passive': idx % 10 == 0,
+        })
+
+    await hass.async_block_till_done()
+
+    start = timer()
+
+    for idx in range(10**4):
+        zone.async_active_zone(
+            hass, 52.3 + idx % 130 * 0.001, 4.8 + idx % 110 * 0.001, 30)
+
+    return timer() - start
+
+
+@benchmark
+async def statistics_window_rolling(hass):
+    """Update statistics over a 1,000 sample window 10,000 times."""
+    from homeassistant.util.rolling import RollingStatistics
+
+    window = RollingStatistics(maxlen=1000)
+
+    start = timer()
+
+    for idx in range(10**4):
+        window.append(idx % 97 * 0.5)
+        if len(window) > 1:
+            window.mean()
+            window.median()
+            window.stdev()
+            window.min()
+            window.max()
+
+    return timer() - start
+
+
+@benchmark
+async def statistics_window_recompute(hass):
+    """Recompute statistics over a 1,000 sample window 10,000 times.
+
+    Baseline for statistics_window_rolling, recomputing from scratch like the
+    statistics sensor used to.
+    """
+    import statistics
+    from collections import deque
+
+    window = deque(maxlen=1000)
+
+    start = timer()
+
+    for idx in range(10**4):
+        window.append(idx % 97 * 0.5)
+        if len(window) > 1:
+            statistics.mean(window)
+            statistics.median(window)
+            statistics.stdev(window)
+            min(window)
+            max(window)
+
+    return timer() - start
+
+
+@benchmark
+async def json_serialize_states(hass):
+    """Serialize 5,000 states for 100 /api/states requests.
+
+    A tenth of the states change between two requests.
+    """
+    from homeassistant.components.api import APIStatesView
+
+    view = APIStatesView()
+    entity_ids = ['sensor.sensor_{}'.format(idx) for idx in range(5000)]
+    attributes = {
+        'unit_of_measurement': '°C',
+        'friendly_name': 'Temperature',
+        'updated': dt_util.utcnow(),
+    }
+    for entity_id in entity_ids:
+        hass.states.async_set(entity_id, 0, attributes)
+
+    start = timer()
+
+    for idx in range(100):
+        for entity_id in entity_ids[idx % 10::10]:
+            hass.states.async_set(entity_id, idx, attributes)
+        view.json(hass.states.async_all())
+
+    return timer() - start
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(hass):
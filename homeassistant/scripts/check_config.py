@@ -198,7 +198,7 @@ def check(config_dir, secrets=False):
 
     if secrets:
         # Ensure !secrets point to the patched function
-        yaml.yaml.SafeLoader.add_constructor('!secret', yaml._secret_yaml)
+        yaml.add_constructor('!secret', yaml._secret_yaml)
 
     try:
         class HassConfig():
@@ -211,7 +211,9 @@ def check(config_dir, secrets=False):
 
         loader.prepare(HassConfig(config_dir))
 
-        res['components'] = check_ha_config_file(config_dir)
+        # A cached load would bypass the secrets that need to be reported
+        res['components'] = check_ha_config_file(
+            config_dir, cache=not secrets, files=res['yaml_files'])
 
         res['secret_cache'] = OrderedDict(yaml.__SECRET_CACHE)
 
@@ -230,7 +232,7 @@ def check(config_dir, secrets=False):
             pat.stop()
         if secrets:
             # Ensure !secrets point to the original function
-            yaml.yaml.SafeLoader.add_constructor('!secret', yaml._secret_yaml)
+            yaml.add_constructor('!secret', yaml._secret_yaml)
         bootstrap.clear_secret_cache()
 
     return res
@@ -290,8 +292,13 @@ class HomeAssistantConfig(OrderedDict):
         return self
 
 
-def check_ha_config_file(config_dir):
-    """Check if Home Assistant configuration file is valid."""
+def check_ha_config_file(config_dir, cache=True, files=None):
+    """Check if Home Assistant configuration file is valid.
+
+    The configuration is read through the config cache unless cache is
+    False. The names of the YAML files it was loaded from are added to files
+    when given.
+    """
     result = HomeAssistantConfig()
 
     def _pack_error(package, component, config, message):
@@ -312,7 +319,7 @@ def check_ha_config_file(config_dir):
         config_path = find_config_file(config_dir)
         if not config_path:
             return result.add_error("File configuration.yaml not found.")
-        config = load_yaml_config_file(config_path)
+        config = load_yaml_config_file(config_path, cache, files)
     except HomeAssistantError as err:
         return result.add_error(
             "Error loading {}: {}".format(config_path, err))
@@ -1,4 +1,5 @@
 """JSON utility functions."""
+from datetime import datetime
 import logging
 from typing import Union, List, Dict
 
@@ -51,3 +52,55 @@ def save_json(filename: str, data: Union[List, Dict]):
                           filename)
         raise HomeAssistantError(error)
     return False
+
+
+class JSONEncoder(json.JSONEncoder):
+    """JSONEncoder that supports Home Assistant objects."""
+
+    # pylint: disable=method-hidden
+    def default(self, o):
+        """Convert Home Assistant objects.
+
+        Hand other objects to the original method.
+        """
+        if isinstance(o, datetime):
+            return o.isoformat()
+        elif isinstance(o, set):
+            return list(o)
+        elif hasattr(o, 'as_dict'):
+            return o.as_dict()
+
+        return json.JSONEncoder.default(self, o)
+
+
+def dumps(obj):
+    """Serialize obj to a JSON string with sorted keys.
+
+    Objects with a cached JSON representation, on their own or in lists
+    (nested lists too), are spliced in without being encoded again.
+
+    Async friendly.
+    """
+    spliced = _splice(obj)
+    if spliced is not None:
+        return spliced
+
+    return json.dumps(obj, sort_keys=True, cls=JSONEncoder)
+
+
+def _splice(obj):
+    """Return the JSON of obj made of cached JSON only, None if not."""
+    if hasattr(obj, 'as_json'):
+        return obj.as_json()
+
+    if not isinstance(obj, list):
+        return None
+
+    parts = []
+    for item in obj:
+        part = _splice(item)
+        if part is None:
+            return None
+        parts.append(part)
+
+    return '[{}]'.format(', '.join(parts))
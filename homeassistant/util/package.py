@@ -15,6 +15,12 @@ _LOGGER = logging.getLogger(__name__)
 
 INSTALL_LOCK = threading.Lock()
 
+# Distributions on sys.path, shared by package checks until an install
+_ENVIRONMENT = None
+
+# Directory entries holding the metadata of an installed distribution
+DIST_SUFFIXES = ('.dist-info', '.egg-info', '.egg', '.egg-link')
+
 
 def is_virtual_env():
     """Return if we run in a virtual environtment."""
@@ -30,6 +36,8 @@ def install_package(package: str, upgrade: bool = True,
 
     Return boolean if install successful.
     """
+    # pylint: disable=global-statement
+    global _ENVIRONMENT
     # Not using 'import pip; pip.main([])' because it breaks the logger
     with INSTALL_LOCK:
         if check_package_exists(package):
@@ -53,6 +61,7 @@ def install_package(package: str, upgrade: bool = True,
                 args += ['--prefix=']
         process = Popen(args, stdin=PIPE, stdout=PIPE, stderr=PIPE, env=env)
         _, stderr = process.communicate()
+        _ENVIRONMENT = None
         if process.returncode != 0:
             _LOGGER.error("Unable to install package %s: %s",
                           package, stderr.decode('utf-8').lstrip().strip())
@@ -73,8 +82,37 @@ def check_package_exists(package: str) -> bool:
         # This is a zip file
         req = pkg_resources.Requirement.parse(urlparse(package).fragment)
 
-    env = pkg_resources.Environment()
-    return any(dist in req for dist in env[req.project_name])
+    # pylint: disable=global-statement
+    global _ENVIRONMENT
+    if _ENVIRONMENT is None:
+        _ENVIRONMENT = pkg_resources.Environment()
+    return any(dist in req for dist in _ENVIRONMENT[req.project_name])
+
+
+def environment_key() -> dict:
+    """Return a key that changes when packages are installed or removed.
+
+    Directories on sys.path are compared by the metadata entries of the
+    distributions they hold. Their modification time is not used, as the
+    configuration directory is on sys.path when it has custom components and
+    changes all the time. Zipped paths are compared by modification time.
+    """
+    paths = []
+    for path in sys.path:
+        try:
+            if os.path.isdir(path):
+                paths.append([path, sorted(
+                    name for name in os.listdir(path)
+                    if name.endswith(DIST_SUFFIXES))])
+            elif os.path.isfile(path):
+                paths.append([path, os.stat(path).st_mtime])
+        except OSError:
+            continue
+    return {
+        'executable': sys.executable,
+        'paths': paths,
+        'python': sys.version,
+    }
 
 
 def _get_user_site(deps_dir: str) -> tuple:
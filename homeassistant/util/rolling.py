@@ -0,0 +1,253 @@
+"""Rolling window statistics that update in constant time per sample."""
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from statistics import StatisticsError
+
+# Number of removals after which the running sums are recomputed exactly
+# from the window to stop floating point drift from accumulating.
+RESYNC_INTERVAL = 1000
+
+
+class RollingWindow(object):
+    """Window of comparable values with O(1) amortized min and max.
+
+    Minimum and maximum are kept in monotonic deques, so both appending and
+    evicting the oldest value are amortized constant time.
+    """
+
+    def __init__(self, maxlen=None):
+        """Initialize an empty window holding at most maxlen values."""
+        self.maxlen = maxlen
+        self._values = deque()
+        self._mins = deque()
+        self._maxs = deque()
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self):
+        """Return the number of values in the window."""
+        return len(self._values)
+
+    def __iter__(self):
+        """Iterate over the values from oldest to newest."""
+        return iter(self._values)
+
+    def __getitem__(self, index):
+        """Return the value at index, oldest first."""
+        return self._values[index]
+
+    def append(self, value):
+        """Add a value, evicting the oldest one if the window is full."""
+        if self.maxlen is not None and len(self._values) >= self.maxlen:
+            if not self.maxlen:
+                return
+            self.popleft()
+
+        self._values.append(value)
+
+        while self._mins and self._mins[-1][1] > value:
+            self._mins.pop()
+        self._mins.append((self._tail, value))
+
+        while self._maxs and self._maxs[-1][1] < value:
+            self._maxs.pop()
+        self._maxs.append((self._tail, value))
+
+        self._tail += 1
+
+    def popleft(self):
+        """Remove and return the oldest value."""
+        value = self._values.popleft()
+
+        if self._mins[0][0] == self._head:
+            self._mins.popleft()
+        if self._maxs[0][0] == self._head:
+            self._maxs.popleft()
+
+        self._head += 1
+        return value
+
+    def clear(self):
+        """Remove all values."""
+        self._values.clear()
+        self._mins.clear()
+        self._maxs.clear()
+        self._head = self._tail = 0
+
+    def min(self):
+        """Return the smallest value in the window."""
+        if not self._mins:
+            raise ValueError("min() of empty window")
+        return self._mins[0][1]
+
+    def max(self):
+        """Return the largest value in the window."""
+        if not self._maxs:
+            raise ValueError("max() of empty window")
+        return self._maxs[0][1]
+
+
+class RollingStatistics(RollingWindow):
+    """Window of numbers with running sum, mean, variance and median.
+
+    Mean and variance follow Welford's algorithm extended with removal of the
+    oldest sample. The median is read from a sorted copy of the window that is
+    maintained with binary search on every append and eviction.
+
+    Error behaviour matches the statistics module: StatisticsError is raised
+    when there are not enough data points. Only finite numbers can be added,
+    a NaN or infinity would stay in the running sums after it left the
+    window.
+    """
+
+    def __init__(self, maxlen=None):
+        """Initialize an empty window holding at most maxlen numbers."""
+        super().__init__(maxlen)
+        self._sorted = []
+        self._sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removals = 0
+
+    def append(self, value):
+        """Add a number, evicting the oldest one if the window is full."""
+        if not math.isfinite(value):
+            raise ValueError("{} is not a finite number".format(value))
+
+        if self.maxlen == 0:
+            return
+
+        super().append(value)
+        insort(self._sorted, value)
+
+        count = len(self._values)
+        delta = value - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (value - self._mean)
+        self._sum += value
+
+    def popleft(self):
+        """Remove and return the oldest number."""
+        value = super().popleft()
+        del self._sorted[bisect_left(self._sorted, value)]
+
+        count = len(self._values)
+        if not count:
+            self._sum = self._mean = self._m2 = 0.0
+            self._removals = 0
+            return value
+
+        delta = value - self._mean
+        self._mean -= delta / count
+        self._m2 -= delta * (value - self._mean)
+        self._sum -= value
+
+        self._removals += 1
+        if self._removals >= RESYNC_INTERVAL:
+            self._resync()
+        return value
+
+    def clear(self):
+        """Remove all numbers."""
+        super().clear()
+        self._sorted.clear()
+        self._sum = self._mean = self._m2 = 0.0
+        self._removals = 0
+
+    def _resync(self):
+        """Recompute the running sums exactly from the window."""
+        self._removals = 0
+        self._sum = math.fsum(self._values)
+        self._mean = self._sum / len(self._values)
+        self._m2 = math.fsum((value - self._mean) ** 2
+                             for value in self._values)
+
+    def total(self):
+        """Return the sum of the window."""
+        return self._sum
+
+    def mean(self):
+        """Return the arithmetic mean of the window."""
+        if not self._values:
+            raise StatisticsError("mean requires at least one data point")
+        return self._mean
+
+    def median(self):
+        """Return the median of the window."""
+        count = len(self._sorted)
+        if not count:
+            raise StatisticsError("no median for empty data")
+        middle = count // 2
+        if count % 2:
+            return self._sorted[middle]
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
+
+    def variance(self):
+        """Return the sample variance of the window."""
+        if len(self._values) < 2:
+            raise StatisticsError(
+                "variance requires at least two data points")
+        return max(self._m2, 0.0) / (len(self._values) - 1)
+
+    def stdev(self):
+        """Return the sample standard deviation of the window."""
+        return math.sqrt(self.variance())
+
+
+class TimeWeightedWindow(object):
+    """Time window of step values with a running time-weighted sum.
+
+    Each value is held from its timestamp until the next one. Values whose
+    hold period ended more than the window ago are evicted, keeping the last
+    evicted one to weigh the start of the window.
+    """
+
+    def __init__(self, window):
+        """Initialize an empty window spanning the window timedelta."""
+        self.window = window
+        self.last_leak = None
+        self._samples = deque()
+        self._inner = 0.0
+
+    def __len__(self):
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def _leak(self, left_boundary):
+        """Evict samples that fell out of the window."""
+        samples = self._samples
+        while samples and samples[0][0] + self.window <= left_boundary:
+            self.last_leak = samples.popleft()
+            if samples:
+                self._inner -= ((samples[0][0] - self.last_leak[0])
+                                .total_seconds() * self.last_leak[1])
+        if len(samples) < 2:
+            self._inner = 0.0
+
+    def append(self, timestamp, value):
+        """Add a value that starts being held at timestamp."""
+        self._leak(timestamp)
+        if self._samples:
+            last_timestamp, last_value = self._samples[-1]
+            self._inner += (
+                (timestamp - last_timestamp).total_seconds() * last_value)
+        self._samples.append((timestamp, value))
+
+    def average(self, now):
+        """Return the time-weighted average over the window ending now."""
+        self._leak(now)
+        if not self._samples:
+            if self.last_leak is None:
+                raise StatisticsError("no samples in window")
+            return self.last_leak[1]
+
+        first_timestamp, first_value = self._samples[0]
+        last_timestamp, last_value = self._samples[-1]
+        start = now - self.window
+        prev_value = (self.last_leak or self._samples[0])[1]
+
+        total = ((first_timestamp - start).total_seconds() * prev_value +
+                 self._inner +
+                 (now - last_timestamp).total_seconds() * last_value)
+        return total / self.window.total_seconds()
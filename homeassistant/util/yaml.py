@@ -1,10 +1,12 @@
 """YAML utility functions."""
 import logging
 import os
+import pickle
 import sys
 import fnmatch
+import threading
 from collections import OrderedDict
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Optional
 
 import yaml
 try:
@@ -24,6 +26,11 @@ _SECRET_NAMESPACE = 'homeassistant'
 SECRET_YAML = 'secrets.yaml'
 __SECRET_CACHE = {}  # type: Dict
 
+CACHE_VERSION = 1
+
+# Files and environment variables read by the load_yaml_cached of a thread
+_TRACKING = threading.local()
+
 
 class NodeListClass(list):
     """Wrapper class to be able to add attributes on a list."""
@@ -61,13 +68,66 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+if hasattr(yaml, 'CSafeLoader'):
+    # pylint: disable=too-many-ancestors
+    class SafeLineCLoader(yaml.CSafeLoader):
+        """Loader class parsing with libyaml.
+
+        The constructors add the file and line of each node from its start
+        mark, so the result is the same as with SafeLineLoader.
+        """
+
+        def __init__(self, stream) -> None:
+            """Initialize the loader."""
+            super().__init__(stream)
+            self.name = getattr(stream, 'name', '<file>')
+            self.stream = stream
+
+    LOADERS = (yaml.SafeLoader, SafeLineCLoader)
+else:
+    LOADERS = (yaml.SafeLoader,)
+
+
+def add_constructor(tag: str, constructor) -> None:
+    """Register a constructor on the loaders used by load_yaml."""
+    for loader in LOADERS:
+        loader.add_constructor(tag, constructor)
+
+
+def _file_signature(path: str) -> Optional[List]:
+    """Return the modification time and size of a path, None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _track_file(path: str) -> None:
+    """Record a file or directory the loaded YAML depends on."""
+    files = getattr(_TRACKING, 'files', None)
+    if files is not None and path not in files:
+        files[path] = _file_signature(path)
+
+
+def _track_env(name: str) -> None:
+    """Record an environment variable the loaded YAML depends on."""
+    env = getattr(_TRACKING, 'env', None)
+    if env is not None:
+        env[name] = os.environ.get(name)
+
+
 def load_yaml(fname: str) -> Union[List, Dict]:
     """Load a YAML file."""
+    _track_file(fname)
     try:
         with open(fname, encoding='utf-8') as conf_file:
+            loaded = getattr(_TRACKING, 'loaded', None)
+            if loaded is not None:
+                loaded.append(fname)
             # If configuration file is empty YAML returns None
             # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
+            return yaml.load(conf_file, Loader=LOADERS[-1]) or OrderedDict()
     except yaml.YAMLError as exc:
         _LOGGER.error(exc)
         raise HomeAssistantError(exc)
@@ -76,6 +136,89 @@ def load_yaml(fname: str) -> Union[List, Dict]:
         raise HomeAssistantError(exc)
 
 
+def load_yaml_cached(fname: str, cache_path: str,
+                     files: Optional[Dict] = None) -> Union[List, Dict]:
+    """Load a YAML file, reusing the result stored in cache_path.
+
+    The stored result is used as long as none of the files, directories and
+    environment variables read to build it changed. Results holding secrets
+    from keyring or credstash are not stored. The name of every YAML file
+    the result was loaded from is added to files when given.
+    """
+    cache = _load_cache(fname, cache_path)
+    if cache is not None:
+        if files is not None:
+            files.update((loaded, True) for loaded in cache['loaded'])
+        return cache['data']
+
+    _TRACKING.files = OrderedDict()
+    _TRACKING.env = {}
+    _TRACKING.loaded = []
+    _TRACKING.cacheable = True
+    try:
+        data = load_yaml(fname)
+        cache = {
+            'version': CACHE_VERSION,
+            'file': fname,
+            'files': _TRACKING.files,
+            'env': _TRACKING.env,
+            'loaded': _TRACKING.loaded,
+            'data': data,
+        }
+        cacheable = _TRACKING.cacheable
+    finally:
+        _TRACKING.files = _TRACKING.env = _TRACKING.loaded = None
+
+    if files is not None:
+        files.update((loaded, True) for loaded in cache['loaded'])
+
+    # A file that was read but can not be found on disk can not be checked
+    if cacheable and all(cache['files'][loaded] is not None
+                         for loaded in cache['loaded']):
+        _save_cache(cache_path, cache)
+
+    return data
+
+
+def _load_cache(fname: str, cache_path: str) -> Optional[Dict]:
+    """Return the stored load of fname if it is still valid."""
+    try:
+        with open(cache_path, mode='rb') as cache_file:
+            cache = pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.warning("Unable to read YAML cache %s", cache_path)
+        return None
+
+    if not isinstance(cache, dict) or \
+            cache.get('version') != CACHE_VERSION or \
+            cache.get('file') != fname:
+        return None
+
+    for path, signature in cache['files'].items():
+        if _file_signature(path) != signature:
+            return None
+
+    for name, value in cache['env'].items():
+        if os.environ.get(name) != value:
+            return None
+
+    return cache
+
+
+def _save_cache(cache_path: str, cache: Dict) -> None:
+    """Store a load, only readable by the owner as it may hold secrets."""
+    tmp_path = '{}.tmp'.format(cache_path)
+    try:
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT |
+                               os.O_TRUNC, 0o600), 'wb') as cache_file:
+            pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError):
+        _LOGGER.warning("Unable to write YAML cache %s", cache_path)
+
+
 def dump(_dict: dict) -> str:
     """Dump YAML to a string and remove null."""
     return yaml.safe_dump(
@@ -118,6 +261,7 @@ def _is_file_valid(name: str) -> bool:
 def _find_files(directory: str, pattern: str):
     """Recursively load files in a directory."""
     for root, dirs, files in os.walk(directory, topdown=True):
+        _track_file(root)
         dirs[:] = [d for d in dirs if _is_file_valid(d)]
         for basename in files:
             if _is_file_valid(basename) and fnmatch.fnmatch(basename, pattern):
@@ -213,6 +357,8 @@ def _env_var_yaml(loader: SafeLineLoader,
     """Load environment variables and embed it into the configuration YAML."""
     args = node.value.split()
 
+    _track_env(args[0])
+
     # Check for a default value
     if len(args) > 1:
         return os.getenv(args[0], ' '.join(args[1:]))
@@ -226,6 +372,7 @@ def _env_var_yaml(loader: SafeLineLoader,
 def _load_secret_yaml(secret_path: str) -> Dict:
     """Load the secrets yaml from path."""
     secret_path = os.path.join(secret_path, SECRET_YAML)
+    _track_file(secret_path)
     if secret_path in __SECRET_CACHE:
         return __SECRET_CACHE[secret_path]
 
@@ -271,6 +418,7 @@ def _secret_yaml(loader: SafeLineLoader,
         pwd = keyring.get_password(_SECRET_NAMESPACE, node.value)
         if pwd:
             _LOGGER.debug("Secret %s retrieved from keyring", node.value)
+            _TRACKING.cacheable = False
             return pwd
 
     global credstash  # pylint: disable=invalid-name
@@ -281,6 +429,7 @@ def _secret_yaml(loader: SafeLineLoader,
             pwd = credstash.getSecret(node.value, table=_SECRET_NAMESPACE)
             if pwd:
                 _LOGGER.debug("Secret %s retrieved from credstash", node.value)
+                _TRACKING.cacheable = False
                 return pwd
         except credstash.ItemNotFound:
             pass
@@ -291,19 +440,16 @@ def _secret_yaml(loader: SafeLineLoader,
     raise HomeAssistantError("Secret {} not defined".format(node.value))
 
 
-yaml.SafeLoader.add_constructor('!include', _include_yaml)
-yaml.SafeLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-                                _ordered_dict)
-yaml.SafeLoader.add_constructor(
+add_constructor('!include', _include_yaml)
+add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _ordered_dict)
+add_constructor(
     yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG, _construct_seq)
-yaml.SafeLoader.add_constructor('!env_var', _env_var_yaml)
-yaml.SafeLoader.add_constructor('!secret', _secret_yaml)
-yaml.SafeLoader.add_constructor('!include_dir_list', _include_dir_list_yaml)
-yaml.SafeLoader.add_constructor('!include_dir_merge_list',
-                                _include_dir_merge_list_yaml)
-yaml.SafeLoader.add_constructor('!include_dir_named', _include_dir_named_yaml)
-yaml.SafeLoader.add_constructor('!include_dir_merge_named',
-                                _include_dir_merge_named_yaml)
+add_constructor('!env_var', _env_var_yaml)
+add_constructor('!secret', _secret_yaml)
+add_constructor('!include_dir_list', _include_dir_list_yaml)
+add_constructor('!include_dir_merge_list', _include_dir_merge_list_yaml)
+add_constructor('!include_dir_named', _include_dir_named_yaml)
+add_constructor('!include_dir_merge_named', _include_dir_merge_named_yaml)
 
 
 # From: https://gist.github.com/miracle2k/3184458
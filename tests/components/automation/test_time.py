@@ -3,10 +3,13 @@ from datetime import timedelta
 import unittest
 from unittest.mock import patch
 
+import voluptuous as vol
+
 from homeassistant.core import callback
 from homeassistant.setup import setup_component
 import homeassistant.util.dt as dt_util
 import homeassistant.components.automation as automation
+from homeassistant.components.automation import time
 
 from tests.common import (
     fire_time_changed, get_test_home_assistant, assert_setup_component,
@@ -249,6 +252,32 @@ class TestAutomationTime(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(0, len(self.calls))
 
+    def test_if_not_setup_with_impossible_pattern(self):
+        """Test patterns that can never match fail validation."""
+        with assert_setup_component(0):
+            assert setup_component(self.hass, automation.DOMAIN, {
+                automation.DOMAIN: {
+                    'trigger': {
+                        'platform': 'time',
+                        'minutes': 75,
+                    },
+                    'action': {
+                        'service': 'test.automation'
+                    }
+                }
+            })
+
+        for pattern in ({'hours': 24}, {'seconds': -1}, {'minutes': '/0'},
+                        {'seconds': 'often'}):
+            pattern['platform'] = 'time'
+            with self.assertRaises(vol.Invalid):
+                time.TRIGGER_SCHEMA(pattern)
+
+        for pattern in ({'hours': '23'}, {'minutes': '/15'},
+                        {'seconds': '*'}):
+            pattern['platform'] = 'time'
+            time.TRIGGER_SCHEMA(pattern)
+
     def test_if_action_before(self):
         """Test for if action before."""
         assert setup_component(self.hass, automation.DOMAIN, {
@@ -10,6 +10,7 @@ from homeassistant.const import (
     STATE_ON, STATE_OFF, STATE_HOME, STATE_UNKNOWN, ATTR_ICON, ATTR_HIDDEN,
     ATTR_ASSUMED_STATE, STATE_NOT_HOME, ATTR_FRIENDLY_NAME)
 import homeassistant.components.group as group
+from homeassistant.helpers.event import DATA_STATE_CHANGE_DISPATCHER
 
 from tests.common import get_test_home_assistant, assert_setup_component
 
@@ -322,6 +323,36 @@ class TestComponentsGroup(unittest.TestCase):
         state = self.hass.states.get(test_group.entity_id)
         self.assertFalse(state.attributes.get(ATTR_ASSUMED_STATE))
 
+    def test_member_counts_follow_state_changes(self):
+        """Test the running member counts stay in sync with the members."""
+        self.hass.states.set('light.Bowl', STATE_ON)
+        self.hass.states.set('light.Ceiling', STATE_OFF)
+        test_group = group.Group.create_group(
+            self.hass, 'init_group',
+            ['light.Bowl', 'light.Ceiling', 'light.no_exist'])
+
+        for entity_id, new_state in (
+                ('light.Ceiling', STATE_ON), ('light.Bowl', STATE_OFF),
+                ('light.no_exist', 'unavailable'),
+                ('light.Ceiling', STATE_OFF)):
+            self.hass.states.set(entity_id, new_state)
+        self.hass.states.remove('light.Bowl')
+        self.hass.block_till_done()
+
+        self.assertEqual(STATE_OFF,
+                         self.hass.states.get(test_group.entity_id).state)
+        self.assertEqual({STATE_OFF: 1, 'unavailable': 1},
+                         test_group._state_counts)
+        self.assertEqual(1, test_group._unknown_count)
+
+        with patch('homeassistant.components.group._LOGGER') as mock_logger:
+            test_group.schedule_update_ha_state(True)
+            self.hass.block_till_done()
+
+        self.assertFalse(mock_logger.warning.called)
+        self.assertEqual({STATE_OFF: 1, 'unavailable': 1},
+                         test_group._state_counts)
+
     def test_group_updated_after_device_tracker_zone_change(self):
         """Test group state when device tracker in group changes zone."""
         self.hass.states.set('device_tracker.Adam', STATE_HOME)
@@ -356,7 +387,7 @@ class TestComponentsGroup(unittest.TestCase):
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.all_tests', 'group.empty_group', 'group.second_group',
              'group.test_group']
-        assert self.hass.bus.listeners['state_changed'] == 3
+        assert self.hass.data[DATA_STATE_CHANGE_DISPATCHER].trackers == 3
 
         with patch('homeassistant.config.load_yaml_config_file', return_value={
             'group': {
@@ -370,7 +401,7 @@ class TestComponentsGroup(unittest.TestCase):
 
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.all_tests', 'group.hello']
-        assert self.hass.bus.listeners['state_changed'] == 2
+        assert self.hass.data[DATA_STATE_CHANGE_DISPATCHER].trackers == 2
 
     def test_changing_group_visibility(self):
         """Test that a group can be hidden and shown."""
@@ -262,6 +262,15 @@ class TestMQTTCallbacks(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(0, len(self.calls))
 
+    def test_subscribe_topic_subtree_wildcard_no_prefix_match(self):
+        """Test the subscription of wildcard topics."""
+        mqtt.subscribe(self.hass, 'test-topic/#', self.record_calls)
+
+        fire_mqtt_message(self.hass, 'test-topic-other/bier', 'test-payload')
+
+        self.hass.block_till_done()
+        self.assertEqual(0, len(self.calls))
+
     def test_subscribe_topic_level_wildcard_and_wildcard_root_topic(self):
         """Test the subscription of wildcard topics."""
         mqtt.subscribe(self.hass, '+/test-topic/#', self.record_calls)
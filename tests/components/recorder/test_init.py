@@ -189,6 +189,29 @@ def test_saving_state_include_domain_exclude_entity(hass_recorder):
     assert hass.states.get('test.ok').state == 'state2'
 
 
+def test_saving_state_batched(hass_recorder):
+    """Test saving states in batched transactions."""
+    hass = hass_recorder({'max_batch_size': 5, 'commit_interval': 0.1})
+    entity_ids = ['test.recorder_{}'.format(idx) for idx in range(12)]
+
+    for entity_id in entity_ids:
+        hass.states.set(entity_id, 'on')
+    hass.block_till_done()
+    hass.data[DATA_INSTANCE].block_till_done()
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        assert len(db_states) == 12
+        for db_state in db_states:
+            db_event = session.query(Events).get(db_state.event_id)
+            assert db_event.event_type == 'state_changed'
+            assert db_event.to_native().data['entity_id'] == \
+                db_state.entity_id
+
+    assert sorted(state.entity_id for state in db_states) == \
+        sorted(entity_ids)
+
+
 def test_recorder_setup_failure():
     """Test some exceptions."""
     hass = get_test_home_assistant()
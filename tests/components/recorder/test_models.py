@@ -1,4 +1,5 @@
 """The tests for the Recorder component."""
+import json
 import unittest
 from datetime import datetime
 
@@ -9,7 +10,8 @@ import homeassistant.core as ha
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.util import dt
 from homeassistant.components.recorder.models import (
-    Base, Events, States, RecorderRuns)
+    Base, Events, States, RecorderRuns, LazyState, state_columns)
+from homeassistant.components.recorder.util import execute_stream
 
 ENGINE = None
 SESSION = None
@@ -63,6 +65,54 @@ class TestStates(unittest.TestCase):
         })
         assert state == States.from_event(event).to_native()
 
+    def test_lazy_state_from_columns(self):
+        """Test streaming selected columns as lazy states."""
+        state = ha.State('sensor.temperature', '18', {
+            'unit_of_measurement': '°C'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'sensor.temperature',
+            'old_state': None,
+            'new_state': state,
+        })
+        session = SESSION()
+        session.add(States.from_event(event))
+        session.commit()
+
+        lazy_states = list(execute_stream(
+            session.query(*state_columns()), LazyState.from_row))
+        session.close()
+
+        assert len(lazy_states) == 1
+        lazy_state = lazy_states[0]
+        assert lazy_state.as_json() == state.as_json()
+        # pylint: disable=protected-access
+        assert lazy_state._attributes is None
+        assert lazy_state == state
+
+    def test_lazy_state_corrupt_attributes(self):
+        """Test a corrupt attributes row still serializes to valid JSON."""
+        state = ha.State('sensor.corrupt', '18')
+        db_state = States.from_event(ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'sensor.corrupt',
+            'old_state': None,
+            'new_state': state,
+        }))
+        db_state.attributes = '{"unit_of_measurement": '
+        session = SESSION()
+        session.add(db_state)
+        session.commit()
+
+        lazy_state, = execute_stream(
+            session.query(*state_columns()).filter(
+                States.entity_id == 'sensor.corrupt'), LazyState.from_row)
+        session.delete(db_state)
+        session.commit()
+        session.close()
+
+        assert json.loads(lazy_state.as_json())['attributes'] == {}
+        assert lazy_state.attributes == {}
+        assert lazy_state == state
+
     def test_from_event_to_delete_state(self):
         """Test converting deleting state event to db state."""
         event = ha.Event(EVENT_STATE_CHANGED, {
@@ -57,3 +57,35 @@ def test_recorder_bad_execute(hass_recorder):
         util.execute((mck1,))
 
     assert e_mock.call_count == 2
+
+
+def test_recorder_bad_execute_stream(hass_recorder):
+    """Bad streamed execute, retry 3 times."""
+    from sqlalchemy.exc import SQLAlchemyError
+    hass_recorder()
+
+    qry = MagicMock()
+    qry.yield_per.side_effect = SQLAlchemyError()
+
+    with pytest.raises(SQLAlchemyError), \
+            patch('homeassistant.components.recorder.time.sleep') as e_mock:
+        list(util.execute_stream(qry))
+
+    assert qry.yield_per.call_count == 3
+    assert e_mock.call_count == 2
+
+
+def test_recorder_execute_stream_retry(hass_recorder):
+    """Streamed execute succeeds after a failed try."""
+    from sqlalchemy.exc import SQLAlchemyError
+    hass_recorder()
+
+    row = MagicMock()
+    row.to_native.return_value = 'native'
+    qry = MagicMock()
+    qry.yield_per.side_effect = [SQLAlchemyError(), [row]]
+
+    with patch('homeassistant.components.recorder.time.sleep') as e_mock:
+        assert list(util.execute_stream(qry)) == ['native']
+
+    assert e_mock.call_count == 1
@@ -118,6 +118,18 @@ class TestFilterSensor(unittest.TestCase):
             filtered = filt.filter_state(state)
         self.assertEqual(22, filtered.state)
 
+    def test_outlier_non_finite(self):
+        """Test a non-finite state is rejected by the outlier filter."""
+        filt = OutlierFilter(window_size=3,
+                             precision=2,
+                             entity=None,
+                             radius=4.0)
+        with self.assertRaises(ValueError):
+            filt.filter_state(ha.State('sensor.test_monitored', 'nan'))
+        for state in self.values:
+            filtered = filt.filter_state(state)
+        self.assertEqual(22, filtered.state)
+
     def test_lowpass(self):
         """Test if lowpass filter works."""
         filt = LowPassFilter(window_size=10,
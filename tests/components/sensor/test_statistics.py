@@ -107,6 +107,28 @@ class TestStatisticsSensor(unittest.TestCase):
         self.assertEqual(3.8, state.attributes.get('min_value'))
         self.assertEqual(14, state.attributes.get('max_value'))
 
+    def test_non_finite_states(self):
+        """Test non-finite states do not end up in the statistics."""
+        assert setup_component(self.hass, 'sensor', {
+            'sensor': {
+                'platform': 'statistics',
+                'name': 'test',
+                'entity_id': 'sensor.test_monitored',
+                'sampling_size': 3,
+            }
+        })
+
+        for value in [1, 'nan', 3, 'inf', 4, 5, 6, 7, 8]:
+            self.hass.states.set('sensor.test_monitored', value,
+                                 {ATTR_UNIT_OF_MEASUREMENT: TEMP_CELSIUS})
+            self.hass.block_till_done()
+
+        state = self.hass.states.get('sensor.test_mean')
+
+        self.assertEqual('7.0', state.state)
+        self.assertEqual(1.0, state.attributes.get('variance'))
+        self.assertEqual(6, state.attributes.get('min_value'))
+
     def test_sampling_size_1(self):
         """Test validity of stats requiring only one sample."""
         assert setup_component(self.hass, 'sensor', {
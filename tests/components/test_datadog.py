@@ -16,6 +16,8 @@ from tests.common import (assert_setup_component, get_test_home_assistant,
                           MockDependency)
 
 
+@mock.patch('homeassistant.helpers.export.ExportThread.batch_timeout',
+            mock.Mock(return_value=0))
 class TestDatadog(unittest.TestCase):
     """Test the Datadog component."""
 
@@ -107,6 +109,7 @@ class TestDatadog(unittest.TestCase):
             'name': 'triggered something'
         }
         handler_method(mock.MagicMock(data=event))
+        self.hass.data[datadog.DOMAIN].block_till_done()
 
         self.assertEqual(mock_client.event.call_count, 1)
         self.assertEqual(
@@ -156,6 +159,7 @@ class TestDatadog(unittest.TestCase):
             state = mock.MagicMock(domain="sensor", entity_id="sensor.foo.bar",
                                    state=in_, attributes=attributes)
             handler_method(mock.MagicMock(data={'new_state': state}))
+            self.hass.data[datadog.DOMAIN].block_till_done()
 
             self.assertEqual(mock_client.gauge.call_count, 3)
 
@@ -181,4 +185,5 @@ class TestDatadog(unittest.TestCase):
         for invalid in ('foo', '', object):
             handler_method(mock.MagicMock(data={
                 'new_state': ha.State('domain.test', invalid, {})}))
+            self.hass.data[datadog.DOMAIN].block_till_done()
             self.assertFalse(mock_client.gauge.called)
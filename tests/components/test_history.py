@@ -2,7 +2,7 @@
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
 import unittest
-from unittest.mock import patch, sentinel
+from unittest.mock import Mock, PropertyMock, patch, sentinel
 
 from homeassistant.setup import setup_component, async_setup_component
 import homeassistant.core as ha
@@ -526,3 +526,148 @@ async def test_fetch_period_api(hass, aiohttp_client):
     response = await client.get(
         '/api/history/period/{}'.format(dt_util.utcnow().isoformat()))
     assert response.status == 200
+
+
+async def test_fetch_period_api_lazy_attributes(hass, aiohttp_client):
+    """Test the fetch period view sends attributes without decoding them."""
+    from homeassistant.components.recorder.models import LazyState
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.components.recorder.wait_connection_ready()
+    start = dt_util.utcnow()
+    hass.states.async_set('sensor.power', '10', {'unit_of_measurement': 'W'})
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await aiohttp_client(hass.http.app)
+
+    with patch.object(LazyState, 'attributes',
+                      new_callable=PropertyMock) as mock_attributes:
+        response = await client.get(
+            '/api/history/period/{}?filter_entity_id=sensor.power'.format(
+                start.isoformat()))
+    assert response.status == 200
+    assert not mock_attributes.called
+
+    result = await response.json()
+    assert result[0][0]['attributes'] == {'unit_of_measurement': 'W'}
+
+
+async def test_fetch_period_api_default_cached(hass, aiohttp_client):
+    """Test default periods requested within a minute share a result."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.components.recorder.wait_connection_ready()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await aiohttp_client(hass.http.app)
+    now = dt_util.utcnow().replace(second=10, microsecond=0)
+
+    with patch('homeassistant.components.history.get_significant_states',
+               return_value={}) as mock_get:
+        for seconds in (0, 20.5):
+            with patch('homeassistant.components.history.dt_util.utcnow',
+                       return_value=now + timedelta(seconds=seconds)):
+                response = await client.get('/api/history/period')
+            assert response.status == 200
+
+    assert mock_get.call_count == 1
+    assert mock_get.call_args[0][1] == \
+        now.replace(second=0) + timedelta(minutes=1) - timedelta(days=1)
+
+
+def test_downsample():
+    """Test numeric states are reduced to one state per bucket."""
+    start = dt_util.utcnow()
+    states = [
+        ha.State('sensor.power', value, {'unit_of_measurement': 'W'},
+                 last_updated=start + timedelta(seconds=seconds))
+        for value, seconds in ((10, 0), (20, 10), (60, 20), (5, 70))
+    ] + [
+        ha.State('sensor.power', value,
+                 last_updated=start + timedelta(seconds=seconds))
+        for value, seconds in (('unavailable', 80), (7, 90))
+    ]
+
+    result = history.downsample(
+        states, start, start + timedelta(minutes=2), 2)
+
+    assert [state.state for state in result] == \
+        ['30.0', '5', 'unavailable', '7']
+    assert result[0].last_updated == start
+    assert result[0].attributes == {
+        'unit_of_measurement': 'W',
+        history.ATTR_MIN_VALUE: 10,
+        history.ATTR_MAX_VALUE: 60,
+    }
+
+
+async def test_history_cache(hass):
+    """Test cached results are dropped by state changes in their period."""
+    cache = history.HistoryCache(hass)
+    now = dt_util.utcnow()
+    live_key = (frozenset(['light.kitchen']), now - timedelta(hours=1),
+                now + timedelta(hours=1), True, None)
+    past_key = (frozenset(['light.kitchen']), now - timedelta(hours=3),
+                now - timedelta(hours=2), True, None)
+
+    cache.async_set(live_key, [['live']], cache.async_token())
+    cache.async_set(past_key, [['past']], cache.async_token())
+    assert cache.get(live_key) == [['live']]
+
+    hass.states.async_set('light.bedroom', 'on')
+    await hass.async_block_till_done()
+    assert cache.get(live_key) == [['live']]
+
+    token = cache.async_token()
+    hass.states.async_set('light.kitchen', 'on')
+    await hass.async_block_till_done()
+    assert cache.get(live_key) is None
+    assert cache.get(past_key) == [['past']]
+
+    # Results queried while the entity changed are not cached
+    cache.async_set(live_key, [['stale']], token)
+    assert cache.get(live_key) is None
+
+
+async def test_history_cache_size(hass):
+    """Test the cache is bounded by the number of cached states."""
+    cache = history.HistoryCache(hass, max_states=4, max_result_states=3)
+    now = dt_util.utcnow()
+    keys = [(frozenset(['light.kitchen']), now - timedelta(hours=hours + 1),
+             now - timedelta(hours=hours), True, None)
+            for hours in range(1, 5)]
+
+    cache.async_set(keys[0], [['on', 'off']], cache.async_token())
+    cache.async_set(keys[1], [['on'], ['off']], cache.async_token())
+    assert cache.states == 4
+
+    # Too large to cache
+    cache.async_set(keys[2], [['on', 'off'], ['on', 'off']],
+                    cache.async_token())
+    assert cache.get(keys[2]) is None
+
+    assert cache.get(keys[0]) == [['on', 'off']]
+    cache.async_set(keys[3], [['on']], cache.async_token())
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == [['on', 'off']]
+    assert cache.states == 3
+
+
+async def test_history_cache_purge(hass):
+    """Test cached results are dropped when the recorder purges."""
+    cache = history.HistoryCache(hass)
+    instance = hass.data[recorder.DATA_INSTANCE] = Mock(purge_count=0)
+    instance.queue.unfinished_tasks = 0
+    now = dt_util.utcnow()
+    past_key = (frozenset(['light.kitchen']), now - timedelta(hours=3),
+                now - timedelta(hours=2), True, None)
+
+    cache.async_set(past_key, [['past']], cache.async_token())
+    assert cache.get(past_key) == [['past']]
+
+    token = cache.async_token()
+    instance.purge_count = 1
+    assert cache.get(past_key) is None
+
+    # Results queried before the purge are not cached
+    cache.async_set(past_key, [['past']], token)
+    assert cache.get(past_key) is None
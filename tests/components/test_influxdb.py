@@ -12,6 +12,24 @@ from homeassistant.const import EVENT_STATE_CHANGED, STATE_OFF, STATE_ON, \
 
 from tests.common import get_test_home_assistant
 
+TIME_FIRED = datetime.datetime(2018, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _write_call(body):
+    """Return the expected write of points as line protocol."""
+    lines = []
+    for point in body:
+        tags = ','.join(
+            '{}={}'.format(key, value)
+            for key, value in sorted(point['tags'].items()))
+        fields = ','.join(
+            '{}={}'.format(key, '"{}"'.format(value)
+                           if isinstance(value, str) else float(value))
+            for key, value in sorted(point['fields'].items()))
+        lines.append('{},{} {} {}'.format(
+            point['measurement'], tags, fields, point['time']))
+    return mock.call(lines, time_precision='u', protocol='line')
+
 
 @mock.patch('influxdb.InfluxDBClient')
 @mock.patch(
@@ -139,14 +157,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=in_, domain='fake', entity_id='fake.entity-id',
                 object_id='entity', attributes=attrs)
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'foobars',
                 'tags': {
                     'domain': 'fake',
                     'entity_id': 'entity',
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'longitude': 1.1,
                     'latitude': 2.2,
@@ -174,7 +193,7 @@ class TestInfluxDB(unittest.TestCase):
             )
             self.assertEqual(
                 mock_client.return_value.write_points.call_args,
-                mock.call(body)
+                _write_call(body)
             )
             mock_client.return_value.write_points.reset_mock()
 
@@ -190,14 +209,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=1, domain='fake', entity_id='fake.entity-id',
                 object_id='entity', attributes=attrs)
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'fake.entity-id',
                 'tags': {
                     'domain': 'fake',
                     'entity_id': 'entity',
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -209,7 +229,7 @@ class TestInfluxDB(unittest.TestCase):
             )
             self.assertEqual(
                 mock_client.return_value.write_points.call_args,
-                mock.call(body)
+                _write_call(body)
             )
             mock_client.return_value.write_points.reset_mock()
 
@@ -221,14 +241,15 @@ class TestInfluxDB(unittest.TestCase):
         state = mock.MagicMock(
             state=8, domain='fake', entity_id='fake.entity-id',
             object_id='entity', attributes=attrs)
-        event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+        event = mock.MagicMock(
+            data={'new_state': state}, time_fired=TIME_FIRED)
         body = [{
             'measurement': 'fake.entity-id',
             'tags': {
                 'domain': 'fake',
                 'entity_id': 'entity',
             },
-            'time': 12345,
+            'time': 1514764800000000,
             'fields': {
                 'value': 8,
             },
@@ -240,7 +261,7 @@ class TestInfluxDB(unittest.TestCase):
         )
         self.assertEqual(
             mock_client.return_value.write_points.call_args,
-            mock.call(body)
+            _write_call(body)
         )
         mock_client.return_value.write_points.reset_mock()
 
@@ -252,14 +273,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=state_state, domain='fake', entity_id='fake.entity-id',
                 object_id='entity', attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'fake.entity-id',
                 'tags': {
                     'domain': 'fake',
                     'entity_id': 'entity',
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -272,7 +294,7 @@ class TestInfluxDB(unittest.TestCase):
                 )
                 self.assertEqual(
                     mock_client.return_value.write_points.call_args,
-                    mock.call(body)
+                    _write_call(body)
                 )
             else:
                 self.assertFalse(mock_client.return_value.write_points.called)
@@ -286,14 +308,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=1, domain='fake', entity_id='fake.{}'.format(entity_id),
                 object_id=entity_id, attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'fake.{}'.format(entity_id),
                 'tags': {
                     'domain': 'fake',
                     'entity_id': entity_id,
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -306,7 +329,7 @@ class TestInfluxDB(unittest.TestCase):
                 )
                 self.assertEqual(
                     mock_client.return_value.write_points.call_args,
-                    mock.call(body)
+                    _write_call(body)
                 )
             else:
                 self.assertFalse(mock_client.return_value.write_points.called)
@@ -321,14 +344,15 @@ class TestInfluxDB(unittest.TestCase):
                 state=1, domain=domain,
                 entity_id='{}.something'.format(domain),
                 object_id='something', attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': '{}.something'.format(domain),
                 'tags': {
                     'domain': domain,
                     'entity_id': 'something',
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -341,7 +365,7 @@ class TestInfluxDB(unittest.TestCase):
                 )
                 self.assertEqual(
                     mock_client.return_value.write_points.call_args,
-                    mock.call(body)
+                    _write_call(body)
                 )
             else:
                 self.assertFalse(mock_client.return_value.write_points.called)
@@ -366,14 +390,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=1, domain='fake', entity_id='fake.{}'.format(entity_id),
                 object_id=entity_id, attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'fake.{}'.format(entity_id),
                 'tags': {
                     'domain': 'fake',
                     'entity_id': entity_id,
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -386,7 +411,7 @@ class TestInfluxDB(unittest.TestCase):
                 )
                 self.assertEqual(
                     mock_client.return_value.write_points.call_args,
-                    mock.call(body)
+                    _write_call(body)
                 )
             else:
                 self.assertFalse(mock_client.return_value.write_points.called)
@@ -412,14 +437,15 @@ class TestInfluxDB(unittest.TestCase):
                 state=1, domain=domain,
                 entity_id='{}.something'.format(domain),
                 object_id='something', attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': '{}.something'.format(domain),
                 'tags': {
                     'domain': domain,
                     'entity_id': 'something',
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -432,7 +458,7 @@ class TestInfluxDB(unittest.TestCase):
                 )
                 self.assertEqual(
                     mock_client.return_value.write_points.call_args,
-                    mock.call(body)
+                    _write_call(body)
                 )
             else:
                 self.assertFalse(mock_client.return_value.write_points.called)
@@ -461,14 +487,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=in_, domain='fake', entity_id='fake.entity-id',
                 object_id='entity', attributes=attrs)
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'foobars',
                 'tags': {
                     'domain': 'fake',
                     'entity_id': 'entity',
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'longitude': 1.1,
                     'latitude': 2.2,
@@ -487,7 +514,7 @@ class TestInfluxDB(unittest.TestCase):
             )
             self.assertEqual(
                 mock_client.return_value.write_points.call_args,
-                mock.call(body)
+                _write_call(body)
             )
             mock_client.return_value.write_points.reset_mock()
 
@@ -511,14 +538,15 @@ class TestInfluxDB(unittest.TestCase):
             state = mock.MagicMock(
                 state=1, domain='fake', entity_id='fake.{}'.format(entity_id),
                 object_id=entity_id, attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': 'state',
                 'tags': {
                     'domain': 'fake',
                     'entity_id': entity_id,
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -531,7 +559,7 @@ class TestInfluxDB(unittest.TestCase):
                 )
                 self.assertEqual(
                     mock_client.return_value.write_points.call_args,
-                    mock.call(body)
+                    _write_call(body)
                 )
             else:
                 self.assertFalse(mock_client.return_value.write_points.called)
@@ -556,14 +584,15 @@ class TestInfluxDB(unittest.TestCase):
         state = mock.MagicMock(
             state='foo', domain='fake', entity_id='fake.entity-id',
             object_id='entity', attributes=attrs)
-        event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+        event = mock.MagicMock(
+            data={'new_state': state}, time_fired=TIME_FIRED)
         body = [{
             'measurement': 'state',
             'tags': {
                 'domain': 'fake',
                 'entity_id': 'entity',
             },
-            'time': 12345,
+            'time': 1514764800000000,
             'fields': {
                 'state': 'foo',
                 'unit_of_measurement_str': 'foobars',
@@ -576,7 +605,7 @@ class TestInfluxDB(unittest.TestCase):
         )
         self.assertEqual(
             mock_client.return_value.write_points.call_args,
-            mock.call(body)
+            _write_call(body)
         )
         mock_client.return_value.write_points.reset_mock()
 
@@ -601,7 +630,8 @@ class TestInfluxDB(unittest.TestCase):
             state=1, domain='fake',
             entity_id='fake.something',
             object_id='something', attributes=attrs)
-        event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+        event = mock.MagicMock(
+            data={'new_state': state}, time_fired=TIME_FIRED)
         body = [{
             'measurement': 'fake.something',
             'tags': {
@@ -609,7 +639,7 @@ class TestInfluxDB(unittest.TestCase):
                 'entity_id': 'something',
                 'friendly_fake': 'tag_str'
             },
-            'time': 12345,
+            'time': 1514764800000000,
             'fields': {
                 'value': 1,
                 'field_fake_str': 'field_str'
@@ -622,7 +652,7 @@ class TestInfluxDB(unittest.TestCase):
         )
         self.assertEqual(
             mock_client.return_value.write_points.call_args,
-            mock.call(body)
+            _write_call(body)
         )
         mock_client.return_value.write_points.reset_mock()
 
@@ -664,14 +694,15 @@ class TestInfluxDB(unittest.TestCase):
                 state=1, domain=comp['domain'],
                 entity_id=comp['domain'] + '.' + comp['id'],
                 object_id=comp['id'], attributes={})
-            event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
             body = [{
                 'measurement': comp['res'],
                 'tags': {
                     'domain': comp['domain'],
                     'entity_id': comp['id']
                 },
-                'time': 12345,
+                'time': 1514764800000000,
                 'fields': {
                     'value': 1,
                 },
@@ -683,7 +714,36 @@ class TestInfluxDB(unittest.TestCase):
             )
             self.assertEqual(
                 mock_client.return_value.write_points.call_args,
-                mock.call(body)
+                _write_call(body)
+            )
+            mock_client.return_value.write_points.reset_mock()
+
+    def test_event_listener_attributes_changed(self, mock_client):
+        """Test the event listener when the unit of an entity changes."""
+        self._setup()
+
+        for unit in ('foobars', 'bars'):
+            state = mock.MagicMock(
+                state=1, domain='fake', entity_id='fake.entity-id',
+                object_id='entity', attributes={'unit_of_measurement': unit})
+            event = mock.MagicMock(
+                data={'new_state': state}, time_fired=TIME_FIRED)
+            body = [{
+                'measurement': unit,
+                'tags': {
+                    'domain': 'fake',
+                    'entity_id': 'entity',
+                },
+                'time': 1514764800000000,
+                'fields': {
+                    'value': 1,
+                },
+            }]
+            self.handler_method(event)
+            self.hass.data[influxdb.DOMAIN].block_till_done()
+            self.assertEqual(
+                mock_client.return_value.write_points.call_args,
+                _write_call(body)
             )
             mock_client.return_value.write_points.reset_mock()
 
@@ -703,7 +763,8 @@ class TestInfluxDB(unittest.TestCase):
         state = mock.MagicMock(
             state=1, domain='fake', entity_id='entity.id', object_id='entity',
             attributes={})
-        event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+        event = mock.MagicMock(
+            data={'new_state': state}, time_fired=TIME_FIRED)
         mock_client.return_value.write_points.side_effect = \
             IOError('foo')
 
@@ -714,7 +775,8 @@ class TestInfluxDB(unittest.TestCase):
             assert mock_sleep.called
         json_data = mock_client.return_value.write_points.call_args[0][0]
         self.assertEqual(mock_client.return_value.write_points.call_count, 2)
-        mock_client.return_value.write_points.assert_called_with(json_data)
+        mock_client.return_value.write_points.assert_called_with(
+            json_data, time_precision='u', protocol='line')
 
         # Write works again
         mock_client.return_value.write_points.side_effect = None
@@ -731,7 +793,8 @@ class TestInfluxDB(unittest.TestCase):
         state = mock.MagicMock(
             state=1, domain='fake', entity_id='entity.id', object_id='entity',
             attributes={})
-        event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+        event = mock.MagicMock(
+            data={'new_state': state}, time_fired=TIME_FIRED)
 
         monotonic_time = 0
 
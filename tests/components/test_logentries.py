@@ -1,5 +1,5 @@
 """The tests for the Logentries component."""
-
+import json
 import unittest
 from unittest import mock
 
@@ -10,6 +10,8 @@ from homeassistant.const import STATE_ON, STATE_OFF, EVENT_STATE_CHANGED
 from tests.common import get_test_home_assistant
 
 
+@mock.patch('homeassistant.helpers.export.ExportThread.batch_timeout',
+            mock.Mock(return_value=0))
 class TestLogentries(unittest.TestCase):
     """Test the Logentries component."""
 
@@ -49,7 +51,7 @@ class TestLogentries(unittest.TestCase):
 
     def _setup(self, mock_requests):
         """Test the setup."""
-        self.mock_post = mock_requests.post
+        self.mock_post = mock_requests.Session.return_value.post
         self.mock_request_exception = Exception
         mock_requests.exceptions.RequestException = self.mock_request_exception
         config = {
@@ -62,10 +64,8 @@ class TestLogentries(unittest.TestCase):
         self.handler_method = self.hass.bus.listen.call_args_list[0][0][1]
 
     @mock.patch.object(logentries, 'requests')
-    @mock.patch('json.dumps')
-    def test_event_listener(self, mock_dump, mock_requests):
+    def test_event_listener(self, mock_requests):
         """Test event listener."""
-        mock_dump.side_effect = lambda x: x
         self._setup(mock_requests)
 
         valid = {'1': 1,
@@ -91,9 +91,11 @@ class TestLogentries(unittest.TestCase):
                        'logs/token',
                        'event': body}
             self.handler_method(event)
+            self.hass.data[logentries.DOMAIN].block_till_done()
             self.assertEqual(self.mock_post.call_count, 1)
             self.assertEqual(
                 self.mock_post.call_args,
-                mock.call(payload['host'], data=payload, timeout=10)
+                mock.call(payload['host'], data=json.dumps(payload),
+                          timeout=10)
             )
             self.mock_post.reset_mock()
@@ -33,3 +33,57 @@ def test_view(prometheus_client):  # pylint: disable=redefined-outer-name
             assert line.startswith('# ') \
                 or line.startswith('process_') \
                 or line.startswith('python_info')
+
+
+@asyncio.coroutine
+def test_view_collector(hass, aiohttp_client):
+    """Test prometheus metrics rendered from the state machine."""
+    assert (yield from async_setup_component(hass, prometheus.DOMAIN, {
+        prometheus.DOMAIN: {
+            'mode': prometheus.MODE_COLLECTOR,
+        },
+    }))
+    hass.states.async_set('switch.test', 'on', {'friendly_name': 'Test'})
+    client = yield from aiohttp_client(hass.http.app)
+
+    resp = yield from client.get(prometheus.API_ENDPOINT, headers={
+        'Accept-Encoding': 'gzip',
+    })
+
+    assert resp.status == 200
+    assert resp.headers['content-type'] == 'text/plain'
+    assert resp.headers['content-encoding'] == 'gzip'
+    body = yield from resp.text()
+    body = body.split("\n")
+
+    assert '# TYPE switch_state gauge' in body
+    assert 'switch_state{entity="switch.test",friendly_name="Test"} 1.0' \
+        in body
+
+
+@asyncio.coroutine
+def test_view_collector_skips_unusable_names(hass, aiohttp_client):
+    """Test sensors with invalid or taken metric names are skipped."""
+    assert (yield from async_setup_component(hass, prometheus.DOMAIN, {
+        prometheus.DOMAIN: {
+            'mode': prometheus.MODE_COLLECTOR,
+        },
+    }))
+    hass.states.async_set('sensor.1st_floor_temp', '21')
+    hass.states.async_set('sensor.switch_state', '5')
+    hass.states.async_set('sensor.outside_temperature', '12')
+    hass.states.async_set('switch.test', 'on', {'friendly_name': 'Test'})
+    client = yield from aiohttp_client(hass.http.app)
+
+    resp = yield from client.get(prometheus.API_ENDPOINT)
+
+    assert resp.status == 200
+    body = yield from resp.text()
+    body = body.split("\n")
+
+    assert not [line for line in body if line.startswith('1st_floor')]
+    assert body.count('# TYPE switch_state gauge') == 1
+    assert [line for line in body if line.startswith('switch_state')] == [
+        'switch_state{entity="switch.test",friendly_name="Test"} 1.0']
+    assert 'outside_temperature{entity="sensor.outside_temperature",' \
+        'friendly_name="None"} 12.0' in body
@@ -12,6 +12,8 @@ import homeassistant.util.dt as dt_util
 from tests.common import get_test_home_assistant
 
 
+@mock.patch('homeassistant.helpers.export.ExportThread.batch_timeout',
+            mock.Mock(return_value=0))
 class TestSplunk(unittest.TestCase):
     """Test the Splunk component."""
 
@@ -58,7 +60,7 @@ class TestSplunk(unittest.TestCase):
 
     def _setup(self, mock_requests):
         """Test the setup."""
-        self.mock_post = mock_requests.post
+        self.mock_post = mock_requests.Session.return_value.post
         self.mock_request_exception = Exception
         mock_requests.exceptions.RequestException = self.mock_request_exception
         config = {
@@ -113,6 +115,7 @@ class TestSplunk(unittest.TestCase):
             payload = {'host': 'http://host:8088/services/collector/event',
                        'event': body}
             self.handler_method(event)
+            self.hass.data[splunk.DOMAIN].block_till_done()
             self.assertEqual(self.mock_post.call_count, 1)
             self.assertEqual(
                 self.mock_post.call_args,
@@ -226,6 +226,176 @@ def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+@asyncio.coroutine
+def test_subscribe_events_every_transition(hass, websocket_client):
+    """Test a client that keeps up receives every state change in order."""
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_EVENTS,
+        'event_type': 'state_changed'
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['success']
+
+    for state in ('on', 'off', 'on'):
+        hass.states.async_set('light.kitchen', state)
+
+    transitions = []
+    for _ in range(3):
+        with timeout(3, loop=hass.loop):
+            msg = yield from websocket_client.receive_json()
+        data = msg['event']['data']
+        transitions.append((
+            data['old_state'] and data['old_state']['state'],
+            data['new_state']['state']))
+
+    assert transitions == [(None, 'on'), ('on', 'off'), ('off', 'on')]
+
+
+@asyncio.coroutine
+def test_subscribe_events_filtered(hass, websocket_client):
+    """Test subscribing to state changes of entities and domains."""
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_EVENTS,
+        'event_type': 'state_changed',
+        'entity_ids': ['light.kitchen'],
+        'domains': ['switch'],
+        'attributes': ['brightness'],
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['success']
+
+    hass.states.async_set('light.bedroom', 'on')
+    hass.states.async_set('light.kitchen', 'on', {
+        'brightness': 180,
+        'friendly_name': 'Kitchen',
+    })
+    hass.states.async_set('sensor.temperature', '20')
+    hass.states.async_set('switch.tv', 'off')
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_EVENT
+    new_state = msg['event']['data']['new_state']
+    assert new_state['entity_id'] == 'light.kitchen'
+    assert new_state['attributes'] == {'brightness': 180}
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['event']['data']['entity_id'] == 'switch.tv'
+
+
+@asyncio.coroutine
+def test_subscribe_states_diffs(hass, websocket_client):
+    """Test a state snapshot followed by diffs."""
+    hass.states.async_set('media_player.tv', 'playing', {
+        'volume_level': 0.5,
+        'media_title': 'News',
+        'source': 'HDMI 1',
+    })
+    hass.states.async_set('light.kitchen', 'off')
+
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+        'domains': 'media_player',
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['success']
+    assert [state['entity_id'] for state in msg['result']] == \
+        ['media_player.tv']
+
+    hass.states.async_set('light.kitchen', 'on')
+    hass.states.async_set('media_player.tv', 'playing', {
+        'volume_level': 0.6,
+        'media_title': 'News',
+    })
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    state = hass.states.get('media_player.tv')
+    assert msg == {
+        'id': 5,
+        'type': wapi.TYPE_STATE_DIFF,
+        'entity_id': 'media_player.tv',
+        'diff': {
+            'last_updated': state.last_updated.isoformat(),
+            'attributes': {'volume_level': 0.6},
+            'attributes_removed': ['source'],
+        },
+    }
+
+    hass.states.async_remove('media_player.tv')
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['diff'] == {'removed': True}
+
+
+@asyncio.coroutine
+def test_subscribe_states_slow_client(hass, mock_low_queue, websocket_client):
+    """Test a client that falls behind ends up with the current states."""
+    for idx in range(8):
+        hass.states.async_set('light.lamp_{}'.format(idx), 'off')
+
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['success']
+    view = {state['entity_id']: state for state in msg['result']}
+
+    # Queued without yielding, more entities change than the queue holds
+    for idx in range(8):
+        hass.states.async_set('light.lamp_{}'.format(idx), 'on', {
+            'brightness': idx,
+        })
+    hass.states.async_set('light.lamp_0', 'off')
+    hass.states.async_remove('light.lamp_1')
+
+    yield from websocket_client.send_json({
+        'id': 6,
+        'type': wapi.TYPE_PING,
+    })
+
+    while True:
+        with timeout(3, loop=hass.loop):
+            msg = yield from websocket_client.receive_json()
+
+        if msg['type'] == wapi.TYPE_PONG:
+            break
+
+        assert msg['type'] == wapi.TYPE_STATE_DIFF
+        diff = msg['diff']
+        if diff.get('removed'):
+            del view[msg['entity_id']]
+            continue
+
+        state = view.setdefault(msg['entity_id'], {'attributes': {}})
+        if 'state' in diff:
+            state['state'] = diff['state']
+        state['attributes'].update(diff.get('attributes', {}))
+        for key in diff.get('attributes_removed', ()):
+            del state['attributes'][key]
+
+    assert {entity_id: (state['state'], state['attributes'])
+            for entity_id, state in view.items()} == \
+        {state.entity_id: (state.state, dict(state.attributes))
+         for state in hass.states.async_all()}
+
+
 @asyncio.coroutine
 def test_get_states(hass, websocket_client):
     """Test get_states command."""
@@ -3,6 +3,8 @@ import unittest
 
 from homeassistant import setup
 from homeassistant.components import zone
+from homeassistant.helpers.event import DATA_STATE_CHANGE_DISPATCHER
+from homeassistant.util.location import distance
 
 from tests.common import get_test_home_assistant
 
@@ -143,3 +145,60 @@ class TestComponentZone(unittest.TestCase):
 
         assert zone.in_zone(self.hass.states.get('zone.passive_zone'),
                             latitude, longitude)
+
+    def test_active_zone_index_matches_all_zones(self):
+        """Test the zone index finds the same zone as checking every zone."""
+        zones = {
+            'zone.a': (52.3731, 4.8922, 100),
+            'zone.b': (52.3741, 4.8922, 100),
+            'zone.c': (52.3736, 4.8940, 250),
+            'zone.big': (52.0, 5.0, 50000),
+            'zone.east': (10.0, 179.999, 500),
+            'zone.west': (10.0, -179.999, 500),
+        }
+        for entity_id, (latitude, longitude, radius) in zones.items():
+            self.hass.states.set(entity_id, zone.STATE, {
+                'latitude': latitude,
+                'longitude': longitude,
+                'radius': radius,
+            })
+        self.hass.states.set('zone.passive', zone.STATE, {
+            'latitude': 52.3736, 'longitude': 4.8922, 'radius': 1000,
+            'passive': True,
+        })
+        self.hass.block_till_done()
+
+        def expected_zone(latitude, longitude, radius):
+            """Return the active zone by checking every zone."""
+            found = None
+            for entity_id in sorted(zones):
+                zone_lat, zone_lon, zone_radius = zones[entity_id]
+                zone_dist = distance(latitude, longitude, zone_lat, zone_lon)
+                if zone_dist - radius >= zone_radius:
+                    continue
+                if found is None or zone_dist < found[1] or (
+                        zone_dist == found[1] and zone_radius < found[2]):
+                    found = (entity_id, zone_dist, zone_radius)
+            return found and found[0]
+
+        for latitude, longitude, radius in (
+                (52.3731, 4.8922, 0), (52.3736, 4.8922, 0),
+                (52.3736, 4.8922, 60), (52.3745, 4.8930, 10),
+                (52.39, 4.95, 0), (52.6, 5.0, 0), (10.0, 180.0, 0),
+                (10.0, -179.99, 0), (10.02, 179.99, 2000),
+                (0.0, 0.0, 0), (89.9, 0.0, 10)):
+            active = zone.active_zone(self.hass, latitude, longitude, radius)
+            assert expected_zone(latitude, longitude, radius) == \
+                (active and active.entity_id)
+
+        self.hass.states.set('zone.a', zone.STATE, {
+            'latitude': 52.3731, 'longitude': 4.8922, 'radius': 100,
+            'passive': True,
+        })
+        self.hass.block_till_done()
+
+        active = zone.active_zone(self.hass, 52.3731, 4.8922)
+        assert 'zone.c' == active.entity_id
+
+        dispatcher = self.hass.data[DATA_STATE_CHANGE_DISPATCHER]
+        assert zone.DOMAIN in dispatcher.domain_listeners
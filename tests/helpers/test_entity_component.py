@@ -137,13 +137,13 @@ class TestHelpersEntityComponent(unittest.TestCase):
         assert ('platform_test', {}, {'msg': 'discovery_info'}) == \
             mock_setup.call_args[0]
 
-    @patch('homeassistant.helpers.entity_platform.'
-           'async_track_time_interval')
-    def test_set_scan_interval_via_config(self, mock_track):
+    def test_set_scan_interval_via_config(self):
         """Test the setting of the scan interval via configuration."""
+        entity = MockEntity(should_poll=True)
+
         def platform_setup(hass, config, add_devices, discovery_info=None):
             """Test the platform setup."""
-            add_devices([MockEntity(should_poll=True)])
+            add_devices([entity])
 
         loader.set_component('test_domain.platform',
                              MockPlatform(platform_setup))
@@ -158,8 +158,7 @@ class TestHelpersEntityComponent(unittest.TestCase):
         })
 
         self.hass.block_till_done()
-        assert mock_track.called
-        assert timedelta(seconds=30) == mock_track.call_args[0][2]
+        assert timedelta(seconds=30) == entity.platform.poller.interval
 
     def test_set_entity_namespace_via_config(self):
         """Test setting an entity namespace."""
@@ -16,7 +16,8 @@ import homeassistant.util.dt as dt_util
 
 from tests.common import (
     get_test_home_assistant, MockPlatform, fire_time_changed, mock_registry,
-    MockEntity, MockEntityPlatform, MockConfigEntry, mock_coro)
+    MockEntity, MockEntityPlatform, MockConfigEntry, mock_coro,
+    async_fire_time_changed)
 
 _LOGGER = logging.getLogger(__name__)
 DOMAIN = "test_domain"
@@ -136,13 +137,13 @@ class TestHelpersEntityPlatform(unittest.TestCase):
         assert 1 == len(self.hass.states.entity_ids())
         assert not ent.update.called
 
-    @patch('homeassistant.helpers.entity_platform.'
-           'async_track_time_interval')
-    def test_set_scan_interval_via_platform(self, mock_track):
+    def test_set_scan_interval_via_platform(self):
         """Test the setting of the scan interval via platform."""
+        entity = MockEntity(should_poll=True)
+
         def platform_setup(hass, config, add_devices, discovery_info=None):
             """Test the platform setup."""
-            add_devices([MockEntity(should_poll=True)])
+            add_devices([entity])
 
         platform = MockPlatform(platform_setup)
         platform.SCAN_INTERVAL = timedelta(seconds=30)
@@ -158,8 +159,8 @@ class TestHelpersEntityPlatform(unittest.TestCase):
         })
 
         self.hass.block_till_done()
-        assert mock_track.called
-        assert timedelta(seconds=30) == mock_track.call_args[0][2]
+        assert timedelta(seconds=30) == entity.platform.poller.interval
+        assert entity.platform.poll_stats['entities'] == 1
 
     def test_adding_entities_with_generator_and_thread_callback(self):
         """Test generator in add_entities that calls thread method.
@@ -581,3 +582,92 @@ async def test_reset_cancels_retry_setup(hass):
 
     assert len(mock_call_later.return_value.mock_calls) == 1
     assert ent_platform._async_cancel_retry_setup is None
+
+
+async def test_polling_spread_over_interval(hass):
+    """Test entities are polled at their own phase and backed off."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=10))
+    ent1 = MockEntity(should_poll=True)
+    ent1.async_update = Mock(side_effect=mock_coro)
+    ent2 = MockEntity(should_poll=True, available=False)
+    ent2.async_update = Mock(side_effect=mock_coro)
+    now = dt_util.utcnow()
+
+    with patch('homeassistant.helpers.entity_platform.random.random',
+               side_effect=[0.5, 0]), \
+            patch('homeassistant.util.dt.utcnow', return_value=now):
+        await component.async_add_entities([ent1, ent2])
+
+        for seconds, ent1_polls, ent2_polls in (
+                (6, 1, 0), (10, 1, 1), (16, 2, 1), (25, 3, 1), (29, 3, 1),
+                (30, 3, 2)):
+            async_fire_time_changed(hass, now + timedelta(seconds=seconds))
+            await hass.async_block_till_done()
+            assert ent1.async_update.call_count == ent1_polls
+            assert ent2.async_update.call_count == ent2_polls
+
+    stats = component._platforms[DOMAIN].poll_stats
+    assert stats['polls'] == 5
+    assert stats['backoffs'] == 2
+    assert stats['overruns'] == 0
+
+
+async def test_polling_follows_should_poll(hass):
+    """Test only entities that should be polled are queued."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=10))
+    ent = MockEntity(should_poll=False)
+    ent.async_update = Mock(side_effect=mock_coro)
+    now = dt_util.utcnow()
+
+    with patch('homeassistant.helpers.entity_platform.random.random',
+               return_value=0), \
+            patch('homeassistant.util.dt.utcnow', return_value=now):
+        await component.async_add_entities([ent])
+        poller = component._platforms[DOMAIN].poller
+        assert poller.stats['entities'] == 0
+        assert poller._unsub_timer is None
+
+        ent._values['should_poll'] = True
+        await ent.async_update_ha_state()
+        assert poller.stats['entities'] == 1
+
+        async_fire_time_changed(hass, now + timedelta(seconds=11))
+        await hass.async_block_till_done()
+        assert ent.async_update.call_count == 1
+
+        ent._values['should_poll'] = False
+        async_fire_time_changed(hass, now + timedelta(seconds=21))
+        await hass.async_block_till_done()
+        assert ent.async_update.call_count == 1
+
+    stats = poller.stats
+    assert stats['entities'] == 0
+    assert stats['polls'] == 1
+    assert stats['mean_lag'] == 1
+    assert poller._unsub_timer is None
+
+
+async def test_polling_overrun_reported_once(hass):
+    """Test an entity that keeps overrunning is reported once."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=10))
+    ent = MockEntity(should_poll=True)
+    ent.async_update = Mock(side_effect=mock_coro)
+    now = dt_util.utcnow()
+
+    with patch('homeassistant.helpers.entity_platform.random.random',
+               return_value=0), \
+            patch('homeassistant.util.dt.utcnow', return_value=now):
+        await component.async_add_entities([ent])
+        poller = component._platforms[DOMAIN].poller
+
+    with patch.object(poller, 'logger') as mock_logger:
+        for seconds in (10, 30, 50):
+            with patch('homeassistant.util.dt.utcnow',
+                       return_value=now + timedelta(seconds=seconds + 15)):
+                async_fire_time_changed(
+                    hass, now + timedelta(seconds=seconds))
+                await hass.async_block_till_done()
+
+    assert ent.async_update.call_count == 3
+    assert poller.stats['overruns'] == 3
+    assert len(mock_logger.warning.mock_calls) == 1
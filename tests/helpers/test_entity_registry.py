@@ -129,6 +129,17 @@ def test_generate_entity_considers_existing_entities(hass, registry):
         'light.kitchen_2'
 
 
+@asyncio.coroutine
+def test_get_or_create_uses_mocked_entries(hass):
+    """Test that entries set directly are found by unique id."""
+    entry = entity_registry.RegistryEntry(
+        entity_id='light.kitchen', unique_id='1234', platform='hue')
+    registry = mock_registry(hass, {'light.kitchen': entry})
+
+    assert registry.async_get_or_create('light', 'hue', '1234') is entry
+    assert registry.async_get_or_create('switch', 'hue', '1234') is not entry
+
+
 @asyncio.coroutine
 def test_is_registered(registry):
     """Test that is_registered works."""
@@ -10,14 +10,16 @@ import pytest
 from homeassistant.core import callback
 from homeassistant.setup import setup_component
 import homeassistant.core as ha
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import EVENT_STATE_CHANGED, MATCH_ALL
 from homeassistant.helpers.event import (
+    DATA_STATE_CHANGE_DISPATCHER,
     async_call_later,
     track_point_in_utc_time,
     track_point_in_time,
     track_utc_time_change,
     track_time_change,
     track_state_change,
+    track_domain_state_change,
     track_time_interval,
     track_template,
     track_same_state,
@@ -195,6 +197,35 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(5, len(wildcard_runs))
         self.assertEqual(6, len(wildercard_runs))
 
+    def test_track_state_change_remove(self):
+        """Test removing state change trackers."""
+        runs = []
+
+        @ha.callback
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        unsub_bowl = track_state_change(
+            self.hass, ['light.Bowl', 'light.Ceiling'], run_callback)
+        unsub_all = track_state_change(self.hass, MATCH_ALL, run_callback)
+        self.assertEqual(1, self.hass.bus.listeners[EVENT_STATE_CHANGED])
+
+        self.hass.states.set('light.bowl', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['light.bowl', 'light.bowl'], runs)
+
+        unsub_bowl()
+        self.hass.states.set('light.bowl', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(3, len(runs))
+
+        unsub_all()
+        self.assertNotIn(EVENT_STATE_CHANGED, self.hass.bus.listeners)
+
+        self.hass.states.set('light.bowl', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(3, len(runs))
+
     def test_track_template(self):
         """Test tracking template."""
         specific_runs = []
@@ -266,6 +297,66 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(2, len(wildcard_runs))
         self.assertEqual(2, len(wildercard_runs))
 
+    def test_track_domain_state_change(self):
+        """Test tracking the state changes of a domain."""
+        runs = []
+        unsub = track_domain_state_change(
+            self.hass, 'light', lambda *args: runs.append(args))
+        dispatcher = self.hass.data[DATA_STATE_CHANGE_DISPATCHER]
+        self.assertEqual({'light'}, set(dispatcher.domain_listeners))
+        self.assertEqual({}, dispatcher.listeners)
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.states.set('switch.kitchen', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(runs))
+        entity_id, old_state, new_state = runs[0]
+        self.assertEqual('light.kitchen', entity_id)
+        self.assertIsNone(old_state)
+        self.assertEqual('on', new_state.state)
+
+        unsub()
+        self.hass.states.set('light.kitchen', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(runs))
+        self.assertEqual({}, dispatcher.domain_listeners)
+
+    def test_track_template_dependencies(self):
+        """Test tracking only the states a template rendered from."""
+        runs = []
+        template = Template(
+            "{% if is_state('input_boolean.use_lights', 'on') %}"
+            "{{ states.light | selectattr('state', 'eq', 'on') | list "
+            "| count > 1 }}{% else %}{{ is_state('switch.test', 'on') }}"
+            "{% endif %}", self.hass)
+
+        self.hass.states.set('input_boolean.use_lights', 'off')
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.states.set('light.bowl', 'on')
+
+        track_template(self.hass, template, lambda *args: runs.append(args))
+        dispatcher = self.hass.data[DATA_STATE_CHANGE_DISPATCHER]
+        self.assertEqual(
+            {'input_boolean.use_lights', 'switch.test'},
+            set(dispatcher.listeners))
+        self.assertEqual({}, dispatcher.domain_listeners)
+
+        self.hass.states.set('input_boolean.use_lights', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(runs))
+        self.assertEqual({'input_boolean.use_lights'},
+                         set(dispatcher.listeners))
+        self.assertEqual({'light'}, set(dispatcher.domain_listeners))
+
+        self.hass.states.set('switch.test', 'on')
+        self.hass.states.set('light.bowl', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(runs))
+
+        self.hass.states.set('light.hallway', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(2, len(runs))
+
     def test_track_same_state_simple_trigger(self):
         """Test track_same_change with trigger simple."""
         thread_runs = []
@@ -550,6 +641,32 @@ class TestEventHelpers(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(2, len(specific_runs))
 
+    def test_periodic_task_scheduled(self):
+        """Test periodic tasks only listen to the bus while tracked."""
+        specific_runs = []
+
+        unsub = track_utc_time_change(
+            self.hass, lambda x: specific_runs.append(x), hour=3, minute=30,
+            second=0)
+        self.assertEqual(1, self.hass.bus.listeners[ha.EVENT_TIME_CHANGED])
+
+        self._send_time_changed(datetime(2014, 5, 24, 12, 0, 0))
+        self.hass.block_till_done()
+        self.assertEqual(0, len(specific_runs))
+
+        self._send_time_changed(datetime(2014, 5, 25, 3, 30, 0))
+        self.hass.block_till_done()
+        self.assertEqual(1, len(specific_runs))
+
+        # Time going backwards matches again
+        self._send_time_changed(datetime(2014, 5, 25, 3, 30, 0))
+        self.hass.block_till_done()
+        self.assertEqual(2, len(specific_runs))
+
+        unsub()
+        self.assertNotIn(
+            ha.EVENT_TIME_CHANGED, self.hass.bus.listeners)
+
     def test_periodic_task_hour(self):
         """Test periodic tasks per hour."""
         specific_runs = []
@@ -641,6 +758,14 @@ class TestEventHelpers(unittest.TestCase):
             track_utc_time_change(
                 self.hass, lambda x: specific_runs.append(1), year='/two')
 
+        with pytest.raises(ValueError):
+            track_utc_time_change(
+                self.hass, lambda x: specific_runs.append(1), minute=75)
+
+        with pytest.raises(ValueError):
+            track_utc_time_change(
+                self.hass, lambda x: specific_runs.append(1), second=[61, 62])
+
         self._send_time_changed(datetime(2014, 5, 2, 0, 0, 0))
         self.hass.block_till_done()
         self.assertEqual(0, len(specific_runs))
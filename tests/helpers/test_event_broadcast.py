@@ -0,0 +1,104 @@
+"""Test the event broadcast helpers."""
+import asyncio
+
+import pytest
+
+from homeassistant.core import callback
+from homeassistant.helpers import event_broadcast
+
+
+async def test_subscribe_shares_bus_listener(hass):
+    """Test subscribers of one event type share a bus listener."""
+    init_count = sum(hass.bus.async_listeners().values())
+    calls_1 = []
+    calls_2 = []
+
+    @callback
+    def listener_1(event):
+        """Record the event."""
+        calls_1.append(event)
+
+    @callback
+    def listener_2(event):
+        """Record the event."""
+        calls_2.append(event)
+
+    unsub_1 = event_broadcast.async_subscribe(hass, 'test_event', listener_1)
+    unsub_2 = event_broadcast.async_subscribe(hass, 'test_event', listener_2)
+    assert sum(hass.bus.async_listeners().values()) == init_count + 1
+
+    hass.bus.async_fire('test_event')
+    await hass.async_block_till_done()
+    assert len(calls_1) == 1
+    assert len(calls_2) == 1
+
+    unsub_1()
+    hass.bus.async_fire('test_event')
+    await hass.async_block_till_done()
+    assert len(calls_1) == 1
+    assert len(calls_2) == 2
+
+    unsub_2()
+    assert sum(hass.bus.async_listeners().values()) == init_count
+
+
+async def test_message_queue_keeps_every_message(hass):
+    """Test a client that keeps up receives every message in order."""
+    queue = event_broadcast.MessageQueue(hass.loop, 10)
+
+    queue.put_nowait('light on', 'light.kitchen')
+    queue.put_nowait('result')
+    queue.put_nowait('light off', 'light.kitchen')
+    queue.put_nowait('light on', 'light.kitchen')
+    assert len(queue) == 4
+    assert queue.coalesced == 0
+
+    assert await queue.get() == 'light on'
+    assert await queue.get() == 'result'
+    assert await queue.get() == 'light off'
+    assert await queue.get() == 'light on'
+
+
+async def test_message_queue_coalesces_and_defers(hass):
+    """Test keyed messages are coalesced and set aside when behind."""
+    queue = event_broadcast.MessageQueue(hass.loop, 4, 2)
+
+    queue.put_nowait('light on', 'light.kitchen')
+    queue.put_nowait('result')
+    queue.put_nowait('light off', 'light.kitchen')
+    assert len(queue) == 2
+    assert queue.coalesced == 1
+
+    queue.put_nowait('event')
+    queue.put_nowait('switch on', 'switch.tv')
+    queue.put_nowait('pong')
+    assert queue.deferred == 1
+    assert len(queue) == 5
+
+    queue.put_nowait('light dim', 'light.kitchen')
+    assert queue.coalesced == 2
+
+    assert await queue.get() == 'result'
+    assert await queue.get() == 'light dim'
+    assert await queue.get() == 'event'
+    assert await queue.get() == 'switch on'
+    assert await queue.get() == 'pong'
+    assert not queue
+
+    queue.put_nowait('one')
+    queue.put_nowait('two')
+    queue.put_nowait('three')
+    queue.put_nowait('four')
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait('five')
+
+
+async def test_message_queue_get_waits(hass):
+    """Test get waits for a message."""
+    queue = event_broadcast.MessageQueue(hass.loop, 3)
+    task = hass.async_add_job(queue.get())
+    await asyncio.sleep(0, loop=hass.loop)
+    assert not task.done()
+
+    queue.put_nowait('message')
+    assert await task == 'message'
@@ -0,0 +1,106 @@
+"""Test the batching export helper."""
+import time
+import unittest
+from unittest import mock
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.helpers.export import ExportThread
+
+from tests.common import get_test_home_assistant
+
+
+@mock.patch('homeassistant.helpers.export.ExportThread.batch_timeout',
+            mock.Mock(return_value=0))
+class TestExportThread(unittest.TestCase):
+    """Test the ExportThread."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Setup things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        self.batches = []
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def _listen(self, thread):
+        """Export state changes as entity ids and return the listener."""
+        self.hass.bus.listen = mock.MagicMock()
+        thread.listen(EVENT_STATE_CHANGED, lambda event: event.data.get('id'))
+        return self.hass.bus.listen.call_args[0][1]
+
+    def test_batches_queued_events(self):
+        """Test events queued before a write are written in one batch."""
+        thread = ExportThread(self.hass, 'Test', self.batches.append,
+                              batch_size=2)
+        listener = self._listen(thread)
+
+        for iden in ('a', None, 'b', 'c'):
+            listener(mock.MagicMock(data={'id': iden}))
+        thread.start()
+        thread.block_till_done()
+
+        self.assertEqual([['a', 'b'], ['c']], self.batches)
+        self.assertEqual(3, thread.written)
+
+    def test_batch_timeout_from_first_event(self):
+        """Test a batch is written on time while skipped events arrive."""
+        thread = ExportThread(self.hass, 'Test', self.batches.append)
+        thread.batch_timeout = mock.Mock(return_value=0.1)
+        listener = self._listen(thread)
+        thread.start()
+
+        listener(mock.MagicMock(data={'id': 'a'}))
+        for _ in range(50):
+            time.sleep(0.02)
+            if self.batches:
+                break
+            listener(mock.MagicMock(data={'id': None}))
+
+        self.assertEqual([['a']], self.batches)
+
+    @mock.patch('homeassistant.helpers.export.time.sleep')
+    def test_retry(self, mock_sleep):
+        """Test failed writes are retried with backoff."""
+        write = mock.Mock(side_effect=[IOError, IOError, None])
+        thread = ExportThread(self.hass, 'Test', write)
+        listener = self._listen(thread)
+        thread.start()
+
+        listener(mock.MagicMock(data={'id': 'a'}))
+        thread.block_till_done()
+
+        self.assertEqual(3, write.call_count)
+        self.assertEqual([mock.call(1), mock.call(2)],
+                         mock_sleep.call_args_list)
+        self.assertEqual(1, thread.written)
+        self.assertEqual(0, thread.write_errors)
+
+    @mock.patch('homeassistant.helpers.export.time.sleep')
+    def test_give_up(self, mock_sleep):
+        """Test a batch is counted as lost after the last try."""
+        write = mock.Mock(side_effect=IOError)
+        thread = ExportThread(self.hass, 'Test', write, max_tries=1)
+        listener = self._listen(thread)
+        thread.start()
+
+        listener(mock.MagicMock(data={'id': 'a'}))
+        thread.block_till_done()
+
+        self.assertEqual(2, write.call_count)
+        self.assertEqual(1, thread.write_errors)
+        self.assertEqual(0, thread.written)
+
+    def test_drop_when_full(self):
+        """Test events are dropped and counted when the queue is full."""
+        thread = ExportThread(self.hass, 'Test', self.batches.append,
+                              queue_size=2)
+        listener = self._listen(thread)
+
+        for iden in ('a', 'b', 'c'):
+            listener(mock.MagicMock(data={'id': iden}))
+        self.assertEqual(1, thread.dropped)
+
+        thread.start()
+        thread.block_till_done()
+        self.assertEqual([['a', 'b']], self.batches)
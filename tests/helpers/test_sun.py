@@ -225,3 +225,21 @@ class TestSun(unittest.TestCase):
             datetime(2016, 7, 26, 22, 19, 1, tzinfo=dt_util.UTC)
         assert sun.get_astral_event_date(self.hass, 'sunrise', june) is None
         assert sun.get_astral_event_date(self.hass, 'sunset', june) is None
+
+    def test_events_cached_per_location(self):
+        """Test solar events are cached until the location changes."""
+        june = datetime(2016, 6, 1, tzinfo=dt_util.UTC)
+        sunrise = sun.get_astral_event_date(self.hass, 'sunrise', june)
+        next_sunrise = sun.get_astral_event_next(self.hass, 'sunrise', june)
+
+        with patch('astral.Location.sunrise') as mock_sunrise:
+            assert sun.get_astral_event_date(
+                self.hass, 'sunrise', june) == sunrise
+            assert sun.get_astral_event_next(
+                self.hass, 'sunrise', june) == next_sunrise
+            assert not mock_sunrise.called
+
+            self.hass.config.latitude = 69.6
+            self.hass.config.longitude = 18.8
+            sun.get_astral_event_date(self.hass, 'sunrise', june)
+            assert mock_sunrise.called
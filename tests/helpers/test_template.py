@@ -1019,3 +1019,64 @@ def test_length_of_states(hass):
 
     tpl = template.Template('{{ states.sensor | length }}', hass)
     assert tpl.async_render() == '2'
+
+
+@asyncio.coroutine
+def test_render_cached(hass):
+    """Test reusing a render until a state it read changes."""
+    hass.states.async_set('sensor.test', '23', {'unit': 'beers'})
+    hass.states.async_set('sensor.other', 'wow')
+
+    tpl = template.Template(
+        '{{ states.sensor.test.state }} {{ is_state("sensor.none", "on") }} '
+        '{{ states.light | length }}', hass)
+
+    with patch.object(tpl, 'async_render',
+                      wraps=tpl.async_render) as mock_render:
+        assert tpl.async_render_cached() == '23 False 0'
+        # Unrelated state and an attribute that was not read
+        hass.states.async_set('sensor.other', 'changed')
+        hass.states.async_set('sensor.test', '23', {'unit': 'beer'})
+        assert tpl.async_render_cached() == '23 False 0'
+        assert mock_render.call_count == 1
+
+        hass.states.async_set('sensor.test', '24')
+        assert tpl.async_render_cached() == '24 False 0'
+        hass.states.async_set('sensor.none', 'on')
+        assert tpl.async_render_cached() == '24 True 0'
+        hass.states.async_set('light.kitchen', 'on')
+        assert tpl.async_render_cached() == '24 True 1'
+        assert mock_render.call_count == 4
+
+        # Different variables are not served from the cache
+        assert tpl.async_render_cached({'extra': 1}) == '24 True 1'
+        assert mock_render.call_count == 5
+
+
+@asyncio.coroutine
+def test_render_cached_state_object(hass):
+    """Test a render showing a state object follows the entire state."""
+    hass.states.async_set('sensor.test', '23')
+
+    for source in ('{{ states.sensor.test }}',
+                   '{{ states.sensor.test | string }}'):
+        tpl = template.Template(source, hass)
+        assert '=23' in tpl.async_render_cached()
+
+        hass.states.async_set('sensor.test', '23', {'unit': 'beers'})
+        assert 'unit=beers' in tpl.async_render_cached()
+
+        hass.states.async_set('sensor.test', '23')
+
+
+@asyncio.coroutine
+def test_render_cached_volatile(hass):
+    """Test templates that depend on time are always rendered."""
+    tpl = template.Template('{{ now().microsecond }}', hass)
+
+    with patch.object(tpl, 'async_render',
+                      wraps=tpl.async_render) as mock_render:
+        tpl.async_render_cached()
+        tpl.async_render_cached()
+
+    assert mock_render.call_count == 2
@@ -1,6 +1,7 @@
 """Test to verify that Home Assistant core works."""
 # pylint: disable=protected-access
 import asyncio
+import json
 import logging
 import os
 import unittest
@@ -16,6 +17,7 @@ from homeassistant.exceptions import (InvalidEntityFormatError,
                                       InvalidStateError)
 from homeassistant.util.async_ import run_coroutine_threadsafe
 import homeassistant.util.dt as dt_util
+from homeassistant.util.json import JSONEncoder, dumps
 from homeassistant.util.unit_system import (METRIC_SYSTEM)
 from homeassistant.const import (
     __version__, EVENT_STATE_CHANGED, ATTR_FRIENDLY_NAME, CONF_UNIT_SYSTEM,
@@ -67,6 +69,19 @@ def test_async_add_job_add_threaded_job_to_pool(mock_iscoro):
     assert len(hass.loop.run_in_executor.mock_calls) == 1
 
 
+def test_get_hass_job_type():
+    """Test resolving how jobs are scheduled."""
+    @asyncio.coroutine
+    def coro_job():
+        pass
+
+    assert ha.get_hass_job_type(ha.callback(lambda: None)) == \
+        ha.HassJobType.callback
+    assert ha.get_hass_job_type(coro_job) == \
+        ha.HassJobType.coroutinefunction
+    assert ha.get_hass_job_type(lambda: None) == ha.HassJobType.executor
+
+
 def test_async_run_job_calls_callback():
     """Test that the callback annotation is respected."""
     hass = MagicMock()
@@ -268,6 +283,17 @@ class TestEvent(unittest.TestCase):
         }
         self.assertEqual(expected, event.as_dict())
 
+    def test_as_json(self):
+        """Test the cached JSON equals encoding the dictionary."""
+        event = ha.Event('some_type', {
+            'new_state': ha.State('light.kitchen', 'on', {'b': 1, 'a': 2}),
+        })
+
+        self.assertEqual(
+            json.dumps(event.as_dict(), sort_keys=True, cls=JSONEncoder),
+            event.as_json())
+        self.assertIs(event.as_json(), event.as_json())
+
 
 class TestEventBus(unittest.TestCase):
     """Test EventBus methods."""
@@ -453,6 +479,29 @@ class TestState(unittest.TestCase):
         state = ha.State('domain.hello', 'world', {'some': 'attr'})
         self.assertEqual(state, ha.State.from_dict(state.as_dict()))
 
+    def test_json_conversion(self):
+        """Test the cached JSON equals encoding the dictionary."""
+        state = ha.State('domain.hello', 'wörld', {
+            'some': 'attr', 'last_seen': dt_util.utcnow(), 'list': {1}})
+
+        self.assertEqual(
+            json.dumps(state.as_dict(), sort_keys=True, cls=JSONEncoder),
+            state.as_json())
+        self.assertEqual(
+            json.dumps(state.as_dict()['attributes'], sort_keys=True,
+                       cls=JSONEncoder),
+            state.attributes_json())
+
+    def test_json_splice_nested_lists(self):
+        """Test lists of lists of states are made of the cached JSON."""
+        states = [[ha.State('domain.hello', 'world'),
+                   ha.State('domain.hello', 'there')], []]
+        expected = json.dumps(states, sort_keys=True, cls=JSONEncoder)
+
+        with patch.object(ha.State, 'as_dict') as mock_as_dict:
+            self.assertEqual(expected, dumps(states))
+        self.assertFalse(mock_as_dict.called)
+
     def test_dict_conversion_with_wrong_data(self):
         """Test conversion with wrong data."""
         self.assertIsNone(ha.State.from_dict(None))
@@ -506,6 +555,20 @@ class TestStateMachine(unittest.TestCase):
         self.assertEqual(1, len(ent_ids))
         self.assertTrue('light.bowl' in ent_ids)
 
+    def test_domain_states(self):
+        """Test retrieving the states of a domain."""
+        self.states.set('light.ceiling', 'off')
+        self.states.set('light.bowl', 'off')
+
+        states = self.hass.states.async_domain_states('Light')
+        self.assertEqual(['light.bowl', 'light.ceiling'],
+                         [state.entity_id for state in states])
+        self.assertEqual('off', states[0].state)
+
+        self.states.remove('switch.ac')
+        self.assertEqual([], self.hass.states.async_domain_states('switch'))
+        self.assertEqual([], self.states.entity_ids('switch'))
+
     def test_all(self):
         """Test everything."""
         states = sorted(state.entity_id for state in self.states.all())
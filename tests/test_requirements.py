@@ -3,7 +3,9 @@ import os
 from unittest import mock
 
 from homeassistant import loader, setup
-from homeassistant.requirements import CONSTRAINT_FILE
+from homeassistant.requirements import (
+    CONSTRAINT_FILE, REQUIREMENTS_CACHE_FILE, load_requirements_cache,
+    save_requirements_cache)
 
 from tests.common import get_test_home_assistant, MockModule
 
@@ -59,3 +61,52 @@ class TestRequirements:
         assert mock_install.call_args == mock.call(
             'package==0.0.1', target=self.hass.config.path('deps'),
             constraints=os.path.join('ha_package_path', CONSTRAINT_FILE))
+
+    @mock.patch('homeassistant.requirements.save_requirements_cache')
+    @mock.patch('homeassistant.requirements.load_requirements_cache',
+                return_value={'package==0.0.1'})
+    @mock.patch('homeassistant.util.package.check_package_exists')
+    @mock.patch('homeassistant.util.package.install_package')
+    def test_requirement_cached(
+            self, mock_install, mock_exists, mock_load, mock_save):
+        """Test cached requirements are not checked again."""
+        self.hass.config.skip_pip = False
+        loader.set_component(
+            'comp', MockModule('comp', requirements=['package==0.0.1']))
+        assert setup.setup_component(self.hass, 'comp')
+        assert 'comp' in self.hass.config.components
+        assert not mock_exists.called
+        assert not mock_install.called
+        assert not mock_save.called
+
+    @mock.patch('homeassistant.requirements.save_requirements_cache')
+    @mock.patch('homeassistant.requirements.load_requirements_cache',
+                return_value=set())
+    @mock.patch('homeassistant.util.package.check_package_exists',
+                return_value=True)
+    @mock.patch('homeassistant.util.package.install_package')
+    def test_requirement_met_is_cached(
+            self, mock_install, mock_exists, mock_load, mock_save):
+        """Test requirements found installed are added to the cache."""
+        self.hass.config.skip_pip = False
+        loader.set_component(
+            'comp', MockModule('comp', requirements=['package==0.0.1']))
+        assert setup.setup_component(self.hass, 'comp')
+        assert not mock_install.called
+        assert mock_save.call_args == mock.call(
+            self.hass.config.path(REQUIREMENTS_CACHE_FILE),
+            {'package==0.0.1'})
+
+
+def test_requirements_cache(tmpdir):
+    """Test the cache is only loaded in the environment it was saved in."""
+    path = str(tmpdir.join(REQUIREMENTS_CACHE_FILE))
+    assert load_requirements_cache(path) == set()
+
+    save_requirements_cache(path, {'package==0.0.2', 'package==0.0.1'})
+    assert load_requirements_cache(path) == {
+        'package==0.0.1', 'package==0.0.2'}
+
+    with mock.patch('homeassistant.util.package.environment_key',
+                    return_value={'python': 'other'}):
+        assert load_requirements_cache(path) == set()
@@ -196,6 +196,23 @@ def test_check_package_global():
     assert package.check_package_exists(installed_package)
 
 
+def test_environment_key(tmpdir):
+    """Test the environment key only changes with installed packages."""
+    config_dir = tmpdir.mkdir('config')
+    site_dir = tmpdir.mkdir('site-packages')
+
+    with patch.object(sys, 'path', [str(config_dir), str(site_dir)]):
+        key = package.environment_key()
+
+        config_dir.join('home-assistant_v2.db-journal').write('')
+        config_dir.mkdir('.storage')
+        site_dir.join('README.txt').write('')
+        assert package.environment_key() == key
+
+        site_dir.mkdir('pyhelloworld3-1.0.0.dist-info')
+        assert package.environment_key() != key
+
+
 def test_check_package_zip():
     """Test for an installed zip package."""
     assert not package.check_package_exists(TEST_ZIP_REQ)
@@ -0,0 +1,131 @@
+"""Test Home Assistant rolling window statistics."""
+import statistics
+import unittest
+from collections import deque
+from datetime import datetime, timedelta
+
+import homeassistant.util.rolling as rolling
+
+
+class TestRollingStatistics(unittest.TestCase):
+    """Test the rolling statistics window."""
+
+    def test_matches_statistics_module(self):
+        """Test window statistics equal a recomputation from scratch."""
+        window = rolling.RollingStatistics(maxlen=5)
+        values = deque(maxlen=5)
+
+        for value in [20, 19.5, -3, 18, 22, 0, 7.25, 7.25, 31, 4]:
+            window.append(value)
+            values.append(value)
+
+            self.assertEqual(list(values), list(window))
+            self.assertAlmostEqual(statistics.mean(values), window.mean())
+            self.assertEqual(statistics.median(values), window.median())
+            self.assertEqual(min(values), window.min())
+            self.assertEqual(max(values), window.max())
+            self.assertAlmostEqual(sum(values), window.total())
+            if len(values) > 1:
+                self.assertAlmostEqual(
+                    statistics.variance(values), window.variance())
+                self.assertAlmostEqual(
+                    statistics.stdev(values), window.stdev())
+
+    def test_popleft(self):
+        """Test removing the oldest values."""
+        window = rolling.RollingStatistics()
+        for value in [1, 5, 3]:
+            window.append(value)
+
+        self.assertEqual(1, window.popleft())
+        self.assertEqual(3, window.min())
+        self.assertEqual(4, window.mean())
+        self.assertEqual(4, window.median())
+
+        window.popleft()
+        window.popleft()
+        self.assertEqual(0, len(window))
+        self.assertEqual(0, window.total())
+
+    def test_not_enough_data(self):
+        """Test errors raised like the statistics module."""
+        window = rolling.RollingStatistics()
+
+        with self.assertRaises(statistics.StatisticsError):
+            window.mean()
+        with self.assertRaises(statistics.StatisticsError):
+            window.median()
+        with self.assertRaises(ValueError):
+            window.min()
+
+        window.append(1)
+        self.assertEqual(1, window.mean())
+        with self.assertRaises(statistics.StatisticsError):
+            window.stdev()
+
+    def test_resync(self):
+        """Test running sums stay exact over many evictions."""
+        window = rolling.RollingStatistics(maxlen=3)
+        for idx in range(rolling.RESYNC_INTERVAL * 2 + 1):
+            window.append(1e9 if idx % 7 else 0.1)
+
+        values = list(window)
+        self.assertAlmostEqual(statistics.mean(values), window.mean())
+        self.assertAlmostEqual(
+            statistics.variance(values), window.variance(), places=2)
+
+
+    def test_non_finite(self):
+        """Test non-finite numbers are rejected and leave the sums intact."""
+        window = rolling.RollingStatistics(maxlen=3)
+        for value in [1, float('nan'), 3, float('inf'), 4, 5, 6, 7, 8]:
+            try:
+                window.append(value)
+            except ValueError:
+                pass
+
+        self.assertEqual([6, 7, 8], list(window))
+        self.assertAlmostEqual(7, window.mean())
+        self.assertAlmostEqual(21, window.total())
+        self.assertAlmostEqual(1, window.variance())
+        self.assertEqual(7, window.median())
+        self.assertRaises(ValueError, window.append, float('nan'))
+
+
+class TestRollingWindow(unittest.TestCase):
+    """Test the rolling min/max window."""
+
+    def test_min_max(self):
+        """Test min and max follow evictions."""
+        start = datetime(2018, 4, 1)
+        window = rolling.RollingWindow(maxlen=3)
+        for minutes in [5, 1, 3, 2, 4]:
+            window.append(start + timedelta(minutes=minutes))
+
+        self.assertEqual(start + timedelta(minutes=2), window.min())
+        self.assertEqual(start + timedelta(minutes=4), window.max())
+
+    def test_empty_window(self):
+        """Test a window that holds no values."""
+        window = rolling.RollingWindow(maxlen=0)
+        window.append(1)
+        self.assertEqual(0, len(window))
+
+
+class TestTimeWeightedWindow(unittest.TestCase):
+    """Test the time weighted window."""
+
+    def test_average(self):
+        """Test time weighted average with leaked values."""
+        start = datetime(2018, 4, 1)
+        window = rolling.TimeWeightedWindow(timedelta(minutes=2))
+
+        window.append(start, 20)
+        self.assertEqual(20, window.average(start))
+
+        window.append(start + timedelta(minutes=1), 10)
+        self.assertEqual(20, window.average(start + timedelta(minutes=1)))
+
+        window.append(start + timedelta(minutes=3), 30)
+        self.assertEqual(10, window.average(start + timedelta(minutes=3)))
+        self.assertEqual(20, window.average(start + timedelta(minutes=4)))
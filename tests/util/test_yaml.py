@@ -426,3 +426,67 @@ def test_duplicate_key(caplog):
     with patch_yaml_files(files):
         load_yaml_config_file(YAML_CONFIG_FILE)
     assert 'contains duplicate key' in caplog.text
+
+
+def test_load_yaml_cached(tmpdir):
+    """Test a cached load keeps the file and line annotations."""
+    config_path = tmpdir.join(YAML_CONFIG_FILE)
+    config_path.write('sensor: !include sensor.yaml\n')
+    tmpdir.join('sensor.yaml').write('- platform: template\n')
+    cache_path = str(tmpdir.join('.cache'))
+
+    data = yaml.load_yaml_cached(str(config_path), cache_path)
+    assert os.path.isfile(cache_path)
+
+    with patch.object(yaml, 'load_yaml') as mock_load:
+        files = {}
+        cached = yaml.load_yaml_cached(str(config_path), cache_path, files)
+    assert not mock_load.called
+    assert cached == data == {'sensor': [{'platform': 'template'}]}
+    assert cached.__config_file__ == str(config_path)
+    assert cached['sensor'][0].__config_file__ == \
+        str(tmpdir.join('sensor.yaml'))
+    assert cached['sensor'][0].__line__ == data['sensor'][0].__line__
+    assert list(files) == [str(config_path), str(tmpdir.join('sensor.yaml'))]
+
+
+def test_load_yaml_cached_include_changed(tmpdir):
+    """Test the cache is not used after an included file changed."""
+    config_path = tmpdir.join(YAML_CONFIG_FILE)
+    config_path.write('sensor: !include sensor.yaml\n')
+    tmpdir.join('sensor.yaml').write('- platform: template\n')
+    cache_path = str(tmpdir.join('.cache'))
+    yaml.load_yaml_cached(str(config_path), cache_path)
+
+    tmpdir.join('sensor.yaml').write(
+        '- platform: template\n- platform: mqtt\n')
+    data = yaml.load_yaml_cached(str(config_path), cache_path)
+    assert data == {'sensor': [{'platform': 'template'},
+                               {'platform': 'mqtt'}]}
+
+
+def test_load_yaml_cached_env_var_changed(tmpdir, monkeypatch):
+    """Test the cache is not used after an environment variable changed."""
+    config_path = tmpdir.join(YAML_CONFIG_FILE)
+    config_path.write('password: !env_var HA_TEST_PASSWORD\n')
+    cache_path = str(tmpdir.join('.cache'))
+    monkeypatch.setenv('HA_TEST_PASSWORD', 'first')
+    yaml.load_yaml_cached(str(config_path), cache_path)
+
+    monkeypatch.setenv('HA_TEST_PASSWORD', 'second')
+    data = yaml.load_yaml_cached(str(config_path), cache_path)
+    assert data == {'password': 'second'}
+
+
+def test_load_yaml_cached_keyring(tmpdir):
+    """Test secrets from keyring are not stored."""
+    config_path = tmpdir.join(YAML_CONFIG_FILE)
+    config_path.write('password: !secret pw\n')
+    cache_path = str(tmpdir.join('.cache'))
+
+    with patch.object(yaml, 'keyring', FakeKeyring({'pw': 'yeah'})):
+        data = yaml.load_yaml_cached(str(config_path), cache_path)
+    yaml.clear_secret_cache()
+
+    assert data == {'password': 'yeah'}
+    assert not os.path.isfile(cache_path)